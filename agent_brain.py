@@ -17,7 +17,10 @@ Usage:
 """
 from __future__ import annotations
 
+import hashlib
 import logging
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
 
 from shared.llm_client import llm_call
@@ -25,6 +28,8 @@ from shared.agent_memory import AgentMemory
 
 log = logging.getLogger(__name__)
 
+CONTEXT_CACHE_SIZE = 32
+
 
 @dataclass
 class ThinkResult:
@@ -50,7 +55,11 @@ class AgentBrain:
         self.task_type = task_type
         self.max_context_decisions = max_context_decisions
         self.max_context_patterns = max_context_patterns
-        self.memory = AgentMemory(agent)
+        # Shared per-agent instance; safe to use from multiple threads
+        self.memory = AgentMemory.get(agent)
+        # (memory version, situation digest) -> built context; see _build_memory_context
+        self._context_cache: OrderedDict[tuple, tuple[str, int, int]] = OrderedDict()
+        self._context_lock = threading.Lock()  # think() may run on several threads
 
     def think(
         self,
@@ -81,22 +90,21 @@ class AgentBrain:
         if include_memory:
             memory_context, patterns_used, decisions_found = self._build_memory_context(situation)
 
-        # Build enriched system prompt
-        enriched_system = self.system_prompt
+        # Keep the system prompt static so provider prompt caches (keyed on prefix)
+        # stay warm; per-call memory goes into the user turn instead.
+        user_msg = f"SITUATION: {situation}\n\n{question}"
         if memory_context:
-            enriched_system += (
-                "\n\n--- YOUR MEMORY (learned from past experience) ---\n"
+            user_msg = (
+                "--- YOUR MEMORY (learned from past experience) ---\n"
                 + memory_context
                 + "\n--- END MEMORY ---\n"
                 "\nUse this memory to inform your decision, but don't blindly follow patterns "
-                "if the current situation is significantly different."
+                "if the current situation is significantly different.\n\n"
+                + user_msg
             )
 
-        # Build user message
-        user_msg = f"SITUATION: {situation}\n\n{question}"
-
         response = llm_call(
-            system=enriched_system,
+            system=self.system_prompt,
             user=user_msg,
             agent=self.agent,
             task_type=task_type or self.task_type,
@@ -114,8 +122,17 @@ class AgentBrain:
     def _build_memory_context(self, situation: str) -> tuple[str, int, int]:
         """Build memory context string from relevant decisions + patterns.
 
-        Returns (context_str, patterns_count, decisions_count).
+        Returns (context_str, patterns_count, decisions_count). Results are cached
+        per situation until memory changes, so repeated ticks reuse the exact
+        same text (and keep the prompt byte-identical).
         """
+        key = (self.memory.version, hashlib.md5(situation.encode()).digest())
+        with self._context_lock:
+            cached = self._context_cache.get(key)
+            if cached is not None:
+                self._context_cache.move_to_end(key)
+                return cached
+
         parts = []
 
         # 1. Active patterns (highest confidence first)
@@ -132,6 +149,7 @@ class AgentBrain:
 
         # 2. Similar past decisions
         decisions = self.memory.get_relevant_context(situation, limit=self.max_context_decisions)
+        decisions.sort(key=lambda d: d["id"])  # stable order -> byte-identical prompt prefix
         if decisions:
             parts.append("\nSIMILAR PAST DECISIONS:")
             for d in decisions:
@@ -146,8 +164,12 @@ class AgentBrain:
                     f"  Confidence: {d.get('confidence', 0):.0%}{outcome}"
                 )
 
-        context = "\n".join(parts)
-        return context, len(patterns), len(decisions)
+        result = ("\n".join(parts), len(patterns), len(decisions))
+        with self._context_lock:
+            self._context_cache[key] = result
+            if len(self._context_cache) > CONTEXT_CACHE_SIZE:
+                self._context_cache.popitem(last=False)
+        return result
 
     # ── Memory shortcuts ──
 
@@ -176,6 +198,14 @@ class AgentBrain:
         """Store or reinforce a learned rule."""
         return self.memory.add_pattern(pattern_type, description, evidence_count, confidence)
 
+    def learn_patterns(self, patterns: list[tuple[str, str, int, float]]) -> int:
+        """Store or reinforce many rules at once.
+
+        Each item is (pattern_type, description, evidence_count, confidence).
+        Returns number of patterns written.
+        """
+        return self.memory.add_patterns_bulk(patterns)
+
     def remember_fact(
         self,
         category: str,
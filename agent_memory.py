@@ -16,28 +16,119 @@ Usage:
 """
 from __future__ import annotations
 
+import atexit
 import json
 import logging
+import os
+import re
 import sqlite3
-import uuid
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import ClassVar
 from zoneinfo import ZoneInfo
 
 ET = ZoneInfo("America/New_York")
 log = logging.getLogger(__name__)
 
 MEMORY_DIR = Path(__file__).resolve().parent / "memory"
+# Keyword recall: alphanumeric tokens of 3+ chars, minus words that match nearly every row
+_TOKEN_RE = re.compile(r"[a-z0-9]{3,}")
+_STOPWORDS = frozenset({
+    "the", "and", "for", "with", "from", "this", "that", "was", "are", "were",
+    "has", "had", "have", "but", "not", "you", "all", "can", "its", "into",
+    "our", "out", "now", "than", "then", "there", "their", "what", "when",
+    "will", "would", "should", "could", "about", "over", "under", "just",
+})
+MAX_KEYWORDS = 10
+DECISION_FIELDS = frozenset({
+    "id", "timestamp", "context", "decision", "reasoning", "confidence",
+    "outcome", "outcome_score", "resolved", "tags", "keywords",
+})
+MAX_STORED_KEYWORDS = 40
+PRUNE_INTERVAL_S = 600  # Physical sweep of expired knowledge at most every 10 min
+
+
+def _keywords(text: str) -> str:
+    """Normalized keyword string stored in decisions.keywords (deduped, stopword-free)."""
+    words = dict.fromkeys(w for w in _TOKEN_RE.findall(text.lower()) if w not in _STOPWORDS)
+    return " ".join(list(words)[:MAX_STORED_KEYWORDS])
+
+
+# Cached per-second ISO prefix/offset: avoids a zoneinfo lookup + isoformat per write.
+# Output always carries microseconds, so timestamps still sort correctly as strings.
+_now_cache: tuple[int, str, str] = (0, "", "")
+
+
+def _now_iso() -> str:
+    """Current ET time as ISO-8601 (same as datetime.now(ET).isoformat())."""
+    global _now_cache
+    t = time.time()
+    sec = int(t)
+    cached = _now_cache
+    if cached[0] != sec:
+        iso = datetime.fromtimestamp(sec, ET).isoformat()
+        cached = _now_cache = (sec, iso[:19], iso[19:])
+    return f"{cached[1]}.{int((t - sec) * 1_000_000):06d}{cached[2]}"
+
+
+EMBEDDING_DIM = 384  # bge-small-en-v1.5 (see embedding_client)
+
+
+def _short_id(prefix: str) -> str:
+    """Internal row ID: prefix + 10 hex chars (same shape as the old uuid4 slice)."""
+    return f"{prefix}_{os.urandom(5).hex()}"
 
 
 class AgentMemory:
     """Per-agent SQLite learning database."""
 
+    _registry: ClassVar[dict[str, AgentMemory]] = {}
+    _registry_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    @classmethod
+    def get(cls, agent: str) -> AgentMemory:
+        """Return the process-wide shared instance for an agent (one connection per DB).
+
+        The instance may be used from several threads at once (e.g. every
+        AgentBrain for the agent): writes are serialized by transaction().
+        Shared instances ignore close(); use shutdown_all() at process exit.
+        """
+        name = agent.lower()
+        with cls._registry_lock:
+            mem = cls._registry.get(name)
+            if mem is None:
+                mem = cls(name)
+                mem._shared = True
+                cls._registry[name] = mem
+            return mem
+
+    @classmethod
+    def shutdown_all(cls) -> None:
+        """Close every shared instance created via get()."""
+        with cls._registry_lock:
+            for mem in cls._registry.values():
+                mem._shared = False
+                mem.close()
+            cls._registry.clear()
+
     def __init__(self, agent: str):
         self.agent = agent.lower()
         MEMORY_DIR.mkdir(parents=True, exist_ok=True)
         self.db_path = MEMORY_DIR / f"{self.agent}.db"
         self._conn: sqlite3.Connection | None = None
+        self._fts = False
+        self._vec = False
+        self._last_prune = 0.0
+        self._mem_version = 0  # Bumped by every write that can change recall results
+        # Nesting depth is per thread (instances from get() are shared across threads);
+        # the lock serializes outermost transactions on the one shared connection
+        self._tx_local = threading.local()
+        self._tx_lock = threading.RLock()
+        self._shared = False
         self._init_db()
 
     def _get_conn(self) -> sqlite3.Connection:
@@ -46,8 +137,28 @@ class AgentMemory:
             self._conn.row_factory = sqlite3.Row
             self._conn.execute("PRAGMA journal_mode=WAL")
             self._conn.execute("PRAGMA busy_timeout=5000")
+            # WAL makes NORMAL durable across app crashes; only an OS crash can lose the last commit
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA temp_store=MEMORY")
+            self._conn.execute("PRAGMA cache_size=-20000")  # 20MB
+            self._conn.execute("PRAGMA mmap_size=268435456")  # 256MB
+            self._conn.execute("PRAGMA wal_autocheckpoint=1000")
+            self._vec = self._load_vec_extension(self._conn)
         return self._conn
 
+    @staticmethod
+    def _load_vec_extension(conn: sqlite3.Connection) -> bool:
+        """Load sqlite-vec if installed. Returns False when KNN must run in Python."""
+        try:
+            import sqlite_vec
+            conn.enable_load_extension(True)
+            sqlite_vec.load(conn)
+            conn.enable_load_extension(False)
+            return True
+        except (ImportError, AttributeError, sqlite3.Error):
+            # not installed, or a Python built without extension loading
+            return False
+
     def _init_db(self) -> None:
         conn = self._get_conn()
         conn.executescript("""
@@ -62,7 +173,8 @@ class AgentMemory:
                 outcome_score REAL DEFAULT 0.0,
                 resolved INTEGER DEFAULT 0,
                 tags TEXT DEFAULT '[]',
-                embedding BLOB DEFAULT NULL
+                embedding BLOB DEFAULT NULL,
+                keywords TEXT DEFAULT ''
             );
 
             CREATE TABLE IF NOT EXISTS patterns (
@@ -90,10 +202,17 @@ class AgentMemory:
 
             CREATE INDEX IF NOT EXISTS idx_decisions_ts ON decisions(timestamp);
             CREATE INDEX IF NOT EXISTS idx_decisions_resolved ON decisions(resolved);
+            -- Covering index for narrow recency projections only: context/decision
+            -- (up to 2000 chars each) would nearly duplicate the table, so reads
+            -- of those columns go to the table. Replaces the wide _brief variant.
+            DROP INDEX IF EXISTS idx_decisions_ts_brief;
+            CREATE INDEX IF NOT EXISTS idx_decisions_ts_narrow
+                ON decisions(timestamp DESC, id, confidence, resolved, outcome_score);
             CREATE INDEX IF NOT EXISTS idx_patterns_type ON patterns(pattern_type);
             CREATE INDEX IF NOT EXISTS idx_patterns_active ON patterns(active);
             CREATE INDEX IF NOT EXISTS idx_knowledge_cat ON knowledge(category);
             CREATE INDEX IF NOT EXISTS idx_knowledge_key ON knowledge(key);
+            CREATE INDEX IF NOT EXISTS idx_knowledge_expires ON knowledge(expires_at) WHERE expires_at != '';
         """)
         conn.commit()
         # Migration: add embedding column if missing (for existing DBs)
@@ -102,9 +221,218 @@ class AgentMemory:
         except sqlite3.OperationalError:
             conn.execute("ALTER TABLE decisions ADD COLUMN embedding BLOB DEFAULT NULL")
             conn.commit()
+        # Migration: add + backfill the normalized keywords column
+        try:
+            conn.execute("SELECT keywords FROM decisions LIMIT 1")
+        except sqlite3.OperationalError:
+            conn.execute("ALTER TABLE decisions ADD COLUMN keywords TEXT DEFAULT ''")
+            conn.create_function("_keywords", 1, _keywords, deterministic=True)
+            conn.execute("UPDATE decisions SET keywords = _keywords(context)")
+            conn.commit()
+        self._init_pattern_dedup(conn)
+        self._init_tags(conn)
+        self._init_fts(conn)
+        if self._vec:
+            self._init_vec(conn)
+
+    def _init_pattern_dedup(self, conn: sqlite3.Connection) -> None:
+        """Unique (pattern_type, description) among active patterns, enabling UPSERT."""
+        ddl = (
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_patterns_dedup "
+            "ON patterns(pattern_type, description) WHERE active = 1"
+        )
+        try:
+            conn.execute(ddl)
+        except sqlite3.IntegrityError:
+            # Migration: older DBs may hold active duplicates; keep the oldest active copy
+            conn.execute(
+                "UPDATE patterns SET active = 0 WHERE active = 1 AND rowid NOT IN ("
+                "SELECT MIN(rowid) FROM patterns WHERE active = 1 "
+                "GROUP BY pattern_type, description)"
+            )
+            conn.execute(ddl)
+        conn.commit()
+
+    def _init_tags(self, conn: sqlite3.Connection) -> None:
+        """Maintain a decision_tags lookup table from decisions.tags (JSON) via triggers."""
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'decision_tags'"
+        ).fetchone()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS decision_tags (
+                decision_id TEXT NOT NULL,
+                tag TEXT NOT NULL,
+                PRIMARY KEY (tag, decision_id)
+            ) WITHOUT ROWID;
+
+            CREATE INDEX IF NOT EXISTS idx_decision_tags_dec ON decision_tags(decision_id);
+
+            CREATE TRIGGER IF NOT EXISTS decision_tags_ai AFTER INSERT ON decisions
+            WHEN json_valid(new.tags) BEGIN
+                INSERT OR IGNORE INTO decision_tags(decision_id, tag)
+                SELECT new.id, value FROM json_each(new.tags);
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS decision_tags_ad AFTER DELETE ON decisions BEGIN
+                DELETE FROM decision_tags WHERE decision_id = old.id;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS decision_tags_au AFTER UPDATE OF tags ON decisions BEGIN
+                DELETE FROM decision_tags WHERE decision_id = old.id;
+                INSERT OR IGNORE INTO decision_tags(decision_id, tag)
+                SELECT new.id, value FROM json_each(new.tags) WHERE json_valid(new.tags);
+            END;
+        """)
+        # Migration: populate tags for decisions recorded before the table existed
+        if not exists:
+            conn.execute(
+                "INSERT OR IGNORE INTO decision_tags(decision_id, tag) "
+                "SELECT d.id, j.value FROM decisions d, json_each(d.tags) j "
+                "WHERE json_valid(d.tags)"
+            )
+            conn.commit()
+
+    def _init_vec(self, conn: sqlite3.Connection) -> None:
+        """Create the sqlite-vec KNN index over decision embeddings (rowid-aligned)."""
+        conn.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS decisions_vec USING vec0("
+            f"embedding float[{EMBEDDING_DIM}] distance_metric=cosine)"
+        )
+        # Migration: index embeddings stored before the vec table existed
+        # (or written by a process without sqlite-vec installed)
+        conn.execute(
+            "INSERT INTO decisions_vec(rowid, embedding) "
+            "SELECT rowid, embedding FROM decisions WHERE length(embedding) = ? "
+            "AND rowid NOT IN (SELECT rowid FROM decisions_vec)",
+            (EMBEDDING_DIM * 4,),
+        )
+        conn.commit()
+
+    def _index_embedding(self, conn: sqlite3.Connection, rowid: int, blob: bytes | None) -> None:
+        if self._vec and blob and len(blob) == EMBEDDING_DIM * 4:
+            conn.execute(
+                "INSERT OR REPLACE INTO decisions_vec(rowid, embedding) VALUES (?, ?)",
+                (rowid, blob),
+            )
+
+    def _init_fts(self, conn: sqlite3.Connection) -> None:
+        """Mirror decisions.context/decision into an FTS5 index for keyword recall."""
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'decisions_fts'"
+        ).fetchone()
+        try:
+            conn.executescript("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS decisions_fts USING fts5(
+                    context, decision, content='decisions', content_rowid='rowid'
+                );
+
+                CREATE TRIGGER IF NOT EXISTS decisions_fts_ai AFTER INSERT ON decisions BEGIN
+                    INSERT INTO decisions_fts(rowid, context, decision)
+                    VALUES (new.rowid, new.context, new.decision);
+                END;
+
+                CREATE TRIGGER IF NOT EXISTS decisions_fts_ad AFTER DELETE ON decisions BEGIN
+                    INSERT INTO decisions_fts(decisions_fts, rowid, context, decision)
+                    VALUES ('delete', old.rowid, old.context, old.decision);
+                END;
+
+                CREATE TRIGGER IF NOT EXISTS decisions_fts_au AFTER UPDATE OF context, decision ON decisions BEGIN
+                    INSERT INTO decisions_fts(decisions_fts, rowid, context, decision)
+                    VALUES ('delete', old.rowid, old.context, old.decision);
+                    INSERT INTO decisions_fts(rowid, context, decision)
+                    VALUES (new.rowid, new.context, new.decision);
+                END;
+            """)
+        except sqlite3.OperationalError:
+            log.warning("FTS5 unavailable for %s, using LIKE keyword search", self.agent)
+            self._fts = False
+            return
+        # Migration: index decisions recorded before the FTS table existed
+        if not exists:
+            conn.execute("INSERT INTO decisions_fts(decisions_fts) VALUES ('rebuild')")
+            conn.commit()
+        self._fts = True
+
+    @property
+    def version(self) -> tuple[int, int]:
+        """Cheap change marker for decisions/patterns.
+
+        Combines this instance's write counter with SQLite's data_version, which
+        changes when another connection (e.g. pattern_miner) commits.
+        """
+        data_version = self._get_conn().execute("PRAGMA data_version").fetchone()[0]
+        return self._mem_version, data_version
+
+    @contextmanager
+    def transaction(self):
+        """Yield the connection inside one transaction.
+
+        Commits when the outermost block exits (rolls back on error); nested
+        blocks, including the ones every write method opens, join the outer
+        transaction. Use batch() to group many writes under a single commit.
+
+        Thread-safe: nesting is tracked per thread, and other threads' writes
+        wait until the outermost block has committed or rolled back.
+        """
+        conn = self._get_conn()
+        local = self._tx_local
+        if getattr(local, "depth", 0):
+            local.depth += 1
+            try:
+                yield conn
+            finally:
+                local.depth -= 1
+            return
+        with self._tx_lock:
+            local.depth = 1
+            try:
+                with conn:
+                    yield conn
+            finally:
+                local.depth -= 1
+
+    batch = transaction
 
     # ── Decisions ──
 
+    @staticmethod
+    def _normalized_blobs(vecs) -> list[bytes]:
+        """L2-normalize embeddings and pack as float32 so cosine is a plain dot product."""
+        import numpy as np
+        mat = np.asarray(vecs, dtype=np.float32)
+        mat = mat / (np.linalg.norm(mat, axis=1, keepdims=True) + 1e-9)
+        return [row.tobytes() for row in mat]
+
+    @classmethod
+    def _embed_blobs(cls, texts: list[str]) -> list[bytes | None]:
+        """Normalized embedding blobs for texts (None each when embeddings are unavailable)."""
+        try:
+            from shared.embedding_client import embed_batch
+            return cls._normalized_blobs(embed_batch([t[:500] for t in texts]))
+        except Exception:
+            return [None] * len(texts)
+
+    def _insert_decision(
+        self,
+        conn: sqlite3.Connection,
+        context: str,
+        decision: str,
+        reasoning: str,
+        confidence: float,
+        tags: list[str] | None,
+        emb_blob: bytes | None,
+    ) -> str:
+        did = _short_id("dec")
+        cur = conn.execute(
+            "INSERT INTO decisions (id, timestamp, context, decision, reasoning, confidence, tags, "
+            "embedding, keywords) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (did, _now_iso(), context[:2000], decision[:2000], reasoning[:2000],
+             max(0.0, min(1.0, confidence)), json.dumps(tags or []), emb_blob,
+             _keywords(context[:2000])),
+        )
+        self._index_embedding(conn, cur.lastrowid, emb_blob)
+        return did
+
     def record_decision(
         self,
         context: str,
@@ -114,96 +442,163 @@ class AgentMemory:
         tags: list[str] | None = None,
     ) -> str:
         """Log a decision the agent made. Returns decision ID."""
-        did = f"dec_{uuid.uuid4().hex[:10]}"
-        now = datetime.now(ET).isoformat()
         # Compute embedding for context (for semantic retrieval later)
-        emb_blob = None
-        try:
-            from shared.embedding_client import embed_text
-            import numpy as np
-            vec = embed_text(context[:500])
-            emb_blob = np.array(vec, dtype=np.float32).tobytes()
-        except Exception:
-            pass
-
-        conn = self._get_conn()
-        conn.execute(
-            "INSERT INTO decisions (id, timestamp, context, decision, reasoning, confidence, tags, embedding) "
-            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-            (did, now, context[:2000], decision[:2000], reasoning[:2000],
-             max(0.0, min(1.0, confidence)), json.dumps(tags or []), emb_blob),
-        )
-        conn.commit()
+        emb_blob = self._embed_blobs([context])[0]
+        with self.transaction() as conn:
+            did = self._insert_decision(conn, context, decision, reasoning, confidence, tags, emb_blob)
+        self._mem_version += 1
         return did
 
+    def record_decisions_bulk(self, items: list[dict]) -> list[str]:
+        """Log many decisions in one transaction with one embedding batch.
+
+        Each item takes record_decision's keyword arguments (context and
+        decision required). Returns decision IDs in input order.
+        """
+        if not items:
+            return []
+        blobs = self._embed_blobs([it["context"] for it in items])
+        with self.transaction() as conn:
+            ids = [
+                self._insert_decision(
+                    conn, it["context"], it["decision"], it.get("reasoning", ""),
+                    it.get("confidence", 0.5), it.get("tags"), blob,
+                )
+                for it, blob in zip(items, blobs)
+            ]
+        self._mem_version += 1
+        return ids
+
     def record_outcome(self, decision_id: str, outcome: str, score: float = 0.0) -> bool:
         """Record the outcome of a past decision. Returns True if found."""
-        conn = self._get_conn()
-        cur = conn.execute(
-            "UPDATE decisions SET outcome = ?, outcome_score = ?, resolved = 1 WHERE id = ?",
-            (outcome[:2000], max(-1.0, min(1.0, score)), decision_id),
-        )
-        conn.commit()
+        with self.transaction() as conn:
+            cur = conn.execute(
+                "UPDATE decisions SET outcome = ?, outcome_score = ?, resolved = 1 WHERE id = ?",
+                (outcome[:2000], max(-1.0, min(1.0, score)), decision_id),
+            )
+        self._mem_version += 1
         return cur.rowcount > 0
 
-    def get_recent_decisions(self, limit: int = 20, resolved_only: bool = False) -> list[dict]:
-        """Get recent decisions, newest first."""
+    def get_recent_decisions(
+        self,
+        limit: int = 20,
+        resolved_only: bool = False,
+        fields: tuple[str, ...] | None = None,
+    ) -> list[dict] | list[tuple]:
+        """Get recent decisions, newest first.
+
+        With fields, selects only those columns and returns plain tuples in that
+        order; (id, confidence, resolved, outcome_score) and timestamp are served
+        straight from idx_decisions_ts_narrow.
+        """
         conn = self._get_conn()
         where = "WHERE resolved = 1" if resolved_only else ""
-        rows = conn.execute(
-            f"SELECT * FROM decisions {where} ORDER BY timestamp DESC LIMIT ?",
+        if fields is None:
+            rows = conn.execute(
+                f"SELECT * FROM decisions {where} ORDER BY timestamp DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+            return [dict(r) for r in rows]
+
+        unknown = set(fields) - DECISION_FIELDS
+        if unknown:
+            raise ValueError(f"Unknown decision fields: {sorted(unknown)}")
+        cur = conn.cursor()
+        cur.row_factory = None
+        return cur.execute(
+            f"SELECT {', '.join(fields)} FROM decisions {where} ORDER BY timestamp DESC LIMIT ?",
             (limit,),
         ).fetchall()
-        return [dict(r) for r in rows]
+
+    def iter_resolved_decisions(
+        self,
+        limit: int = 500,
+        fields: tuple[str, ...] = ("tags", "context", "outcome_score"),
+    ) -> Iterator[tuple]:
+        """Yield resolved decisions newest first as plain tuples of fields.
+
+        Rows stream straight off the cursor, so no list or per-row dict is built.
+        """
+        unknown = set(fields) - DECISION_FIELDS
+        if unknown:
+            raise ValueError(f"Unknown decision fields: {sorted(unknown)}")
+        cur = self._get_conn().cursor()
+        cur.row_factory = None
+        yield from cur.execute(
+            f"SELECT {', '.join(fields)} FROM decisions WHERE resolved = 1 "
+            "ORDER BY timestamp DESC LIMIT ?",
+            (limit,),
+        )
 
     def get_relevant_context(self, situation: str, limit: int = 5) -> list[dict]:
         """Find past decisions relevant to the current situation.
 
-        Uses embedding cosine similarity when available, falls back to keyword matching.
+        Uses embedding cosine similarity when available (sqlite-vec KNN if the
+        extension is installed, otherwise a Python scan of the newest 200), falls
+        back to BM25-ranked FTS5 keyword matching.
         """
         conn = self._get_conn()
 
         # Try semantic search first
         try:
-            from shared.embedding_client import embed_text, cosine_similarity
+            from shared.embedding_client import embed_text
             import numpy as np
 
-            query_vec = embed_text(situation[:500])
-
-            # Fetch decisions that have embeddings
-            rows = conn.execute(
-                "SELECT * FROM decisions WHERE embedding IS NOT NULL "
-                "ORDER BY timestamp DESC LIMIT 200"
-            ).fetchall()
-
-            if rows:
-                scored = []
-                for r in rows:
-                    emb_bytes = r["embedding"]
-                    if emb_bytes:
-                        stored_vec = np.frombuffer(emb_bytes, dtype=np.float32).tolist()
-                        sim = cosine_similarity(query_vec, stored_vec)
-                        row_dict = dict(r)
+            query_blob = self._normalized_blobs([embed_text(situation[:500])])[0]
+
+            if self._vec:
+                results = self._vec_search(conn, query_blob, limit)
+            else:
+                # Fetch decisions that have embeddings
+                rows = conn.execute(
+                    "SELECT * FROM decisions WHERE length(embedding) = ? "
+                    "ORDER BY timestamp DESC LIMIT 200",
+                    (EMBEDDING_DIM * 4,),
+                ).fetchall()
+
+                results = []
+                if rows:
+                    query = np.frombuffer(query_blob, dtype=np.float32)
+                    mat = np.frombuffer(b"".join(r["embedding"] for r in rows), dtype=np.float32)
+                    mat = mat.reshape(len(rows), EMBEDDING_DIM)
+                    # Stored vectors are unit-length (older rows are rescaled here)
+                    sims = (mat @ query) / (np.linalg.norm(mat, axis=1) + 1e-9)
+                    for i in np.argsort(-sims)[:limit]:
+                        if sims[i] <= 0.3:  # Filter low similarity
+                            break
+                        row_dict = dict(rows[i])
                         row_dict.pop("embedding", None)  # Don't return blob
-                        row_dict["_similarity"] = round(sim, 3)
-                        scored.append(row_dict)
-
-                scored.sort(key=lambda x: -x["_similarity"])
-                # Filter low similarity
-                results = [s for s in scored[:limit] if s["_similarity"] > 0.3]
-                if results:
-                    return results
-                # If no good matches, fall through to keyword search
+                        row_dict["_similarity"] = round(float(sims[i]), 3)
+                        results.append(row_dict)
+            if results:
+                return results
+            # If no good matches, fall through to keyword search
         except Exception:
             pass
 
         # Fallback: keyword matching
-        words = [w.lower() for w in situation.split() if len(w) >= 3]
+        words = list(dict.fromkeys(
+            w for w in _TOKEN_RE.findall(situation.lower()) if w not in _STOPWORDS
+        ))[:MAX_KEYWORDS]
         if not words:
             return []
 
-        conditions = " OR ".join(["LOWER(context) LIKE ?" for _ in words])
-        params = [f"%{w}%" for w in words[:10]]
+        if self._fts:
+            # Quote each term so FTS5 keywords (AND/OR/NOT/NEAR) in the situation are literal
+            query = " OR ".join('"' + w.replace('"', '""') + '"' for w in words)
+            rows = conn.execute(
+                "SELECT d.id, d.timestamp, d.context, d.decision, d.reasoning, d.confidence, "
+                "d.outcome, d.outcome_score, d.resolved, d.tags "
+                "FROM decisions_fts f JOIN decisions d ON d.rowid = f.rowid "
+                "WHERE decisions_fts MATCH ? "
+                "ORDER BY bm25(decisions_fts), d.timestamp DESC LIMIT ?",
+                (query, limit),
+            ).fetchall()
+            return [dict(r) for r in rows]
+
+        # No FTS5: substring match on the precomputed lowercase keywords column
+        conditions = " OR ".join(["keywords LIKE ?" for _ in words])
+        params = [f"%{w}%" for w in words]
 
         rows = conn.execute(
             f"SELECT id, timestamp, context, decision, reasoning, confidence, "
@@ -214,6 +609,26 @@ class AgentMemory:
         ).fetchall()
         return [dict(r) for r in rows]
 
+    def _vec_search(self, conn: sqlite3.Connection, query_blob: bytes, limit: int) -> list[dict]:
+        """KNN over decisions_vec; returns rows shaped like the Python-scan path."""
+        rows = conn.execute(
+            "WITH knn AS ("
+            "  SELECT rowid, distance FROM decisions_vec WHERE embedding MATCH ? AND k = ?"
+            ") "
+            "SELECT d.id, d.timestamp, d.context, d.decision, d.reasoning, d.confidence, "
+            "d.outcome, d.outcome_score, d.resolved, d.tags, 1 - knn.distance AS sim "
+            "FROM knn JOIN decisions d ON d.rowid = knn.rowid ORDER BY knn.distance",
+            (query_blob, limit),
+        ).fetchall()
+        results = []
+        for r in rows:
+            if r["sim"] <= 0.3:
+                continue
+            row_dict = dict(r)
+            row_dict["_similarity"] = round(row_dict.pop("sim"), 3)
+            results.append(row_dict)
+        return results
+
     def backfill_embeddings(self, batch_size: int = 50) -> int:
         """Backfill embeddings for decisions that don't have them yet.
 
@@ -222,13 +637,13 @@ class AgentMemory:
         """
         try:
             from shared.embedding_client import embed_batch
-            import numpy as np
+            import numpy as np  # noqa: F401
         except ImportError:
             return 0
 
         conn = self._get_conn()
         rows = conn.execute(
-            "SELECT id, context FROM decisions WHERE embedding IS NULL LIMIT ?",
+            "SELECT rowid, id, context FROM decisions WHERE embedding IS NULL LIMIT ?",
             (batch_size,),
         ).fetchall()
 
@@ -236,17 +651,67 @@ class AgentMemory:
             return 0
 
         texts = [r["context"][:500] for r in rows]
-        ids = [r["id"] for r in rows]
         vecs = embed_batch(texts)
 
-        for did, vec in zip(ids, vecs):
-            blob = np.array(vec, dtype=np.float32).tobytes()
-            conn.execute("UPDATE decisions SET embedding = ? WHERE id = ?", (blob, did))
-
-        conn.commit()
+        with self.transaction():
+            for r, blob in zip(rows, self._normalized_blobs(vecs)):
+                conn.execute("UPDATE decisions SET embedding = ? WHERE id = ?", (blob, r["id"]))
+                self._index_embedding(conn, r["rowid"], blob)
+        self._mem_version += 1
         log.info("Backfilled embeddings for %d decisions in %s", len(rows), self.agent)
         return len(rows)
 
+    def get_decisions_by_tag(self, tag: str, limit: int = 20) -> list[dict]:
+        """Get decisions carrying a tag, newest first (indexed lookup)."""
+        conn = self._get_conn()
+        rows = conn.execute(
+            "SELECT d.id, d.timestamp, d.context, d.decision, d.reasoning, d.confidence, "
+            "d.outcome, d.outcome_score, d.resolved, d.tags "
+            "FROM decision_tags t JOIN decisions d ON d.id = t.decision_id "
+            "WHERE t.tag = ? ORDER BY d.timestamp DESC LIMIT ?",
+            (tag, limit),
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+    def get_hourly_outcomes(self, limit: int = 500) -> list[tuple[int, int, int]]:
+        """(hour, wins, losses) over the newest `limit` resolved decisions.
+
+        Only decisions with a nonzero outcome_score count. The hour is read from
+        the stored local timestamp text; strftime('%H') would shift it to UTC.
+        """
+        conn = self._get_conn()
+        cur = conn.cursor()
+        cur.row_factory = None
+        return cur.execute(
+            "SELECT CAST(substr(timestamp, instr(timestamp, 'T') + 1, 2) AS INTEGER) AS hour, "
+            "SUM(outcome_score > 0), SUM(outcome_score < 0) "
+            "FROM (SELECT timestamp, outcome_score FROM decisions WHERE resolved = 1 "
+            "      ORDER BY timestamp DESC LIMIT ?) "
+            "WHERE outcome_score != 0 "
+            "AND substr(timestamp, instr(timestamp, 'T') + 1, 3) GLOB '[0-9][0-9]:' "
+            "GROUP BY hour ORDER BY hour",
+            (limit,),
+        ).fetchall()
+
+    def get_confidence_outcomes(self, limit: int = 500) -> list[tuple[str, int, int]]:
+        """(bucket, wins, n) for 'high' (>=0.7) and 'low' (<0.4) confidence.
+
+        Aggregated over the newest `limit` resolved decisions; mid-range
+        confidence is left out.
+        """
+        conn = self._get_conn()
+        cur = conn.cursor()
+        cur.row_factory = None
+        return cur.execute(
+            "SELECT CASE WHEN confidence >= 0.7 THEN 'high' ELSE 'low' END AS bucket, "
+            "SUM(outcome_score > 0), COUNT(*) "
+            "FROM (SELECT confidence, outcome_score FROM decisions WHERE resolved = 1 "
+            "      ORDER BY timestamp DESC LIMIT ?) "
+            "WHERE confidence >= 0.7 OR confidence < 0.4 "
+            "GROUP BY bucket",
+            (limit,),
+        ).fetchall()
+
     def search_decisions(self, query: str, limit: int = 10) -> list[dict]:
         """Search decisions by context or decision text."""
         conn = self._get_conn()
@@ -269,36 +734,66 @@ class AgentMemory:
         tags: list[str] | None = None,
     ) -> str:
         """Store a learned rule. Reinforces if same pattern_type + description exists."""
-        conn = self._get_conn()
-        now = datetime.now(ET).isoformat()
+        now = _now_iso()
+        pattern_type, description = pattern_type[:100], description[:1000]
+
+        with self.transaction() as conn:
+            # Check for existing similar pattern
+            existing = conn.execute(
+                "SELECT id, evidence_count, confidence FROM patterns "
+                "WHERE pattern_type = ? AND description = ? AND active = 1",
+                (pattern_type, description),
+            ).fetchone()
+
+            if existing:
+                # Reinforce: bump evidence count + confidence
+                new_count = existing["evidence_count"] + evidence_count
+                new_conf = min(0.99, existing["confidence"] + 0.05)
+                conn.execute(
+                    "UPDATE patterns SET evidence_count = ?, confidence = ?, updated_at = ? WHERE id = ?",
+                    (new_count, new_conf, now, existing["id"]),
+                )
+                pid = existing["id"]
+            else:
+                pid = _short_id("pat")
+                conn.execute(
+                    "INSERT INTO patterns (id, pattern_type, description, evidence_count, confidence, "
+                    "created_at, updated_at, tags) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (pid, pattern_type, description, evidence_count,
+                     max(0.0, min(1.0, confidence)), now, now, json.dumps(tags or [])),
+                )
+        self._mem_version += 1
+        return pid
 
-        # Check for existing similar pattern
-        existing = conn.execute(
-            "SELECT id, evidence_count, confidence FROM patterns "
-            "WHERE pattern_type = ? AND description = ? AND active = 1",
-            (pattern_type, description),
-        ).fetchone()
+    def add_patterns_bulk(
+        self,
+        items: list[tuple[str, str, int, float]],
+    ) -> int:
+        """Store or reinforce many rules in one transaction.
 
-        if existing:
-            # Reinforce: bump evidence count + confidence
-            new_count = existing["evidence_count"] + evidence_count
-            new_conf = min(0.99, existing["confidence"] + 0.05)
-            conn.execute(
-                "UPDATE patterns SET evidence_count = ?, confidence = ?, updated_at = ? WHERE id = ?",
-                (new_count, new_conf, now, existing["id"]),
+        Each item is (pattern_type, description, evidence_count, confidence), with
+        the same reinforce semantics as add_pattern. Returns number of items written.
+        """
+        if not items:
+            return 0
+        now = _now_iso()
+        rows = [
+            (_short_id("pat"), ptype[:100], desc[:1000], evidence,
+             max(0.0, min(1.0, conf)), now, now)
+            for ptype, desc, evidence, conf in items
+        ]
+        with self.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO patterns (id, pattern_type, description, evidence_count, confidence, "
+                "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(pattern_type, description) WHERE active = 1 DO UPDATE SET "
+                "evidence_count = evidence_count + excluded.evidence_count, "
+                "confidence = MIN(0.99, confidence + 0.05), "
+                "updated_at = excluded.updated_at",
+                rows,
             )
-            conn.commit()
-            return existing["id"]
-
-        pid = f"pat_{uuid.uuid4().hex[:10]}"
-        conn.execute(
-            "INSERT INTO patterns (id, pattern_type, description, evidence_count, confidence, "
-            "created_at, updated_at, tags) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-            (pid, pattern_type[:100], description[:1000], evidence_count,
-             max(0.0, min(1.0, confidence)), now, now, json.dumps(tags or [])),
-        )
-        conn.commit()
-        return pid
+        self._mem_version += 1
+        return len(rows)
 
     def get_active_patterns(self, pattern_type: str | None = None, min_confidence: float = 0.0) -> list[dict]:
         """Get active learned patterns."""
@@ -312,18 +807,33 @@ class AgentMemory:
             where += " AND confidence >= ?"
             params.append(min_confidence)
         rows = conn.execute(
-            f"SELECT * FROM patterns {where} ORDER BY confidence DESC, evidence_count DESC",
+            f"SELECT * FROM patterns {where} ORDER BY confidence DESC, evidence_count DESC, id",
             params,
         ).fetchall()
         return [dict(r) for r in rows]
 
     def deactivate_pattern(self, pattern_id: str) -> bool:
         """Deactivate a pattern that turned out to be wrong."""
-        conn = self._get_conn()
-        cur = conn.execute("UPDATE patterns SET active = 0 WHERE id = ?", (pattern_id,))
-        conn.commit()
+        with self.transaction() as conn:
+            cur = conn.execute("UPDATE patterns SET active = 0 WHERE id = ?", (pattern_id,))
+        self._mem_version += 1
         return cur.rowcount > 0
 
+    def prune_weak_patterns(self, max_evidence: int = 1, min_confidence: float = 0.5) -> int:
+        """Deactivate active patterns with little evidence and low confidence in one UPDATE.
+
+        Returns the number of patterns deactivated.
+        """
+        with self.transaction() as conn:
+            cur = conn.execute(
+                "UPDATE patterns SET active = 0 "
+                "WHERE active = 1 AND evidence_count <= ? AND confidence < ?",
+                (max_evidence, min_confidence),
+            )
+        if cur.rowcount:
+            self._mem_version += 1
+        return cur.rowcount
+
     # ── Knowledge ──
 
     def set_knowledge(
@@ -335,51 +845,44 @@ class AgentMemory:
         ttl_hours: int = 0,
     ) -> str:
         """Store an agent-specific fact. Upserts by category+key."""
-        conn = self._get_conn()
-        now = datetime.now(ET)
+        self._maybe_prune()
+        # Always with microseconds, like _now_iso(), so expires_at compares correctly as text
+        now = _now_iso()
         expires = ""
         if ttl_hours > 0:
-            expires = (now + timedelta(hours=ttl_hours)).isoformat()
-
-        # Upsert
-        existing = conn.execute(
-            "SELECT id FROM knowledge WHERE category = ? AND key = ?",
-            (category, key),
-        ).fetchone()
-
-        if existing:
+            expires = (datetime.now(ET) + timedelta(hours=ttl_hours)).isoformat(timespec="microseconds")
+
+        with self.transaction() as conn:
+            # Upsert
+            existing = conn.execute(
+                "SELECT id FROM knowledge WHERE category = ? AND key = ?",
+                (category, key),
+            ).fetchone()
+
+            if existing:
+                conn.execute(
+                    "UPDATE knowledge SET value = ?, source = ?, ttl_hours = ?, "
+                    "created_at = ?, expires_at = ? WHERE id = ?",
+                    (value[:5000], source[:200], ttl_hours, now, expires, existing["id"]),
+                )
+                return existing["id"]
+
+            kid = _short_id("kn")
             conn.execute(
-                "UPDATE knowledge SET value = ?, source = ?, ttl_hours = ?, "
-                "created_at = ?, expires_at = ? WHERE id = ?",
-                (value[:5000], source[:200], ttl_hours, now.isoformat(), expires, existing["id"]),
+                "INSERT INTO knowledge (id, category, key, value, source, ttl_hours, created_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (kid, category[:100], key[:200], value[:5000], source[:200],
+                 ttl_hours, now, expires),
             )
-            conn.commit()
-            return existing["id"]
-
-        kid = f"kn_{uuid.uuid4().hex[:10]}"
-        conn.execute(
-            "INSERT INTO knowledge (id, category, key, value, source, ttl_hours, created_at, expires_at) "
-            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-            (kid, category[:100], key[:200], value[:5000], source[:200],
-             ttl_hours, now.isoformat(), expires),
-        )
-        conn.commit()
         return kid
 
     def get_knowledge(self, category: str | None = None, key: str | None = None) -> list[dict]:
-        """Get knowledge entries, auto-pruning expired ones."""
+        """Get knowledge entries, skipping expired ones (see prune_expired)."""
         conn = self._get_conn()
-        now = datetime.now(ET).isoformat()
-
-        # Prune expired
-        conn.execute(
-            "DELETE FROM knowledge WHERE expires_at != '' AND expires_at < ?",
-            (now,),
-        )
-        conn.commit()
+        now = _now_iso()
 
-        where = "WHERE 1=1"
-        params: list = []
+        where = "WHERE (expires_at = '' OR expires_at >= ?)"
+        params: list = [now]
         if category:
             where += " AND category = ?"
             params.append(category)
@@ -393,31 +896,48 @@ class AgentMemory:
         ).fetchall()
         return [dict(r) for r in rows]
 
+    def prune_expired(self) -> int:
+        """Delete expired knowledge entries. Returns number removed."""
+        with self.transaction() as conn:
+            cur = conn.execute(
+                "DELETE FROM knowledge WHERE expires_at != '' AND expires_at < ?",
+                (_now_iso(),),
+            )
+        self._last_prune = time.monotonic()
+        return cur.rowcount
+
+    def _maybe_prune(self) -> None:
+        """Run prune_expired from the write path at most once per PRUNE_INTERVAL_S."""
+        if time.monotonic() - self._last_prune >= PRUNE_INTERVAL_S:
+            self.prune_expired()
+
     # ── Stats ──
 
     def get_stats(self) -> dict:
         """Memory health metrics for dashboard."""
         conn = self._get_conn()
 
-        total_decisions = conn.execute("SELECT COUNT(*) FROM decisions").fetchone()[0]
-        resolved_decisions = conn.execute("SELECT COUNT(*) FROM decisions WHERE resolved = 1").fetchone()[0]
-        active_patterns = conn.execute("SELECT COUNT(*) FROM patterns WHERE active = 1").fetchone()[0]
-        total_knowledge = conn.execute("SELECT COUNT(*) FROM knowledge").fetchone()[0]
-
-        # Win rate (for agents that track +/- outcomes)
-        wins = conn.execute("SELECT COUNT(*) FROM decisions WHERE resolved = 1 AND outcome_score > 0").fetchone()[0]
-        losses = conn.execute("SELECT COUNT(*) FROM decisions WHERE resolved = 1 AND outcome_score < 0").fetchone()[0]
-
-        # Avg confidence of resolved decisions
-        avg_conf = conn.execute(
-            "SELECT AVG(confidence) FROM decisions WHERE resolved = 1"
-        ).fetchone()[0]
+        # Decision counts + win/loss + avg resolved confidence in one scan
+        total_decisions, resolved_decisions, wins, losses, avg_conf = conn.execute(
+            "SELECT COUNT(*), "
+            "COALESCE(SUM(resolved = 1), 0), "
+            "COALESCE(SUM(resolved = 1 AND outcome_score > 0), 0), "
+            "COALESCE(SUM(resolved = 1 AND outcome_score < 0), 0), "
+            "AVG(CASE WHEN resolved = 1 THEN confidence END) "
+            "FROM decisions"
+        ).fetchone()
 
         # Recent pattern count (last 7 days)
         week_ago = (datetime.now(ET) - timedelta(days=7)).isoformat()
-        recent_patterns = conn.execute(
-            "SELECT COUNT(*) FROM patterns WHERE created_at > ?", (week_ago,)
-        ).fetchone()[0]
+        active_patterns, recent_patterns, total_knowledge, page_count, page_size = conn.execute(
+            "SELECT "
+            "(SELECT COUNT(*) FROM patterns WHERE active = 1), "
+            "(SELECT COUNT(*) FROM patterns WHERE created_at > ?), "
+            "(SELECT COUNT(*) FROM knowledge), "
+            "(SELECT page_count FROM pragma_page_count()), "
+            "(SELECT page_size FROM pragma_page_size())",
+            (week_ago,),
+        ).fetchone()
 
         return {
             "agent": self.agent,
@@ -431,11 +951,16 @@ class AgentMemory:
             "win_rate": round(wins / max(1, wins + losses) * 100, 1),
             "avg_confidence": round(avg_conf or 0, 3),
             "recent_patterns_7d": recent_patterns,
-            "db_size_kb": round(self.db_path.stat().st_size / 1024, 1) if self.db_path.exists() else 0,
+            "db_size_kb": round(page_count * page_size / 1024, 1),
         }
 
     def close(self) -> None:
-        """Close the database connection."""
+        """Close the database connection (no-op for shared instances from get())."""
+        if self._shared:
+            return
         if self._conn:
             self._conn.close()
             self._conn = None
+
+
+atexit.register(AgentMemory.shutdown_all)
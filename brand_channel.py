@@ -3,7 +3,8 @@
 Manages the flow of brand opportunities from Viper's scanner
 through Soren's brand identity filter to Lisa's content queue.
 
-State persisted to ~/polymarket-bot/data/brand_channel.json.
+State persisted to ~/polymarket-bot/data/brand_channel.db (SQLite, WAL mode),
+one row per message. The legacy brand_channel.json is imported once on first open.
 Publishes events to the shared event bus for dashboard notifications.
 """
 from __future__ import annotations
@@ -11,20 +12,45 @@ from __future__ import annotations
 import json
 import logging
 import os
+import sqlite3
 import time
 import threading
-from datetime import datetime
-from zoneinfo import ZoneInfo
 from pathlib import Path
+from zoneinfo import ZoneInfo
+
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is the fallback
+    orjson = None
+
+try:
+    from shared.agent_memory import _now_iso
+except ImportError:
+    from agent_memory import _now_iso  # running from inside ~/shared
 
 log = logging.getLogger(__name__)
 
 ET = ZoneInfo("America/New_York")
 DATA_DIR = Path.home() / "polymarket-bot" / "data"
-CHANNEL_FILE = DATA_DIR / "brand_channel.json"
+CHANNEL_FILE = DATA_DIR / "brand_channel.json"  # legacy, migration source only
+CHANNEL_DB = DATA_DIR / "brand_channel.db"
 MAX_MESSAGES = 200
 
 _lock = threading.Lock()
+_conn: sqlite3.Connection | None = None
+
+def _dumps(obj: dict) -> str:
+    """Serialize a message body for the TEXT column (orjson when installed)."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            pass  # e.g. ints beyond 64 bits — stdlib json handles them
+    return json.dumps(obj, default=str)
+
+
+def _loads(text: str) -> dict:
+    return orjson.loads(text) if orjson is not None else json.loads(text)
 
 
 def _generate_id() -> str:
@@ -33,28 +59,76 @@ def _generate_id() -> str:
     return f"bc_{ts}_{rand_hex}"
 
 
-def _load_messages() -> list[dict]:
+def _get_conn() -> sqlite3.Connection:
+    """Open (once) a WAL-mode connection and create the schema."""
+    global _conn
+    if _conn is None:
+        DATA_DIR.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(CHANNEL_DB), check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS brand_channel (
+                id TEXT PRIMARY KEY,
+                opportunity_id TEXT DEFAULT '',
+                status TEXT NOT NULL,
+                ts TEXT NOT NULL,
+                body TEXT NOT NULL
+            );
+
+            CREATE INDEX IF NOT EXISTS idx_bc_opp ON brand_channel(opportunity_id);
+            CREATE INDEX IF NOT EXISTS idx_bc_status ON brand_channel(status);
+        """)
+        _migrate_json(conn)
+        _conn = conn
+    return _conn
+
+
+def _migrate_json(conn: sqlite3.Connection) -> None:
+    """One-time import of the legacy JSON file into an empty table."""
     if not CHANNEL_FILE.exists():
-        return []
+        return
+    if conn.execute("SELECT 1 FROM brand_channel LIMIT 1").fetchone():
+        return
     try:
-        data = json.loads(CHANNEL_FILE.read_text())
-        return data.get("messages", [])
+        messages = json.loads(CHANNEL_FILE.read_text()).get("messages", [])
     except Exception:
-        return []
+        log.warning("Could not read legacy brand channel JSON for migration")
+        return
+    before = conn.total_changes
+    with conn:
+        conn.executemany(
+            "INSERT OR IGNORE INTO brand_channel (id, opportunity_id, status, ts, body) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [(m["id"], m.get("opportunity_id", ""), m.get("status", "unknown"),
+              m.get("timestamp", ""), _dumps(m))
+             for m in messages[-MAX_MESSAGES:] if m.get("id")],
+        )
+    # Rows actually inserted: the tail cut, id-less and duplicate messages are skipped
+    log.info("Migrated %d brand channel messages from JSON", conn.total_changes - before)
 
 
-def _save_messages(messages: list[dict]) -> None:
-    DATA_DIR.mkdir(parents=True, exist_ok=True)
-    # Keep only last MAX_MESSAGES
-    messages = messages[-MAX_MESSAGES:]
-    try:
-        CHANNEL_FILE.write_text(json.dumps({
-            "messages": messages,
-            "count": len(messages),
-            "updated": datetime.now(ET).isoformat(),
-        }, indent=2, default=str))
-    except Exception:
-        log.exception("Failed to save brand channel")
+def _find_by_opportunity(conn: sqlite3.Connection, opp_id: str) -> dict | None:
+    row = conn.execute(
+        "SELECT body FROM brand_channel WHERE opportunity_id = ? LIMIT 1", (opp_id,),
+    ).fetchone()
+    return _loads(row[0]) if row else None
+
+
+def _insert_message(conn: sqlite3.Connection, message: dict) -> None:
+    """Insert one message and trim the table to the newest MAX_MESSAGES."""
+    with conn:
+        conn.execute(
+            "INSERT INTO brand_channel (id, opportunity_id, status, ts, body) VALUES (?, ?, ?, ?, ?)",
+            (message["id"], message["opportunity_id"], message["status"],
+             message["timestamp"], _dumps(message)),
+        )
+        conn.execute(
+            "DELETE FROM brand_channel WHERE rowid NOT IN "
+            "(SELECT rowid FROM brand_channel ORDER BY rowid DESC LIMIT ?)",
+            (MAX_MESSAGES,),
+        )
 
 
 def _publish_event(event_type: str, data: dict, summary: str = "") -> None:
@@ -87,18 +161,18 @@ def submit_opportunity(opportunity: dict) -> dict:
     from shared.brand_filter import assess_brand_fit
 
     msg_id = _generate_id()
-    now = datetime.now(ET).isoformat()
+    now = _now_iso()
 
     # Check for duplicate (same opportunity ID already in channel)
-    with _lock:
-        existing = _load_messages()
-        opp_id = opportunity.get("id", "")
-        if opp_id:
-            for m in existing:
-                if m.get("opportunity_id") == opp_id:
-                    return m  # Already submitted
-
-    # Run brand assessment
+    opp_id = opportunity.get("id", "")
+    if opp_id:
+        with _lock:
+            existing = _find_by_opportunity(_get_conn(), opp_id)
+        if existing:
+            return existing  # Already submitted
+
+    # Run brand assessment (slow LLM call — deliberately outside _lock so
+    # dashboard reads and other submissions are not blocked behind it)
     assessment = assess_brand_fit(opportunity)
     verdict = assessment.get("auto_verdict", "needs_review")
 
@@ -137,9 +211,15 @@ def submit_opportunity(opportunity: dict) -> dict:
     }
 
     with _lock:
-        messages = _load_messages()
-        messages.append(message)
-        _save_messages(messages)
+        # Re-check: a concurrent submit may have stored this opportunity while we assessed
+        if opp_id:
+            existing = _find_by_opportunity(_get_conn(), opp_id)
+            if existing:
+                return existing
+        try:
+            _insert_message(_get_conn(), message)
+        except Exception:
+            log.exception("Failed to save brand channel")
 
     # Publish event
     score = assessment.get("brand_fit_score", 0)
@@ -159,14 +239,21 @@ def get_messages(
     limit: int = 50,
 ) -> list[dict]:
     """Read channel messages with optional filters. Returns newest first."""
-    messages = _load_messages()
-
+    where = "WHERE 1=1"
+    params: list = []
     if status:
-        messages = [m for m in messages if m.get("status") == status]
+        where += " AND status = ?"
+        params.append(status)
     if recipient:
-        messages = [m for m in messages if recipient in m.get("recipients", [])]
+        where += " AND EXISTS (SELECT 1 FROM json_each(body, '$.recipients') WHERE value = ?)"
+        params.append(recipient)
 
-    return list(reversed(messages[-limit:]))
+    with _lock:
+        rows = _get_conn().execute(
+            f"SELECT body FROM brand_channel {where} ORDER BY rowid DESC LIMIT ?",
+            params + [limit],
+        ).fetchall()
+    return [_loads(r[0]) for r in rows]
 
 
 def update_status(
@@ -187,47 +274,57 @@ def update_status(
         Updated message dict, or None if not found.
     """
     with _lock:
-        messages = _load_messages()
-        for msg in messages:
-            if msg["id"] == message_id:
-                msg["status"] = new_status
-                entry = {
-                    "status": new_status,
-                    "at": datetime.now(ET).isoformat(),
-                    "by": by,
-                }
-                if notes:
-                    entry["notes"] = notes
-                msg.setdefault("status_history", []).append(entry)
-
-                if new_status == "content_planned":
-                    msg["lisa_action"] = {
-                        "planned_at": datetime.now(ET).isoformat(),
-                        "notes": notes,
-                    }
-
-                _save_messages(messages)
-
-                _publish_event(
-                    new_status,
-                    {"message_id": message_id, "by": by, "notes": notes},
-                    f"Brand opp {message_id} -> {new_status} by {by}",
+        conn = _get_conn()
+        row = conn.execute(
+            "SELECT body FROM brand_channel WHERE id = ?", (message_id,),
+        ).fetchone()
+        if row is None:
+            return None
+
+        msg = _loads(row[0])
+        msg["status"] = new_status
+        entry = {
+            "status": new_status,
+            "at": _now_iso(),
+            "by": by,
+        }
+        if notes:
+            entry["notes"] = notes
+        msg.setdefault("status_history", []).append(entry)
+
+        if new_status == "content_planned":
+            msg["lisa_action"] = {
+                "planned_at": _now_iso(),
+                "notes": notes,
+            }
+
+        try:
+            with conn:
+                conn.execute(
+                    "UPDATE brand_channel SET status = ?, body = ? WHERE id = ?",
+                    (new_status, _dumps(msg), message_id),
                 )
-                return msg
+        except Exception:
+            log.exception("Failed to save brand channel")
 
-    return None
+    _publish_event(
+        new_status,
+        {"message_id": message_id, "by": by, "notes": notes},
+        f"Brand opp {message_id} -> {new_status} by {by}",
+    )
+    return msg
 
 
 def get_channel_stats() -> dict:
     """Get pipeline counts by status."""
-    messages = _load_messages()
-    counts: dict[str, int] = {}
-    for m in messages:
-        s = m.get("status", "unknown")
-        counts[s] = counts.get(s, 0) + 1
+    with _lock:
+        rows = _get_conn().execute(
+            "SELECT status, COUNT(*) FROM brand_channel GROUP BY status"
+        ).fetchall()
+    counts: dict[str, int] = {s: n for s, n in rows}
 
     return {
-        "total": len(messages),
+        "total": sum(counts.values()),
         "by_status": counts,
         "approved": counts.get("approved", 0),
         "assessed": counts.get("assessed", 0),  # needs_review
@@ -3,38 +3,147 @@
 Evaluates opportunities against Soren's full brand identity:
   CHARACTER, CONTENT_PILLARS, SEO_KEYWORDS, CONTENT_RULES, values.
 
-Falls back to rule-based keyword matching if GPT-4o call fails.
+Triage runs on gpt-4o-mini; only borderline (needs_review) scores are
+re-assessed by full GPT-4o. Falls back to rule-based keyword matching if
+the GPT call fails.
 """
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
 import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 log = logging.getLogger(__name__)
 
+OPENAI_CHAT_URL = "https://api.openai.com/v1/chat/completions"
+MODEL_TRIAGE = "gpt-4o-mini"  # every opportunity
+MODEL_DEEP = "gpt-4o"  # only re-runs the needs_review band (40-69)
+MAX_PARALLEL_ASSESSMENTS = 20  # stay well under OpenAI TPM limits
+ASSESS_BATCH_SIZE = 20  # opportunities packed into one chat completion
+FIT_CACHE_DB = Path.home() / ".cache" / "soren" / "brand_fit.sqlite"
+FIT_CACHE_TTL_S = 7 * 86400
+# Part of the fit cache key: bump when the prompts, the JSON result spec or the
+# escalation band change, so cached verdicts from the old pipeline are not reused
+PROMPT_VERSION = 1
+
 # ── Load OpenAI API key from Soren's .env ──
 _SOREN_ENV = Path.home() / "soren-content" / ".env"
 _OPENAI_KEY: str | None = None
+_SOREN_ENV_VALUES: dict[str, str] | None = None
+
+
+def _soren_env() -> dict[str, str]:
+    """Parse Soren's .env once (python-dotenv when installed; handles quotes/comments)."""
+    global _SOREN_ENV_VALUES
+    if _SOREN_ENV_VALUES is not None:
+        return _SOREN_ENV_VALUES
+    if not _SOREN_ENV.exists():
+        return {}  # not cached: the file may appear later
+    try:
+        from dotenv import dotenv_values
+        values = {k: v for k, v in dotenv_values(_SOREN_ENV).items() if v is not None}
+    except ImportError:
+        values = {}
+        for line in _SOREN_ENV.read_text().splitlines():
+            line = line.strip()
+            if not line or line.startswith("#") or "=" not in line:
+                continue
+            k, v = line.split("=", 1)
+            k = k.removeprefix("export ").strip()
+            v = v.strip()
+            if len(v) >= 2 and v[0] == v[-1] and v[0] in "'\"":
+                v = v[1:-1]
+            else:
+                v = v.split(" #", 1)[0].rstrip()
+            values[k] = v
+    _SOREN_ENV_VALUES = values
+    return values
 
 
 def _get_openai_key() -> str | None:
     global _OPENAI_KEY
-    if _OPENAI_KEY:
-        return _OPENAI_KEY
-    # Check env var first
-    key = os.environ.get("OPENAI_API_KEY")
-    if key:
-        _OPENAI_KEY = key
-        return key
-    # Parse from Soren's .env
-    if _SOREN_ENV.exists():
-        for line in _SOREN_ENV.read_text().splitlines():
-            if line.startswith("OPENAI_API_KEY="):
-                _OPENAI_KEY = line.split("=", 1)[1].strip()
-                return _OPENAI_KEY
-    return None
+    if not _OPENAI_KEY:
+        # Env var wins over Soren's .env
+        _OPENAI_KEY = os.environ.get("OPENAI_API_KEY") or _soren_env().get("OPENAI_API_KEY") or None
+    return _OPENAI_KEY
+
+
+# ── Pooled HTTP session (keep-alive: one TLS handshake reused across calls) ──
+_session = None
+_session_lock = threading.Lock()
+
+
+def _get_session():
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=MAX_PARALLEL_ASSESSMENTS)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
+
+# ── Assessment cache (content-addressed: same opportunity text -> same verdict) ──
+_cache_conn: sqlite3.Connection | None = None
+_cache_lock = threading.Lock()
+
+
+def _cache_key(opportunity: dict) -> str:
+    # Key on exactly the fields the model sees plus the models and prompt version
+    # that produced the verdict, so neither side can change unnoticed
+    canon = json.dumps(
+        [MODEL_TRIAGE, MODEL_DEEP, PROMPT_VERSION, _opp_summary(opportunity)],
+        sort_keys=True, default=str,
+    )
+    return hashlib.sha1(canon.encode()).hexdigest()
+
+
+def _get_cache_conn() -> sqlite3.Connection:
+    global _cache_conn
+    if _cache_conn is None:
+        FIT_CACHE_DB.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(FIT_CACHE_DB), check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute("CREATE TABLE IF NOT EXISTS fit (key TEXT PRIMARY KEY, json TEXT NOT NULL, ts INTEGER NOT NULL)")
+        _cache_conn = conn
+    return _cache_conn
+
+
+def _cache_get(key: str) -> dict | None:
+    try:
+        with _cache_lock:
+            row = _get_cache_conn().execute(
+                "SELECT json FROM fit WHERE key = ? AND ts >= ?",
+                (key, int(time.time()) - FIT_CACHE_TTL_S),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+    except (sqlite3.Error, OSError, ValueError):
+        log.debug("Brand fit cache read failed (non-critical)")
+        return None
+
+
+def _cache_put(key: str, result: dict) -> None:
+    try:
+        with _cache_lock:
+            conn = _get_cache_conn()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO fit (key, json, ts) VALUES (?, ?, ?)",
+                    (key, json.dumps(result, default=str), int(time.time())),
+                )
+    except (sqlite3.Error, OSError):
+        log.debug("Brand fit cache write failed (non-critical)")
 
 
 # ── Soren Brand Context (embedded for speed — no import from soren-content) ──
@@ -121,6 +230,84 @@ _BRAND_KEYWORDS = {
                 "dopamine", "self discipline"],
 }
 
+_OPP_KEYWORDS = [
+    ("brand deal", 15), ("sponsorship", 15), ("affiliate", 15), ("ambassador", 15),
+    ("partnership", 12), ("commission", 12), ("creator program", 15),
+    ("influencer", 10), ("ugc", 12), ("monetiz", 10),
+    ("trending", 8), ("viral", 8),
+]
+
+_BONUS_PHRASES = ("dark motivation", "lone wolf", "sigma", "stoic mindset")
+
+_PILLAR_KEYWORDS = {
+    "dark_motivation": ["motivation", "dark", "discipline", "pain", "growth"],
+    "gym_warrior": ["gym", "workout", "fitness", "lifting", "supplement"],
+    "lone_wolf_lifestyle": ["lone wolf", "solo", "alone", "sigma"],
+    "wisdom_quotes": ["quotes", "wisdom", "philosophy"],
+    "stoic_lessons": ["stoic", "marcus aurelius", "stoicism", "epictetus"],
+    "heartbreak_to_power": ["heartbreak", "breakup", "rebuild"],
+    "mindset_monologue": ["mindset", "mentality", "focus"],
+    "dark_humor": ["humor", "meme", "satire"],
+    "night_rituals": ["routine", "journal", "evening"],
+    "progress_showcase": ["transformation", "before after", "glow up"],
+}
+
+
+def _build_keyword_patterns():
+    """One table for every rule-based keyword: kw -> ((kind, key, weight), ...).
+
+    kind is "niche" (weight), "opp" (points), "pillar" (pillar name), "bonus",
+    or "value" (index into SOREN_VALUES). Built once at import.
+    """
+    patterns: dict[str, list[tuple]] = {}
+    niche_total = 0
+    for category, keywords in _BRAND_KEYWORDS.items():
+        weight = 3 if category == "core" else 2
+        for kw in keywords:
+            niche_total += weight
+            patterns.setdefault(kw, []).append(("niche", category, weight))
+    for kw, pts in _OPP_KEYWORDS:
+        patterns.setdefault(kw, []).append(("opp", kw, pts))
+    for pillar, kws in _PILLAR_KEYWORDS.items():
+        for kw in kws:
+            patterns.setdefault(kw, []).append(("pillar", pillar, 1))
+    for kw in _BONUS_PHRASES:
+        patterns.setdefault(kw, []).append(("bonus", kw, 0))
+    for idx, value in enumerate(SOREN_VALUES):
+        for word in dict.fromkeys(value.lower().split()):
+            patterns.setdefault(word, []).append(("value", idx, 0))
+    return {kw: tuple(tags) for kw, tags in patterns.items()}, niche_total
+
+
+ALL_PATTERNS, _NICHE_TOTAL = _build_keyword_patterns()
+_ALL_KEYWORDS = tuple(ALL_PATTERNS)
+
+_KW_AUTOMATON = None  # built on first rule-based assessment; False if pyahocorasick is missing
+
+
+def _get_automaton():
+    global _KW_AUTOMATON
+    if _KW_AUTOMATON is None:
+        try:
+            import ahocorasick
+        except ImportError:  # optional speedup; substring scan is the fallback
+            _KW_AUTOMATON = False
+            return _KW_AUTOMATON
+        automaton = ahocorasick.Automaton()
+        for kw in _ALL_KEYWORDS:
+            automaton.add_word(kw, kw)
+        automaton.make_automaton()
+        _KW_AUTOMATON = automaton
+    return _KW_AUTOMATON
+
+
+def _matched_keywords(text: str) -> set[str]:
+    """Every rule-based keyword occurring in text (substring semantics, one pass)."""
+    automaton = _get_automaton()
+    if automaton:
+        return {kw for _, kw in automaton.iter(text)}
+    return {kw for kw in _ALL_KEYWORDS if kw in text}
+
 
 def assess_brand_fit(opportunity: dict) -> dict:
     """Assess an opportunity's brand fit using GPT-4o, with rule-based fallback.
@@ -134,79 +321,197 @@ def assess_brand_fit(opportunity: dict) -> dict:
     """
     key = _get_openai_key()
     if key:
+        cache_key = _cache_key(opportunity)
+        cached = _cache_get(cache_key)
+        if cached is not None:
+            return cached
         try:
-            return _gpt4o_assess(opportunity, key)
+            result = _gpt4o_assess(opportunity, key)
+            _cache_put(cache_key, result)  # only GPT verdicts; fallbacks retry next time
+            return result
+        except ValueError:
+            log.warning("GPT-4o returned unparseable JSON, falling back to rule-based")
         except Exception:
             log.exception("GPT-4o brand assessment failed, falling back to rule-based")
 
     return _rule_based_assess(opportunity)
 
 
-def _gpt4o_assess(opportunity: dict, api_key: str) -> dict:
-    """Call GPT-4o for deep semantic brand assessment."""
-    import requests
+def assess_brand_fit_many(opportunities: list[dict]) -> list[dict]:
+    """Assess several opportunities; results keep input order.
+
+    Cache misses are packed ASSESS_BATCH_SIZE per chat completion (brand
+    context sent once per batch), and batches run concurrently over the
+    pooled session. Items a batch fails to return go through the single
+    assess_brand_fit path.
+    """
+    key = _get_openai_key()
+    if not key or len(opportunities) <= 1:
+        return [assess_brand_fit(o) for o in opportunities]
+
+    results: list[dict | None] = [None] * len(opportunities)
+    misses: list[int] = []
+    for i, opp in enumerate(opportunities):
+        cached = _cache_get(_cache_key(opp))
+        if cached is not None:
+            results[i] = cached
+        else:
+            misses.append(i)
+
+    chunks = [misses[n:n + ASSESS_BATCH_SIZE] for n in range(0, len(misses), ASSESS_BATCH_SIZE)]
+    if chunks:
+        workers = min(MAX_PARALLEL_ASSESSMENTS, len(chunks))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="brand_fit") as pool:
+            batches = pool.map(
+                lambda idx: _gpt4o_assess_batch([opportunities[i] for i in idx], key), chunks,
+            )
+            for idx, batch in zip(chunks, batches):
+                for i, result in zip(idx, batch):
+                    if result is not None:
+                        _cache_put(_cache_key(opportunities[i]), result)
+                        results[i] = result
+
+    return [r if r is not None else assess_brand_fit(opportunities[i]) for i, r in enumerate(results)]
+
+
+def _verdict_for(score) -> str:
+    if score >= 70:
+        return "auto_approved"
+    if score >= 40:
+        return "needs_review"
+    return "auto_rejected"
+
+
+def _chat_json(prompt: str, model: str, api_key: str, max_tokens: int = 500) -> dict:
+    """One JSON-mode chat completion over the pooled session."""
+    resp = _get_session().post(
+        OPENAI_CHAT_URL,
+        headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
+        json={
+            "model": model,
+            "messages": [{"role": "user", "content": prompt}],
+            "temperature": 0.3,
+            "max_tokens": max_tokens,
+            "response_format": {"type": "json_object"},
+        },
+        timeout=30,
+    )
+    resp.raise_for_status()
+    content = resp.json()["choices"][0]["message"]["content"]
+    return json.loads(content)  # JSON mode guarantees an object, no fencing
 
-    opp_text = json.dumps({
+
+def _chat_errors() -> tuple[type[Exception], ...]:
+    """Ways a _chat_json call fails: HTTP/network errors and malformed responses."""
+    import requests  # already loaded by _get_session() whenever a call was made
+
+    return (requests.RequestException, ValueError, KeyError, IndexError, TypeError)
+
+
+def _opp_summary(opportunity: dict) -> dict:
+    return {
         "title": opportunity.get("title", ""),
         "description": opportunity.get("description", ""),
         "type": opportunity.get("type", ""),
         "category": opportunity.get("category", ""),
         "url": opportunity.get("url", ""),
         "estimated_value": opportunity.get("estimated_value", ""),
-    }, indent=2)
-
-    prompt = f"""You are a brand strategist for Soren, a dark motivation content creator.
-
-{SOREN_BRAND_CONTEXT}
+    }
 
-## Opportunity to Assess
-{opp_text}
 
-## Task
-Evaluate this opportunity's fit with Soren's brand identity. Return a JSON object with these exact keys:
-
-1. "brand_fit_score": integer 0-100 (how well does this match Soren's brand DNA?)
+_RESULT_KEYS_SPEC = """1. "brand_fit_score": integer 0-100 (how well does this match Soren's brand DNA?)
 2. "pillar_match": string — best matching content pillar from the 10 listed (use snake_case name, or "none" if no match)
 3. "archetype_alignment": string — "Strong", "Moderate", "Weak", or "Misaligned"
 4. "value_alignment": list of strings — which of Soren's 7 values this maps to (empty list if none)
 5. "content_suggestion": string — concrete content idea if Soren were to act on this (format, caption direction, which pillar)
 6. "risk_flags": list of strings — any brand misalignment risks, copyright issues, reputation risks (empty list if clean)
 7. "auto_verdict": string — "auto_approved" if score >= 70, "needs_review" if 40-69, "auto_rejected" if < 40
-8. "reasoning": string — 1-2 sentence explanation of the score
+8. "reasoning": string — 1-2 sentence explanation of the score"""
 
-Return ONLY the JSON object, no markdown fencing, no extra text."""
+# Static prompt halves, built once: only the compact opportunity JSON varies per call
+_PROMPT_HEAD = f"""You are a brand strategist for Soren, a dark motivation content creator.
 
-    resp = requests.post(
-        "https://api.openai.com/v1/chat/completions",
-        headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
-        json={
-            "model": "gpt-4o",
-            "messages": [{"role": "user", "content": prompt}],
-            "temperature": 0.3,
-            "max_tokens": 500,
-        },
-        timeout=30,
+{SOREN_BRAND_CONTEXT}
+"""
+
+PROMPT_PREFIX = _PROMPT_HEAD + "\n## Opportunity to Assess\n"
+PROMPT_SUFFIX = f"""
+
+## Task
+Evaluate this opportunity's fit with Soren's brand identity. Return a JSON object with these exact keys:
+
+{_RESULT_KEYS_SPEC}
+
+Return ONLY the JSON object."""
+
+BATCH_PROMPT_PREFIX = _PROMPT_HEAD + "\n## Opportunities to Assess\n"
+BATCH_PROMPT_SUFFIX = f"""
+
+## Task
+Evaluate each opportunity's fit with Soren's brand identity. Return a JSON object {{"results": [...]}}
+with one entry per opportunity. Each entry has "id" (the opportunity's id) plus these exact keys:
+
+{_RESULT_KEYS_SPEC}
+
+Return ONLY the JSON object."""
+
+_COMPACT = (",", ":")
+
+
+def _gpt4o_assess_batch(opportunities: list[dict], api_key: str) -> list[dict | None]:
+    """Triage a batch of opportunities in one chat completion.
+
+    Returns one result per input (None where the model omitted an item or
+    the call failed); needs_review items are escalated individually.
+    """
+    opps_text = json.dumps(
+        [{"id": i, **_opp_summary(o)} for i, o in enumerate(opportunities)], separators=_COMPACT,
     )
-    resp.raise_for_status()
-    content = resp.json()["choices"][0]["message"]["content"].strip()
+    prompt = BATCH_PROMPT_PREFIX + opps_text + BATCH_PROMPT_SUFFIX
+
+    out: list[dict | None] = [None] * len(opportunities)
+    try:
+        data = _chat_json(prompt, MODEL_TRIAGE, api_key, max_tokens=400 * len(opportunities))
+    except _chat_errors():
+        log.warning("Batch brand assessment failed for %d opportunities", len(opportunities))
+        return out
+
+    for item in data.get("results", []):
+        if not isinstance(item, dict):
+            continue
+        idx = item.pop("id", None)
+        if isinstance(idx, int) and 0 <= idx < len(out) and out[idx] is None:
+            item["auto_verdict"] = _verdict_for(item.get("brand_fit_score", 0))
+            out[idx] = item
+
+    for i, result in enumerate(out):
+        if result is not None and result["auto_verdict"] == "needs_review":
+            try:
+                deep = _chat_json(_assess_prompt(opportunities[i]), MODEL_DEEP, api_key)
+                deep["auto_verdict"] = _verdict_for(deep.get("brand_fit_score", 0))
+                out[i] = deep
+            except _chat_errors():
+                log.warning("GPT-4o escalation failed, keeping %s verdict", MODEL_TRIAGE)
+    return out
+
+
+def _assess_prompt(opportunity: dict) -> str:
+    return PROMPT_PREFIX + json.dumps(_opp_summary(opportunity), separators=_COMPACT) + PROMPT_SUFFIX
 
-    # Strip markdown fencing if present
-    if content.startswith("```"):
-        content = content.split("\n", 1)[1] if "\n" in content else content[3:]
-        if content.endswith("```"):
-            content = content[:-3]
-        content = content.strip()
 
-    result = json.loads(content)
+def _gpt4o_assess(opportunity: dict, api_key: str) -> dict:
+    """Semantic brand assessment: gpt-4o-mini triage, gpt-4o for borderline scores."""
+    prompt = _assess_prompt(opportunity)
+    result = _chat_json(prompt, MODEL_TRIAGE, api_key)
+    result["auto_verdict"] = _verdict_for(result.get("brand_fit_score", 0))
 
-    # Enforce verdict tiers
-    score = result.get("brand_fit_score", 0)
-    if score >= 70:
-        result["auto_verdict"] = "auto_approved"
-    elif score >= 40:
-        result["auto_verdict"] = "needs_review"
-    else:
-        result["auto_verdict"] = "auto_rejected"
+    # Escalate only the needs_review band to the full model
+    if result["auto_verdict"] == "needs_review":
+        try:
+            result = _chat_json(prompt, MODEL_DEEP, api_key)
+            result["auto_verdict"] = _verdict_for(result.get("brand_fit_score", 0))
+        except _chat_errors():
+            log.warning("GPT-4o escalation failed, keeping %s verdict", MODEL_TRIAGE)
 
     return result
 
@@ -215,55 +520,44 @@ def _rule_based_assess(opportunity: dict) -> dict:
     """Fallback: rule-based keyword matching (same logic as soren_scout._score_brand_fit)."""
     text = f"{opportunity.get('title', '')} {opportunity.get('description', '')}".lower()
 
-    # Niche keyword scoring
+    # Single dispatch over the matched keywords feeds every accumulator
     niche_hits = 0
-    niche_total = 0
-    for category, keywords in _BRAND_KEYWORDS.items():
-        weight = 3 if category == "core" else 2
-        for kw in keywords:
-            niche_total += weight
-            if kw in text:
+    opp_points = 0
+    bonus = False
+    pillar_hits = dict.fromkeys(_PILLAR_KEYWORDS, 0)
+    value_hits: set[int] = set()
+    for kw in _matched_keywords(text):
+        for kind, key, weight in ALL_PATTERNS[kw]:
+            if kind == "niche":
                 niche_hits += weight
-    niche_score = (niche_hits / max(niche_total, 1)) * 100
-
-    # Opportunity relevance
-    opp_keywords = [
-        ("brand deal", 15), ("sponsorship", 15), ("affiliate", 15), ("ambassador", 15),
-        ("partnership", 12), ("commission", 12), ("creator program", 15),
-        ("influencer", 10), ("ugc", 12), ("monetiz", 10),
-        ("trending", 8), ("viral", 8),
-    ]
-    opp_score = min(100, sum(pts for kw, pts in opp_keywords if kw in text))
+            elif kind == "opp":
+                opp_points += weight
+            elif kind == "pillar":
+                pillar_hits[key] += 1
+            elif kind == "value":
+                value_hits.add(key)
+            else:
+                bonus = True
+
+    niche_score = (niche_hits / max(_NICHE_TOTAL, 1)) * 100
+    opp_score = min(100, opp_points)
 
     raw = niche_score * 0.4 + opp_score * 0.6
-    if any(phrase in text for phrase in ["dark motivation", "lone wolf", "sigma", "stoic mindset"]):
+    if bonus:
         raw = min(100, raw + 25)
 
     score = min(100, max(0, int(raw)))
 
-    # Determine pillar match
-    pillar_keywords = {
-        "dark_motivation": ["motivation", "dark", "discipline", "pain", "growth"],
-        "gym_warrior": ["gym", "workout", "fitness", "lifting", "supplement"],
-        "lone_wolf_lifestyle": ["lone wolf", "solo", "alone", "sigma"],
-        "wisdom_quotes": ["quotes", "wisdom", "philosophy"],
-        "stoic_lessons": ["stoic", "marcus aurelius", "stoicism", "epictetus"],
-        "heartbreak_to_power": ["heartbreak", "breakup", "rebuild"],
-        "mindset_monologue": ["mindset", "mentality", "focus"],
-        "dark_humor": ["humor", "meme", "satire"],
-        "night_rituals": ["routine", "journal", "evening"],
-        "progress_showcase": ["transformation", "before after", "glow up"],
-    }
+    # Determine pillar match (ties go to the earliest pillar, as before)
     best_pillar = "none"
     best_pillar_score = 0
-    for pillar, kws in pillar_keywords.items():
-        hits = sum(1 for kw in kws if kw in text)
+    for pillar, hits in pillar_hits.items():
         if hits > best_pillar_score:
             best_pillar_score = hits
             best_pillar = pillar
 
-    # Value alignment
-    matched_values = [v for v in SOREN_VALUES if any(w in text for w in v.lower().split())]
+    # Value alignment (in SOREN_VALUES order)
+    matched_values = [v for idx, v in enumerate(SOREN_VALUES) if idx in value_hits]
 
     # Archetype alignment
     if score >= 70:
@@ -1,9 +1,19 @@
 """Clean up Brotherhood Progress Sheet — remove bad rows, fix descriptions, re-sequence."""
-import openpyxl
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils import get_column_letter
+import io
 from pathlib import Path
 
+# Theme colors and xlsxwriter helpers shared with progress.py and redesign_sheet.py
+try:
+    from shared.sheet_theme import AGENT_BRAND_COLORS, BORDER_COLOR, TYPE_COLORS
+    from shared.sheet_theme import DEFAULT_TYPE_COLOR as DEFAULT_TC
+    from shared.sheet_theme import xlsx_format_cache as _format_cache
+    from shared.sheet_theme import xlsx_num_format as _num_format
+except ImportError:  # running from inside ~/shared
+    from sheet_theme import AGENT_BRAND_COLORS, BORDER_COLOR, TYPE_COLORS
+    from sheet_theme import DEFAULT_TYPE_COLOR as DEFAULT_TC
+    from sheet_theme import xlsx_format_cache as _format_cache
+    from sheet_theme import xlsx_num_format as _num_format
+
 SRC = Path.home() / "Desktop" / "brotherhood_progress.xlsx"
 DEST_PATHS = [
     Path.home() / "Desktop" / "brotherhood_progress.xlsx",
@@ -36,26 +46,18 @@ FIX_ROWS = {
          "description": "Process monitoring via pattern matching in Robotox monitor.py. LaunchAgent labels defined in config for Hawk/Viper but launchctl management handled by dashboard system routes, not Robotox directly."},
 }
 
-# === Theme colors (same as redesign_sheet.py) ===
+# seq -> (agent, type, change, description) overrides; None keeps the cell as-is
+_FIX_COMPILED = {
+    seq: (f.get("agent"), f.get("type"), f.get("change"), f.get("description"))
+    for seq, f in FIX_ROWS.items()
+}
+
+# === Theme colors ===
 HEADER_BG = "1A1A2E"
 HEADER_FG = "FFFFFF"
 HEADER_ACCENT = "FFD700"
-BORDER_COLOR = "2A2A3E"
-
-TYPE_COLORS = {
-    "Feature":     {"badge_bg": "1E3A5F", "badge_fg": "5DADE2", "row_bg": "0D1B2A"},
-    "Fix":         {"badge_bg": "5C2D00", "badge_fg": "FF9F43", "row_bg": "1A1200"},
-    "Upgrade":     {"badge_bg": "0D3B1E", "badge_fg": "2ECC71", "row_bg": "0A1A0D"},
-    "Integration": {"badge_bg": "2D1B4E", "badge_fg": "A569BD", "row_bg": "150D22"},
-}
-DEFAULT_TC = {"badge_bg": "2A2A2A", "badge_fg": "AAAAAA", "row_bg": "111111"}
 
-AGENT_COLORS = {
-    "Garves": "00D4FF", "Soren": "CC66FF", "Shelby": "FFAA00",
-    "Atlas": "22AA44", "Lisa": "FF8800", "Robotox": "00FF44",
-    "Thor": "FF6600", "Hawk": "FFD700", "Viper": "00FF88",
-    "System": "888888", "Dashboard": "888888", "Lisa+Soren": "CC66FF",
-}
+AGENT_COLORS = {**AGENT_BRAND_COLORS, "Lisa+Soren": "CC66FF"}
 
 COLUMNS = [
     ("#",           6,   "center"),
@@ -69,62 +71,110 @@ COLUMNS = [
     ("Status",      12,  "center"),
 ]
 
-thin_side = Side(style="thin", color=BORDER_COLOR)
-THIN_BORDER = Border(left=thin_side, right=thin_side, top=thin_side, bottom=thin_side)
-DARK_BG = PatternFill(start_color="0F0F1A", end_color="0F0F1A", fill_type="solid")
+COL_ALIGN = ["center", "center", "center", "center", "center", "left", "left", "center", "center"]
+STATUS_FONT = {
+    "Done":        {"bold": True, "font_color": "#2ECC71"},
+    "In Progress": {"bold": True, "font_color": "#F39C12"},
+}
 
 
-def style_row(ws, row_num, agent, type_val):
+def _cell_format(fmt, col, agent, type_val, status_val, num_format=None):
     tc = TYPE_COLORS.get(type_val, DEFAULT_TC)
-    row_fill = PatternFill(start_color=tc["row_bg"], end_color=tc["row_bg"], fill_type="solid")
-    badge_fill = PatternFill(start_color=tc["badge_bg"], end_color=tc["badge_bg"], fill_type="solid")
-    agent_color = AGENT_COLORS.get(agent, "AAAAAA")
-    col_align = ["center", "center", "center", "center", "center", "left", "left", "center", "center"]
-
-    ws.row_dimensions[row_num].height = 28
-
-    for col in range(1, 10):
-        cell = ws.cell(row=row_num, column=col)
-        cell.border = THIN_BORDER
-        cell.alignment = Alignment(horizontal=col_align[col-1], vertical="center", wrap_text=(col in (6, 7)))
-
-        if col == 1:
-            cell.font = Font(name="Calibri", size=12, color="666688")
-            cell.fill = row_fill
-        elif col == 4:
-            cell.font = Font(name="Calibri", size=13, bold=True, color=agent_color)
-            cell.fill = row_fill
-        elif col == 5:
-            cell.font = Font(name="Calibri", size=12, bold=True, color=tc["badge_fg"])
-            cell.fill = badge_fill
-        elif col == 6:
-            cell.font = Font(name="Calibri", size=13, bold=True, color="E0E0E0")
-            cell.fill = row_fill
-        elif col == 7:
-            cell.font = Font(name="Calibri", size=12, color="B0B0C0")
-            cell.fill = row_fill
-        elif col == 9:
-            status_val = str(cell.value or "")
-            if status_val == "Done":
-                cell.font = Font(name="Calibri", size=12, bold=True, color="2ECC71")
-            elif status_val == "In Progress":
-                cell.font = Font(name="Calibri", size=12, bold=True, color="F39C12")
-            else:
-                cell.font = Font(name="Calibri", size=12, color="AAAAAA")
-            cell.fill = row_fill
+    base = {
+        "font_name": "Calibri", "font_size": 12, "font_color": "#9999AA",
+        "bg_color": f"#{tc['row_bg']}", "pattern": 1,
+        "border": 1, "border_color": f"#{BORDER_COLOR}",
+        "align": COL_ALIGN[col], "valign": "vcenter", "text_wrap": col in (5, 6),
+    }
+    if col == 0:
+        base["font_color"] = "#666688"
+    elif col == 3:
+        base.update(font_size=13, bold=True, font_color=f"#{AGENT_COLORS.get(agent, 'AAAAAA')}")
+    elif col == 4:
+        base.update(bold=True, font_color=f"#{tc['badge_fg']}", bg_color=f"#{tc['badge_bg']}")
+    elif col == 5:
+        base.update(font_size=13, bold=True, font_color="#E0E0E0")
+    elif col == 6:
+        base["font_color"] = "#B0B0C0"
+    elif col == 8:
+        base.update(STATUS_FONT.get(status_val, {"font_color": "#AAAAAA"}))
+    if num_format:
+        base["num_format"] = num_format
+    return fmt(**base)
+
+
+def _build_workbook(clean_rows) -> bytes:
+    """Build the cleaned, re-sequenced sheet once and return the .xlsx bytes."""
+    import xlsxwriter
+
+    buf = io.BytesIO()
+    wb = xlsxwriter.Workbook(buf, {"in_memory": True, "strings_to_urls": False})
+    ws = wb.add_worksheet("Brotherhood Progress")
+    ws.set_tab_color("#FFD700")
+    fmt = _format_cache(wb)
+
+    # Set column widths
+    for i, (header, width, _) in enumerate(COLUMNS):
+        ws.set_column(i, i, width)
+
+    # Header row
+    header_fmt = fmt(
+        font_name="Calibri", font_size=16, bold=True, font_color=f"#{HEADER_FG}",
+        bg_color=f"#{HEADER_BG}", pattern=1, align="center", valign="vcenter",
+        border=1, border_color=f"#{BORDER_COLOR}", bottom=2, bottom_color=f"#{HEADER_ACCENT}",
+    )
+    ws.set_row(0, 36)
+    for i, (header, _, _) in enumerate(COLUMNS):
+        ws.write_string(0, i, header, header_fmt)
+    ws.freeze_panes(1, 0)
+
+    # Write clean rows with re-sequenced numbers
+    for idx, row in enumerate(clean_rows):
+        row_num = idx + 1
+        new_seq = idx + 1
+
+        # Pad row to 9 columns if needed (old 8-col rows)
+        while len(row) < 9:
+            row.append(None)
+
+        date_val = row[1] or ""
+        time_val = row[2] or ""
+        agent = str(row[3] or "System")
+        type_val = str(row[4] or "Feature")
+        change = str(row[5] or "")
+        desc = str(row[6] or "")
+        duration = str(row[7] or "--") if row[7] and str(row[7]) != "None" else "--"
+
+        # Old format had status in col 8 (index 7), new format has duration in 8, status in 9
+        # Detect: if col 8 is "Done"/"In Progress"/"Blocked", it's the old status column
+        if duration in ("Done", "In Progress", "Blocked"):
+            status = duration
+            duration = "--"
         else:
-            cell.font = Font(name="Calibri", size=12, color="9999AA")
-            cell.fill = row_fill
+            status = str(row[8] or "Done") if row[8] and str(row[8]) != "None" else "Done"
+
+        values = [new_seq, date_val, time_val, agent, type_val, change, desc, duration, status]
+        ws.set_row(row_num, 28)
+        for col_idx, val in enumerate(values):
+            ws.write(row_num, col_idx, val,
+                     _cell_format(fmt, col_idx, agent, type_val, status, _num_format(val)))
+
+    # Auto-filter
+    ws.autofilter(0, 0, len(clean_rows), len(COLUMNS) - 1)
+    wb.close()
+    return buf.getvalue()
 
 
 def clean():
-    wb_old = openpyxl.load_workbook(str(SRC))
+    import openpyxl
+
+    # Streaming read; formatting and formulas from the old sheet are not needed
+    wb_old = openpyxl.load_workbook(str(SRC), read_only=True, data_only=True)
     ws_old = wb_old.active
 
     # Read all rows
-    all_rows = []
-    for row in ws_old.iter_rows(min_row=2, values_only=True):
-        all_rows.append(list(row))
+    all_rows = [list(row) for row in ws_old.iter_rows(min_row=2, values_only=True)]
+    wb_old.close()  # release the file handle before SRC is overwritten
 
     print(f"Read {len(all_rows)} total rows (including empty)")
 
@@ -135,7 +185,6 @@ def clean():
     for row in all_rows:
         seq = row[0]
         agent = str(row[3] or "") if len(row) > 3 else ""
-        type_val = str(row[4] or "") if len(row) > 4 else ""
         change = str(row[5] or "") if len(row) > 5 else ""
 
         # Skip empty/null rows
@@ -167,18 +216,17 @@ def clean():
             row[3] = "System"
 
         # Apply fixes
-        if seq_num in FIX_ROWS:
-            fixes = FIX_ROWS[seq_num]
-            if "change" in fixes:
-                row[5] = fixes["change"]
-            if "description" in fixes:
-                row[6] = fixes["description"]
-            if "type" in fixes:
-                row[4] = fixes["type"]
-            if "agent" in fixes:
-                row[3] = fixes["agent"]
+        fx = _FIX_COMPILED.get(seq_num)
+        if fx is not None:
+            fix_agent, fix_type, fix_change, fix_desc = fx
+            row[3:7] = [
+                row[3] if fix_agent is None else fix_agent,
+                row[4] if fix_type is None else fix_type,
+                row[5] if fix_change is None else fix_change,
+                row[6] if fix_desc is None else fix_desc,
+            ]
             removed["fixed"] += 1
-            print(f"  FIXED #{seq_num}: {fixes.get('change', change[:50])}")
+            print(f"  FIXED #{seq_num}: {fix_change if fix_change is not None else change[:50]}")
 
         clean_rows.append(row)
 
@@ -186,75 +234,12 @@ def clean():
           f"{removed['deleted']} deleted, {removed['fixed']} fixed")
     print(f"Clean rows: {len(clean_rows)}")
 
-    # Build new workbook
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "Brotherhood Progress"
-    ws.sheet_properties.tabColor = "FFD700"
-
-    # Set column widths
-    for i, (header, width, _) in enumerate(COLUMNS, 1):
-        ws.column_dimensions[get_column_letter(i)].width = width
-
-    # Header row
-    header_fill = PatternFill(start_color=HEADER_BG, end_color=HEADER_BG, fill_type="solid")
-    header_font = Font(name="Calibri", size=16, bold=True, color=HEADER_FG)
-    header_border = Border(
-        left=thin_side, right=thin_side,
-        top=Side(style="thin", color=BORDER_COLOR),
-        bottom=Side(style="medium", color=HEADER_ACCENT),
-    )
-
-    for i, (header, _, align) in enumerate(COLUMNS, 1):
-        cell = ws.cell(row=1, column=i, value=header)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = Alignment(horizontal="center", vertical="center")
-        cell.border = header_border
-
-    ws.row_dimensions[1].height = 36
-    ws.freeze_panes = "A2"
-
-    # Write clean rows with re-sequenced numbers
-    for idx, row in enumerate(clean_rows):
-        row_num = idx + 2
-        new_seq = idx + 1
-
-        # Pad row to 9 columns if needed (old 8-col rows)
-        while len(row) < 9:
-            row.append(None)
-
-        date_val = row[1] or ""
-        time_val = row[2] or ""
-        agent = str(row[3] or "System")
-        type_val = str(row[4] or "Feature")
-        change = str(row[5] or "")
-        desc = str(row[6] or "")
-        duration = str(row[7] or "--") if row[7] and str(row[7]) != "None" else "--"
-
-        # Old format had status in col 8 (index 7), new format has duration in 8, status in 9
-        # Detect: if col 8 is "Done"/"In Progress"/"Blocked", it's the old status column
-        if duration in ("Done", "In Progress", "Blocked"):
-            status = duration
-            duration = "--"
-        else:
-            status = str(row[8] or "Done") if row[8] and str(row[8]) != "None" else "Done"
-
-        values = [new_seq, date_val, time_val, agent, type_val, change, desc, duration, status]
-        for col_idx, val in enumerate(values):
-            ws.cell(row=row_num, column=col_idx + 1, value=val)
-
-        style_row(ws, row_num, agent, type_val)
-
-    # Auto-filter
-    last_row = len(clean_rows) + 1
-    ws.auto_filter.ref = f"A1:{get_column_letter(len(COLUMNS))}{last_row}"
-
-    # Save
+    # Save: serialize once, copy the same bytes to every destination
+    data = _build_workbook(clean_rows)
     for dest in DEST_PATHS:
         try:
             dest.parent.mkdir(parents=True, exist_ok=True)
-            wb.save(str(dest))
+            dest.write_bytes(data)
             print(f"Saved: {dest}")
         except Exception as e:
             print(f"Failed: {dest}: {e}")
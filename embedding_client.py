@@ -4,21 +4,34 @@ Uses bge-small-en-v1.5 via mlx-embedding-models (~130MB RAM).
 Loads model lazily on first use. All agents can import this.
 
 Usage:
-    from shared.embedding_client import embed_text, semantic_search, cosine_similarity
+    from shared.embedding_client import embed_text, semantic_search, cosine_similarity, SemanticIndex
 
-    vec = embed_text("BTC drops on weekends")
+    vec = embed_text("BTC drops on weekends")          # float32 ndarray, shape (384,)
     results = semantic_search("crypto weekend pattern", corpus_texts, top_k=5)
     sim = cosine_similarity(vec_a, vec_b)
+
+    index = SemanticIndex(corpus_texts)               # encode once, query many times
+    results = index.search("crypto weekend pattern", top_k=5)
 """
 from __future__ import annotations
 
+import hashlib
 import json
 import logging
-import numpy as np
+import os
+import tempfile
 from pathlib import Path
 
 log = logging.getLogger(__name__)
 
+EMBEDDING_DIM = 384  # bge-small-en-v1.5
+HNSW_MIN_DOCS = 5000  # below this an exact matvec is as fast as an ANN lookup
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 128
+INDEX_CACHE_DIR = Path.home() / ".cache" / "soren"
+INDEX_CACHE_KEEP = 8  # corpora whose emb_/faiss_ files are kept; least recently used go first
+
 _model = None
 
 
@@ -56,21 +69,35 @@ def is_available() -> bool:
         return False
 
 
-def embed_text(text: str) -> list[float]:
-    """Embed a single text string. Returns 384-dim vector."""
-    return get_model().encode([text])[0].tolist()
+def embed_text(text: str):
+    """Embed a single text string. Returns a float32 ndarray of shape (384,)."""
+    import numpy as np
+
+    return np.asarray(get_model().encode([text])[0], dtype=np.float32)
+
 
+def embed_batch(texts: list[str]):
+    """Embed multiple texts at once. Returns a float32 ndarray of shape (N, 384).
+
+    More efficient than calling embed_text in a loop.
+    """
+    import numpy as np
 
-def embed_batch(texts: list[str]) -> list[list[float]]:
-    """Embed multiple texts at once. More efficient than calling embed_text in a loop."""
     if not texts:
-        return []
-    return get_model().encode(texts).tolist()
+        return np.empty((0, EMBEDDING_DIM), dtype=np.float32)
+    return np.ascontiguousarray(get_model().encode(texts), dtype=np.float32)
+
+
+def embed_text_list(text: str) -> list[float]:
+    """embed_text as a plain list, for callers that JSON-serialize the vector."""
+    return embed_text(text).tolist()
 
 
 def cosine_similarity(a, b) -> float:
-    """Compute cosine similarity between two vectors."""
-    a, b = np.array(a, dtype=np.float32), np.array(b, dtype=np.float32)
+    """Compute cosine similarity between two vectors (ndarrays or sequences)."""
+    import numpy as np
+
+    a, b = np.asarray(a, dtype=np.float32), np.asarray(b, dtype=np.float32)
     dot = np.dot(a, b)
     norm = np.linalg.norm(a) * np.linalg.norm(b)
     if norm < 1e-9:
@@ -78,23 +105,217 @@ def cosine_similarity(a, b) -> float:
     return float(dot / norm)
 
 
+def _write_cache_file(path: Path, write) -> None:
+    """Atomically create path via write(tmp_path), using a unique temp name.
+
+    Concurrent builders of the same corpus each write their own temp file, so
+    neither can truncate the other's half-written output before os.replace.
+    """
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.stem}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _evict_index_cache(keep: int = INDEX_CACHE_KEEP) -> None:
+    """Delete cached corpora beyond the `keep` most recently used (best-effort)."""
+    try:
+        entries = [(p.stat().st_mtime, p) for p in INDEX_CACHE_DIR.glob("emb_*.npy")]
+    except OSError:
+        return
+    entries.sort(reverse=True)
+    for _, p in entries[keep:]:
+        key = p.stem[len("emb_"):]
+        for stale in (p, INDEX_CACHE_DIR / f"faiss_{key}.bin"):
+            try:
+                stale.unlink()
+            except FileNotFoundError:
+                pass
+            except OSError:
+                log.debug("Could not evict %s", stale)
+
+
+def _normalize_rows(mat):
+    """L2-normalize rows into a contiguous float32 matrix."""
+    import numpy as np
+
+    mat = np.asarray(mat, dtype=np.float32)
+    return np.ascontiguousarray(mat / (np.linalg.norm(mat, axis=-1, keepdims=True) + 1e-9))
+
+
+def _top_k(scores, top_k: int) -> list[tuple[int, float]]:
+    """(index, score) of the top_k scores, descending. O(N) select + O(k log k) sort."""
+    import numpy as np
+
+    n = len(scores)
+    if top_k <= 0 or n == 0:
+        return []
+    if top_k < n:
+        idx = np.argpartition(-scores, top_k - 1)[:top_k]
+        idx = idx[np.argsort(-scores[idx], kind="stable")]
+    else:
+        idx = np.argsort(-scores, kind="stable")
+    return [(int(i), float(scores[i])) for i in idx]
+
+
+class SemanticIndex:
+    """Pre-normalized (N, 384) float32 corpus matrix for repeated queries.
+
+    Encode the corpus once, then each query is one matvec + argpartition:
+
+        index = SemanticIndex(corpus_texts)
+        index.search("crypto weekend pattern", top_k=5)
+
+    quantize=True stores the unit vectors as int8 (value * 127) instead:
+    4x less RAM and memory bandwidth for large corpora, at a small recall
+    cost on near-ties. The query stays float32.
+
+    Corpora of HNSW_MIN_DOCS or more are also indexed in a FAISS HNSW graph
+    (inner product on unit vectors = cosine) when faiss is installed, giving
+    sub-linear approximate search; pass ann=False to force the exact scan.
+    """
+
+    def __init__(
+        self,
+        texts: list[str],
+        embeddings=None,
+        quantize: bool = False,
+        ann: bool = True,
+        normalized: bool = False,
+    ):
+        import numpy as np
+
+        self.texts = list(texts)
+        if embeddings is None:
+            embeddings = embed_batch(self.texts)
+        # normalized=True: rows are already unit float32 (e.g. a read-only memmap) — use as-is
+        E = embeddings if normalized else _normalize_rows(embeddings)
+        if quantize:
+            self.E = None
+            self.Eq = np.round(E * 127).astype(np.int8)
+        else:
+            self.E = E
+            self.Eq = None
+        self.hnsw = self._build_hnsw(E) if ann and len(E) >= HNSW_MIN_DOCS else None
+
+    @staticmethod
+    def _build_hnsw(E, path: Path | None = None):
+        """Build (or load from path, when cached) the HNSW graph; None without faiss."""
+        try:
+            import faiss
+        except ImportError:
+            return None
+        if path is not None and path.exists():
+            try:
+                return faiss.read_index(str(path))
+            except RuntimeError:  # faiss reports unreadable/truncated files this way
+                log.warning("Corrupt HNSW cache %s — rebuilding", path)
+        index = faiss.IndexHNSWFlat(E.shape[1], HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+        index.add(E)
+        if path is not None:
+            _write_cache_file(path, lambda tmp: faiss.write_index(index, tmp))
+        return index
+
+    @classmethod
+    def from_cache_or_build(
+        cls, texts: list[str], quantize: bool = False, ann: bool = True,
+    ) -> SemanticIndex:
+        """Load the corpus matrix from disk if this exact corpus was indexed before.
+
+        The normalized matrix is saved as INDEX_CACHE_DIR/emb_<hash>.npy (keyed
+        by model + corpus content) and memory-mapped read-only on later runs,
+        so restarts skip model.encode and processes share the pages. The HNSW
+        graph, when built, is cached alongside as faiss_<hash>.bin. Only the
+        INDEX_CACHE_KEEP most recently used corpora are kept on disk.
+        """
+        import numpy as np
+
+        texts = list(texts)
+        model_name = _load_config().get("embedding", {}).get("model", "bge-small")
+        h = hashlib.sha1(model_name.encode())
+        for t in texts:
+            h.update(b"\0")
+            h.update(t.encode())
+        key = h.hexdigest()[:12]
+        INDEX_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        emb_path = INDEX_CACHE_DIR / f"emb_{key}.npy"
+
+        E = None
+        if emb_path.exists():
+            try:
+                E = np.load(emb_path, mmap_mode="r")
+                # The key covers the model, so any 2-D float32 matrix with one
+                # row per text is this corpus (the dimension is the model's)
+                if E.ndim != 2 or E.shape[0] != len(texts) or E.dtype != np.float32:
+                    E = None
+                else:
+                    os.utime(emb_path)  # mark as recently used for eviction
+            except (OSError, ValueError, EOFError):  # missing, truncated or not an .npy
+                E = None
+        if E is None:
+            E = _normalize_rows(embed_batch(texts))
+
+            def _save(tmp: str) -> None:
+                with open(tmp, "wb") as f:
+                    np.save(f, E)
+
+            _write_cache_file(emb_path, _save)
+            _evict_index_cache()
+
+        index = cls(texts, embeddings=E, quantize=quantize, ann=False, normalized=True)
+        if ann and len(texts) >= HNSW_MIN_DOCS:
+            index.hnsw = cls._build_hnsw(E, INDEX_CACHE_DIR / f"faiss_{key}.bin")
+        return index
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def search(self, query: str, top_k: int = 10) -> list[tuple[int, float]]:
+        """Return (index, similarity) pairs sorted by relevance, descending."""
+        if not self.texts:
+            return []
+        return self.search_vector(embed_text(query), top_k)
+
+    def search_vector(self, vec, top_k: int = 10) -> list[tuple[int, float]]:
+        """Like search(), for an already-embedded query vector."""
+        if not self.texts:
+            return []
+        v = _normalize_rows(vec)
+        if self.hnsw is not None:
+            k = min(top_k, len(self.texts))
+            if k <= 0:
+                return []
+            self.hnsw.hnsw.efSearch = max(HNSW_EF_SEARCH, k)
+            D, I = self.hnsw.search(v.reshape(1, -1), k)
+            return [(int(i), float(d)) for i, d in zip(I[0], D[0]) if i >= 0]
+        if self.Eq is not None:
+            import numpy as np
+
+            # einsum converts int8 rows blockwise, never materializing a float32 copy
+            scores = np.einsum("ij,j->i", self.Eq, v, dtype=np.float32) * (1.0 / 127)
+        else:
+            scores = self.E @ v
+        return _top_k(scores, top_k)
+
+
 def semantic_search(query: str, corpus_texts: list[str], top_k: int = 10) -> list[tuple[int, float]]:
     """Search corpus by semantic similarity to query.
 
     Returns list of (index, similarity_score) sorted by relevance, descending.
+    One-shot wrapper around SemanticIndex; reuse an index for repeated queries.
     """
     if not corpus_texts:
         return []
-    model = get_model()
     # Encode query + corpus together for efficiency
-    all_texts = [query] + corpus_texts
-    embeddings = model.encode(all_texts)
-    query_emb = embeddings[0]
-    corpus_embs = embeddings[1:]
-    # Cosine similarities via normalized dot product
-    query_norm = query_emb / (np.linalg.norm(query_emb) + 1e-9)
-    corpus_norms = np.linalg.norm(corpus_embs, axis=1, keepdims=True) + 1e-9
-    corpus_normed = corpus_embs / corpus_norms
-    scores = corpus_normed @ query_norm
-    top_indices = np.argsort(scores)[::-1][:top_k]
-    return [(int(i), float(scores[i])) for i in top_indices]
+    embeddings = embed_batch([query] + corpus_texts)
+    # One query: building an ANN graph would cost more than the exact scan it replaces
+    index = SemanticIndex(corpus_texts, embeddings=embeddings[1:], ann=False)
+    return index.search_vector(embeddings[0], top_k)
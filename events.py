@@ -7,29 +7,82 @@ from __future__ import annotations
 
 import atexit
 import fcntl
+import itertools
 import json
 import logging
+import mmap
 import os
+import re
+import shutil
 import signal
+import struct
 import time
 import threading
+from collections import Counter, deque
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 from pathlib import Path
 from typing import Any
 
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is the fallback
+    orjson = None
+
+# orjson parses bytes directly; stdlib json accepts bytes too
+_loads = orjson.loads if orjson is not None else json.loads
+
 log = logging.getLogger(__name__)
 
 ET = ZoneInfo("America/New_York")
 
 SHARED_DIR = Path(__file__).resolve().parent
 EVENTS_FILE = SHARED_DIR / "events.jsonl"
+IDX_FILE = SHARED_DIR / "events.idx"  # id -> byte offset sidecar
+META_FILE = SHARED_DIR / "events_meta.tsv"  # agent/type/severity columns for get_stats
 CURSORS_FILE = SHARED_DIR / "cursors.json"
 LOCK_FILE = SHARED_DIR / ".events.lock"
 ARCHIVE_DIR = SHARED_DIR / "data"
 
 _lock = threading.Lock()  # intra-process
-_file_lock_fd = None       # cross-process
+_file_lock_fd = None       # cross-process; LOCK_FILE fd, opened once and reused
+_file_lock_pid = None      # pid that opened _file_lock_fd (forked children reopen)
+# events.idx / events_meta.tsv append fds, kept open like the lock fd:
+# path -> (fd, inode). Reopened when a rebuild replaced the file, or after fork.
+_sidecar_fds: dict[Path, tuple[int, int]] = {}
+_sidecar_pid = None
+
+TAIL_SCAN_MAX_LIMIT = 1000  # get_events reads backward from EOF up to this limit
+# events.idx: fixed-width records (events-file inode, byte offset, event id).
+# Records whose inode is not the live file's (written before a prune/rotate
+# replaced it) are ignored; prune/rotate also rebuild the index.
+_IDX_REC = struct.Struct("<QQ24s")
+_idx_lock = threading.Lock()
+_idx: dict[str, Any] = {"ino": None, "size": 0, "map": {}}
+
+# events_meta.tsv: one row per event — events-file inode, end offset of the
+# event's line, agent, type, severity (tab-separated; \\ \t \n escaped). A row
+# with only inode and offset is a checkpoint written by a rebuild. get_stats
+# trusts the file only when its last row ends at the live file's inode and
+# size; otherwise it is rebuilt from events.jsonl.
+_META_ESC_RE = re.compile(r"\\(.)")
+# publish() writes id, ts, agent, type, severity first, in that order; for such
+# lines (with escape-free values) the columns are read without a JSON decode
+_META_LINE_RE = re.compile(
+    rb'\{"id":\s*"[^"\\]*",\s*"ts":\s*"[^"\\]*",\s*"agent":\s*"([^"\\]*)",'
+    rb'\s*"type":\s*"([^"\\]*)",\s*"severity":\s*"([^"\\]*)"'
+)
+_META_UNESC = {"t": "\t", "n": "\n"}
+
+PRUNE_EVERY = 500  # auto-prune after every Nth publish from this process
+_write_count = itertools.count(1)
+_prune_lock = threading.Lock()  # at most one background prune at a time
+
+# Parsed-events cache for _read_all(): only the bytes appended since the last
+# read are parsed. "head" is the file's first line — if it changes (prune/rotate
+# rewrote the file, possibly in another process) the cache is rebuilt.
+_cache_lock = threading.Lock()
+_cache: dict[str, Any] = {"events": [], "offset": 0, "ino": None, "head": b""}
 
 # --- Event Type Constants ---
 INSIGHT_FOUND = "insight_found"
@@ -53,19 +106,24 @@ def subscribe(agent_name: str, event_types: list[str]) -> None:
 
 
 def _acquire_file_lock():
-    """Acquire cross-process file lock for event bus writes."""
-    global _file_lock_fd
-    _file_lock_fd = open(LOCK_FILE, "w")
+    """Acquire cross-process file lock for event bus writes.
+
+    The lock fd is kept open for the life of the process. flock() locks belong
+    to the open file description, which a forked child shares with its parent,
+    so a child opens its own fd rather than reusing the inherited one.
+    """
+    global _file_lock_fd, _file_lock_pid
+    pid = os.getpid()
+    if _file_lock_fd is None or _file_lock_pid != pid:
+        _file_lock_fd = os.open(LOCK_FILE, os.O_WRONLY | os.O_CREAT | os.O_CLOEXEC, 0o644)
+        _file_lock_pid = pid
     fcntl.flock(_file_lock_fd, fcntl.LOCK_EX)
 
 
 def _release_file_lock():
-    """Release cross-process file lock."""
-    global _file_lock_fd
-    if _file_lock_fd:
+    """Release cross-process file lock (the fd stays open for reuse)."""
+    if _file_lock_fd is not None and _file_lock_pid == os.getpid():
         fcntl.flock(_file_lock_fd, fcntl.LOCK_UN)
-        _file_lock_fd.close()
-        _file_lock_fd = None
 
 
 def _cleanup_file_lock(*args):
@@ -82,6 +140,215 @@ for _sig in (signal.SIGTERM, signal.SIGINT):
         pass  # Can't set signal handlers in non-main thread
 
 
+def _dumps_line(event: dict) -> bytes:
+    """Serialize one event as a JSONL line (bytes, trailing newline included)."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                event, default=str, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS,
+            )
+        except TypeError:
+            pass  # e.g. ints beyond 64 bits — stdlib json handles them
+    try:
+        # Event fields are native JSON types; only caller-supplied `data` can
+        # hold datetimes/Paths/etc., so str() them only when that happens
+        return (json.dumps(event) + "\n").encode()
+    except TypeError:
+        return (json.dumps(event, default=str) + "\n").encode()
+
+
+def _append_bytes(payload: bytes) -> tuple[int, int]:
+    """Append to the events file with a single O_APPEND write() (caller holds the locks).
+
+    Returns (inode, offset) of the written line.
+    """
+    fd = os.open(EVENTS_FILE, os.O_WRONLY | os.O_APPEND | os.O_CREAT | os.O_CLOEXEC, 0o644)
+    try:
+        st = os.fstat(fd)
+        os.write(fd, payload)
+    finally:
+        os.close(fd)
+    return st.st_ino, st.st_size
+
+
+def _index_record(ino: int, offset: int, event_id: str) -> bytes:
+    return _IDX_REC.pack(ino, offset, event_id.encode()[:_IDX_REC.size - 16])
+
+
+def _sidecar_fd(path: Path) -> int:
+    """O_APPEND fd for a sidecar file, opened once and reused (caller holds the locks)."""
+    global _sidecar_pid
+    pid = os.getpid()
+    if _sidecar_pid != pid:
+        for fd, _ in _sidecar_fds.values():  # inherited across fork; the parent keeps its own
+            os.close(fd)
+        _sidecar_fds.clear()
+        _sidecar_pid = pid
+    cached = _sidecar_fds.get(path)
+    if cached is not None:
+        fd, ino = cached
+        try:
+            if os.stat(path).st_ino == ino:
+                return fd
+        except OSError:
+            pass
+        del _sidecar_fds[path]
+        os.close(fd)
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | os.O_CLOEXEC, 0o644)
+    _sidecar_fds[path] = (fd, os.fstat(fd).st_ino)
+    return fd
+
+
+def _append_index(records: bytes) -> None:
+    """Record where events landed (caller holds the locks; best-effort)."""
+    try:
+        os.write(_sidecar_fd(IDX_FILE), records)
+    except OSError:
+        log.debug("[EVENTS] index append failed (non-critical)")
+
+
+def _rebuild_index() -> None:
+    """Rewrite events.idx for the current events file (caller holds the locks)."""
+    try:
+        with open(EVENTS_FILE, "rb") as f:
+            ino = os.fstat(f.fileno()).st_ino
+            data = f.read()
+        recs = [
+            _index_record(ino, m.start(), m.group(1).decode())
+            for m in _LINE_ID_RE.finditer(data)
+        ]
+        tmp = IDX_FILE.with_name(IDX_FILE.name + ".new")
+        tmp.write_bytes(b"".join(recs))
+        os.replace(tmp, IDX_FILE)
+    except OSError:
+        log.debug("[EVENTS] index rebuild failed (non-critical)")
+
+
+def _index_offset(event_id: str) -> int | None:
+    """Byte offset of event_id in the live events file, from events.idx (None if unknown)."""
+    try:
+        ino = os.stat(EVENTS_FILE).st_ino
+        with open(IDX_FILE, "rb") as f, _idx_lock:
+            st = os.fstat(f.fileno())
+            size = st.st_size
+            if st.st_ino != _idx["ino"] or size < _idx["size"]:
+                _idx.update(ino=st.st_ino, size=0, map={})  # rebuilt by prune/rotate
+            start = _idx["size"]
+            end = start + (size - start) // _IDX_REC.size * _IDX_REC.size
+            if end > start:
+                f.seek(start)
+                id_map = _idx["map"]
+                # Keep the first record for an id: like the full scan, since_id
+                # resumes after its first occurrence if same-second ids collide
+                for rec_ino, off, raw_id in _IDX_REC.iter_unpack(f.read(end - start)):
+                    id_map.setdefault(raw_id.rstrip(b"\0"), (rec_ino, off))
+                _idx["size"] = end
+            hit = _idx["map"].get(event_id.encode())
+    except OSError:
+        return None
+    if hit is None or hit[0] != ino:
+        return None
+    return hit[1]
+
+
+def _meta_field(value: Any) -> str:
+    value = str(value)
+    if "\\" in value or "\t" in value or "\n" in value:
+        value = value.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+    return value
+
+
+def _meta_row(ino: int, end: int, agent: Any, event_type: Any, severity: Any) -> bytes:
+    return (
+        f"{ino}\t{end}\t{_meta_field(agent)}\t{_meta_field(event_type)}\t{_meta_field(severity)}\n"
+    ).encode()
+
+
+def _append_meta(rows: bytes) -> None:
+    """Append events_meta.tsv rows (caller holds the locks; best-effort)."""
+    try:
+        os.write(_sidecar_fd(META_FILE), rows)
+    except OSError:
+        log.debug("[EVENTS] meta append failed (non-critical)")
+
+
+def _rebuild_meta() -> list[tuple[str, str, str]]:
+    """Rewrite events_meta.tsv from the events file (caller holds the locks).
+
+    Returns the (agent, type, severity) columns it wrote.
+    """
+    try:
+        with open(EVENTS_FILE, "rb") as f:
+            ino = os.fstat(f.fileno()).st_ino
+            data = f.read()
+    except OSError:
+        return []
+    cols: list[tuple[str, str, str]] = []
+    rows: list[bytes] = []
+    pos = 0
+    end = data.rfind(b"\n") + 1  # a partially written last line is not covered
+    for line in data[:end].split(b"\n")[:-1]:
+        pos += len(line) + 1
+        if not line.strip():
+            continue
+        m = _META_LINE_RE.match(line)
+        if m is not None and line.rstrip().endswith(b"}"):
+            col = (m.group(1).decode(), m.group(2).decode(), m.group(3).decode())
+        else:
+            try:
+                e = _loads(line)
+            except json.JSONDecodeError:
+                continue
+            col = (str(e.get("agent", "unknown")), str(e.get("type", "unknown")),
+                   str(e.get("severity", "info")))
+        cols.append(col)
+        rows.append(_meta_row(ino, pos, *col))
+    rows.append(f"{ino}\t{end}\n".encode())  # checkpoint: covered through `end`
+    try:
+        tmp = META_FILE.with_name(META_FILE.name + ".new")
+        tmp.write_bytes(b"".join(rows))
+        os.replace(tmp, META_FILE)
+    except OSError:
+        log.debug("[EVENTS] meta rebuild failed (non-critical)")
+    return cols
+
+
+def _read_meta() -> list[tuple[str, str, str]] | None:
+    """Stat columns from events_meta.tsv, rebuilding it if stale (None if no events file)."""
+    with _lock:
+        _acquire_file_lock()
+        try:
+            try:
+                st = os.stat(EVENTS_FILE)
+            except FileNotFoundError:
+                return None
+            try:
+                data = META_FILE.read_bytes()
+            except OSError:
+                data = b""
+            last = data[data.rfind(b"\n", 0, len(data) - 1) + 1:].split(b"\t", 2)
+            if (not data.endswith(b"\n") or len(last) < 2
+                    or last[0] != str(st.st_ino).encode()
+                    or last[1].rstrip(b"\n") != str(st.st_size).encode()):
+                return _rebuild_meta()
+        finally:
+            _release_file_lock()
+
+    cols: list[tuple[str, str, str]] = []
+    for row in data.decode().split("\n"):
+        fields = row.split("\t")
+        if len(fields) != 5:
+            continue  # checkpoint or blank
+        agent, event_type, severity = fields[2:]
+        if "\\" in row:
+            agent, event_type, severity = (
+                _META_ESC_RE.sub(lambda m: _META_UNESC.get(m.group(1), m.group(1)), v)
+                for v in (agent, event_type, severity)
+            )
+        cols.append((agent, event_type, severity))
+    return cols
+
+
 def _generate_id() -> str:
     """Generate a unique event ID: evt_{unix_ts}_{hex4}."""
     ts = int(time.time())
@@ -89,15 +356,14 @@ def _generate_id() -> str:
     return f"evt_{ts}_{rand_hex}"
 
 
-def publish(
+def _new_event(
     agent: str,
     event_type: str,
     data: dict[str, Any] | None = None,
     severity: str = "info",
     summary: str = "",
-) -> str:
-    """Publish an event to the shared bus. Returns the event ID."""
-    event = {
+) -> dict:
+    return {
         "id": _generate_id(),
         "ts": datetime.now(ET).isoformat(),
         "agent": agent,
@@ -107,39 +373,224 @@ def publish(
         "summary": summary,
     }
 
+
+def _write_events(events: list[dict]) -> None:
+    """Append events with one write per file under a single lock acquisition."""
+    payloads = [_dumps_line(e) for e in events]  # encode outside the locks
     with _lock:
         _acquire_file_lock()
         try:
-            with open(EVENTS_FILE, "a") as f:
-                f.write(json.dumps(event, default=str) + "\n")
+            ino, offset = _append_bytes(b"".join(payloads))
+            idx: list[bytes] = []
+            meta: list[bytes] = []
+            for event, payload in zip(events, payloads):
+                idx.append(_index_record(ino, offset, event["id"]))
+                offset += len(payload)
+                meta.append(_meta_row(ino, offset, event["agent"], event["type"], event["severity"]))
+            _append_index(b"".join(idx))
+            _append_meta(b"".join(meta))
         finally:
             _release_file_lock()
 
-    # Auto-prune on every 50th write (probabilistic, low overhead)
-    if int(time.time()) % 50 == 0:
-        try:
-            prune()
-        except Exception as e:
-            log.warning("[EVENTS] Auto-prune failed: %s", str(e)[:100])
+    # Auto-prune every PRUNE_EVERY writes, off the publish path
+    due = [next(_write_count) % PRUNE_EVERY == 0 for _ in events]
+    if any(due) and not _prune_lock.locked():
+        threading.Thread(target=_background_prune, name="events-prune", daemon=True).start()
+
 
+def publish(
+    agent: str,
+    event_type: str,
+    data: dict[str, Any] | None = None,
+    severity: str = "info",
+    summary: str = "",
+) -> str:
+    """Publish an event to the shared bus. Returns the event ID."""
+    event = _new_event(agent, event_type, data, severity, summary)
+    _write_events([event])
     return event["id"]
 
 
+def publish_many(events: list[dict[str, Any]]) -> list[str]:
+    """Publish several events at once. Returns their IDs in order.
+
+    Each item takes publish()'s keyword arguments, e.g.
+    {"agent": "garves", "event_type": TRADE_EXECUTED, "data": {...}}.
+    The whole batch costs one lock acquisition and one write per file,
+    which is what bursty publishers should use instead of a publish() loop.
+    """
+    if not events:
+        return []
+    built = [_new_event(**e) for e in events]
+    _write_events(built)
+    return [e["id"] for e in built]
+
+
+def _parse_lines(chunk: bytes, events: list[dict]) -> None:
+    for line in chunk.split(b"\n"):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            events.append(_loads(line))
+        except json.JSONDecodeError:
+            continue
+
+
+def _background_prune() -> None:
+    if not _prune_lock.acquire(blocking=False):
+        return  # another prune is already running
+    try:
+        prune()
+    except Exception as e:
+        log.warning("[EVENTS] Auto-prune failed: %s", str(e)[:100])
+    finally:
+        _prune_lock.release()
+
+
 def _read_all() -> list[dict]:
-    """Read all events from the JSONL file."""
-    if not EVENTS_FILE.exists():
+    """Read all events from the JSONL file (incremental: parses only new lines)."""
+    try:
+        f = open(EVENTS_FILE, "rb")
+    except FileNotFoundError:
         return []
-    events = []
-    with open(EVENTS_FILE, "r") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                events.append(json.loads(line))
-            except json.JSONDecodeError:
-                continue
-    return events
+    with f, _cache_lock:
+        st = os.fstat(f.fileno())
+        head = _cache["head"]
+        valid = (
+            _cache["ino"] == st.st_ino
+            and st.st_size >= _cache["offset"]
+            and (not head or f.read(len(head)) == head)
+        )
+        if not valid:
+            _cache.update(events=[], offset=0, ino=st.st_ino, head=b"")
+        if st.st_size > _cache["offset"]:
+            f.seek(_cache["offset"])
+            chunk = f.read(st.st_size - _cache["offset"])
+            end = chunk.rfind(b"\n") + 1  # leave a partially written last line for next time
+            if end:
+                _parse_lines(chunk[:end], _cache["events"])
+                if not _cache["head"]:
+                    _cache["head"] = chunk[:chunk.find(b"\n") + 1]
+                _cache["offset"] += end
+        return list(_cache["events"])
+
+
+_LINE_ID_RE = re.compile(rb'^\{"id":\s*"([^"]*)"', re.MULTILINE)
+
+
+def _get_events_after(
+    since_id: str,
+    agent: str | None,
+    event_type: str | None,
+    severity: str | None,
+    limit: int,
+) -> list[dict] | None:
+    """get_events() for a since_id: locate its line, then parse only what follows.
+
+    The line is found via events.idx, or failing that by a regex scan of the
+    mmapped file (no JSON decode, no copy). Lines after it are parsed straight
+    out of the mapping. Returns None when since_id isn't in the file.
+    """
+    target = since_id.encode()
+    try:
+        f = open(EVENTS_FILE, "rb")
+    except FileNotFoundError:
+        return None
+    with f:
+        size = os.fstat(f.fileno()).st_size
+        if not size:
+            return None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start = _index_offset(since_id)
+            if start is not None:
+                m = _LINE_ID_RE.match(mm, start, start + len(target) + 16)
+                if m is None or m.group(1) != target:
+                    start = None  # stale offset; fall back to the scan
+            if start is None:
+                m = re.compile(rb'^\{"id":\s*"' + re.escape(target) + rb'"', re.MULTILINE).search(mm)
+                if m is None:
+                    return None
+                start = m.start()
+
+            newest: deque[dict] = deque(maxlen=limit)
+            end = mm.rfind(b"\n") + 1  # skip a partially written last line
+            pos = mm.find(b"\n", start) + 1
+            while 0 < pos < end:
+                nl = mm.find(b"\n", pos)
+                line = mm[pos:nl].strip()
+                pos = nl + 1
+                if not line:
+                    continue
+                try:
+                    e = _loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if agent and e.get("agent") != agent:
+                    continue
+                if event_type and e.get("type") != event_type:
+                    continue
+                if severity and e.get("severity") != severity:
+                    continue
+                newest.append(e)
+    newest.reverse()
+    return list(newest)
+
+
+def _iter_tail_lines(block: int = 1 << 16):
+    """Yield complete lines newest -> oldest, reading the file backward in blocks.
+
+    Text after the last newline (a partially written event) is skipped.
+    """
+    try:
+        f = open(EVENTS_FILE, "rb")
+    except FileNotFoundError:
+        return
+    with f:
+        pos = os.fstat(f.fileno()).st_size
+        carry = b""
+        first = True
+        while pos > 0:
+            n = min(block, pos)
+            pos -= n
+            f.seek(pos)
+            parts = (f.read(n) + carry).split(b"\n")
+            carry = parts[0]
+            for line in reversed(parts[1:]):
+                if first:
+                    first = False  # empty (file ends with newline) or partial
+                    continue
+                yield line
+        if carry and not first:
+            yield carry
+
+
+def _get_events_tail(
+    agent: str | None,
+    event_type: str | None,
+    severity: str | None,
+    limit: int,
+) -> list[dict]:
+    """get_events() without since_id via a backward scan: parses at most `limit` matching events."""
+    out: list[dict] = []
+    for line in _iter_tail_lines():
+        if len(out) >= limit:
+            break
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            e = _loads(line)
+        except json.JSONDecodeError:
+            continue
+        if agent and e.get("agent") != agent:
+            continue
+        if event_type and e.get("type") != event_type:
+            continue
+        if severity and e.get("severity") != severity:
+            continue
+        out.append(e)
+    return out
 
 
 def get_events(
@@ -150,42 +601,47 @@ def get_events(
     limit: int = 50,
 ) -> list[dict]:
     """Get events with optional filters. Returns newest first."""
-    events = _read_all()
-
-    # Filter since_id
-    if since_id:
-        found = False
-        filtered = []
-        for e in events:
-            if found:
-                filtered.append(e)
-            elif e.get("id") == since_id:
-                found = True
-        events = filtered
-
-    # Apply filters
-    if agent:
-        events = [e for e in events if e.get("agent") == agent]
-    if event_type:
-        events = [e for e in events if e.get("type") == event_type]
-    if severity:
-        events = [e for e in events if e.get("severity") == severity]
-
-    # Return newest first, capped at limit
-    return list(reversed(events[-limit:]))
+    if 0 < limit <= TAIL_SCAN_MAX_LIMIT:
+        if since_id:
+            # None: since_id is not in the log, which the full scan also answers with []
+            events = _get_events_after(since_id, agent, event_type, severity, limit)
+            return events if events is not None else []
+        return _get_events_tail(agent, event_type, severity, limit)
+
+    # Single fused pass: since_id cut-off and predicates, keeping only the
+    # newest `limit` matches (limit <= 0 keeps the old events[-limit:] slice)
+    found = not since_id
+    newest: deque[dict] | list[dict] = deque(maxlen=limit) if limit > 0 else []
+    for e in _read_all():
+        if not found:
+            found = e.get("id") == since_id
+            continue
+        if agent and e.get("agent") != agent:
+            continue
+        if event_type and e.get("type") != event_type:
+            continue
+        if severity and e.get("severity") != severity:
+            continue
+        newest.append(e)
+    if limit <= 0:
+        newest = newest[-limit:]
+
+    # Return newest first
+    return list(reversed(newest))
 
 
 def _load_cursors() -> dict:
-    if not CURSORS_FILE.exists():
-        return {}
     try:
-        return json.loads(CURSORS_FILE.read_text())
+        return _loads(CURSORS_FILE.read_bytes())
     except Exception:
         return {}
 
 
 def _save_cursors(cursors: dict) -> None:
-    CURSORS_FILE.write_text(json.dumps(cursors, indent=2))
+    if orjson is not None:
+        CURSORS_FILE.write_bytes(orjson.dumps(cursors, option=orjson.OPT_INDENT_2))
+    else:
+        CURSORS_FILE.write_text(json.dumps(cursors, indent=2))
 
 
 def get_unread(agent_name: str) -> list[dict]:
@@ -221,29 +677,119 @@ def mark_read(agent_name: str, event_id: str) -> None:
 
 
 def get_stats() -> dict:
-    """Get event counts grouped by agent and type."""
-    events = _read_all()
-    by_agent: dict[str, int] = {}
-    by_type: dict[str, int] = {}
-    severities: dict[str, int] = {}
-
-    for e in events:
-        a = e.get("agent", "unknown")
-        t = e.get("type", "unknown")
-        s = e.get("severity", "info")
-        by_agent[a] = by_agent.get(a, 0) + 1
-        by_type[t] = by_type.get(t, 0) + 1
-        severities[s] = severities.get(s, 0) + 1
+    """Get event counts grouped by agent and type.
 
+    Reads only the events_meta.tsv columns; no event JSON is parsed unless
+    the sidecar is stale and has to be rebuilt.
+    """
+    cols = _read_meta() or []
     return {
-        "total": len(events),
-        "by_agent": by_agent,
-        "by_type": by_type,
-        "by_severity": severities,
+        "total": len(cols),
+        "by_agent": dict(Counter(c[0] for c in cols)),
+        "by_type": dict(Counter(c[1] for c in cols)),
+        "by_severity": dict(Counter(c[2] for c in cols)),
     }
 
 
 
+_TS_RE = re.compile(rb'"ts":\s*"([^"]+)"')
+
+
+def _line_ts(line: bytes) -> datetime | None:
+    """The event's ts without a full JSON decode (None if missing/unparseable)."""
+    m = _TS_RE.search(line)
+    if m is None:
+        return None
+    try:
+        ts = datetime.fromisoformat(m.group(1).decode())
+    except ValueError:
+        return None
+    return ts.replace(tzinfo=ET) if ts.tzinfo is None else ts
+
+
+def _first_offset_at_or_after(mm: mmap.mmap, cutoff: datetime) -> int:
+    """Byte offset of the first line with ts >= cutoff (binary search; file is time-ordered)."""
+    size = len(mm)
+
+    def line_start(pos: int) -> int:
+        if pos == 0:
+            return 0
+        nl = mm.find(b"\n", pos - 1)
+        return size if nl < 0 else nl + 1
+
+    def is_new(pos: int) -> bool:
+        # Skip lines without a usable ts until one decides the comparison
+        start = line_start(pos)
+        while start < size:
+            end = mm.find(b"\n", start)
+            end = size if end < 0 else end
+            ts = _line_ts(mm[start:end])
+            if ts is not None:
+                return ts >= cutoff
+            start = end + 1
+        return True
+
+    lo, hi = 0, size
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if is_new(mid):
+            hi = mid
+        else:
+            lo = mid + 1
+    return line_start(lo)
+
+
+def _drop_before(cutoff: datetime, archive_file: Path | None = None) -> int:
+    """Remove events older than cutoff; returns count removed.
+
+    Only the old prefix is inspected (ts via regex, no JSON decode); the
+    remaining tail is byte-copied to a new file that atomically replaces
+    the log. Removed lines go to archive_file when given. Prefix lines that
+    are newer than cutoff or lack a parseable ts are kept.
+    """
+    with _lock:
+        _acquire_file_lock()
+        try:
+            try:
+                f = open(EVENTS_FILE, "rb")
+            except FileNotFoundError:
+                return 0
+            with f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return 0
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    offset = _first_offset_at_or_after(mm, cutoff)
+                    prefix = mm[:offset]
+                if not offset:
+                    return 0
+
+                kept: list[bytes] = []
+                removed: list[bytes] = []
+                for line in prefix.split(b"\n"):
+                    if not line.strip():
+                        continue
+                    ts = _line_ts(line)
+                    (removed if ts is not None and ts < cutoff else kept).append(line + b"\n")
+                if not removed:
+                    return 0
+
+                if archive_file is not None:
+                    with open(archive_file, "ab") as af:
+                        af.writelines(removed)
+
+                tmp = EVENTS_FILE.with_name(EVENTS_FILE.name + ".new")
+                with open(tmp, "wb") as out:
+                    out.writelines(kept)
+                    f.seek(offset)
+                    shutil.copyfileobj(f, out, 1 << 20)
+                os.replace(tmp, EVENTS_FILE)
+            _rebuild_index()
+            _rebuild_meta()
+            return len(removed)
+        finally:
+            _release_file_lock()
+
+
 def rotate(max_age_days: int = 7) -> int:
     """Archive events older than max_age_days. Returns count archived."""
     if not EVENTS_FILE.exists():
@@ -251,42 +797,9 @@ def rotate(max_age_days: int = 7) -> int:
 
     ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
     cutoff = datetime.now(ET) - timedelta(days=max_age_days)
-    events = _read_all()
-    kept = []
-    archived = []
-
-    for e in events:
-        ts_str = e.get("ts", "")
-        try:
-            ts = datetime.fromisoformat(ts_str)
-            if ts.tzinfo is None:
-                ts = ts.replace(tzinfo=ET)
-            if ts >= cutoff:
-                kept.append(e)
-            else:
-                archived.append(e)
-        except Exception:
-            kept.append(e)
-
-    if not archived:
-        return 0
-
     date_str = datetime.now(ET).strftime("%Y%m%d")
     archive_file = ARCHIVE_DIR / f"events_archive_{date_str}.jsonl"
-    with open(archive_file, "a") as f:
-        for e in archived:
-            f.write(json.dumps(e, default=str) + "\n")
-
-    with _lock:
-        _acquire_file_lock()
-        try:
-            with open(EVENTS_FILE, "w") as f:
-                for e in kept:
-                    f.write(json.dumps(e, default=str) + "\n")
-        finally:
-            _release_file_lock()
-
-    return len(archived)
+    return _drop_before(cutoff, archive_file)
 
 
 def prune(max_age_hours: int = 48) -> int:
@@ -295,31 +808,4 @@ def prune(max_age_hours: int = 48) -> int:
         return 0
 
     cutoff = datetime.now(ET) - timedelta(hours=max_age_hours)
-    events = _read_all()
-    kept = []
-    removed = 0
-
-    for e in events:
-        ts_str = e.get("ts", "")
-        try:
-            ts = datetime.fromisoformat(ts_str)
-            if ts.tzinfo is None:
-                ts = ts.replace(tzinfo=ET)
-            if ts >= cutoff:
-                kept.append(e)
-            else:
-                removed += 1
-        except Exception:
-            kept.append(e)  # Keep events we can't parse
-
-    if removed > 0:
-        with _lock:
-            _acquire_file_lock()
-            try:
-                with open(EVENTS_FILE, "w") as f:
-                    for e in kept:
-                        f.write(json.dumps(e, default=str) + "\n")
-            finally:
-                _release_file_lock()
-
-    return removed
+    return _drop_before(cutoff)
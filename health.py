@@ -8,17 +8,32 @@ Usage:
 """
 from __future__ import annotations
 
+import copy
 import json
+import os
+import threading
 import time
 from dataclasses import dataclass, asdict
 from datetime import datetime
 from pathlib import Path
 from zoneinfo import ZoneInfo
 
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is the fallback
+    orjson = None
+
+# orjson parses bytes directly; stdlib json accepts bytes too
+_loads = orjson.loads if orjson is not None else json.loads
+
 ET = ZoneInfo("America/New_York")
 
 SHARED_DIR = Path(__file__).resolve().parent
 HEALTH_FILE = SHARED_DIR / "data" / "system_health.json"
+HEALTH_TTL_S = 2.0  # dashboard polls inside this window share one collection
+
+_health_lock = threading.Lock()
+_health_cache: dict = {"t": 0.0, "v": None}
 
 # Agent status file locations
 _AGENT_STATUS_FILES = {
@@ -47,16 +62,38 @@ class HealthReport:
     metrics: dict
 
 
+def _read_file(path: Path) -> tuple[bytes, float]:
+    """Return (contents, mtime) using one open, one fstat and the reads."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        st = os.fstat(fd)
+        chunks = []
+        remaining = st.st_size
+        while True:
+            chunk = os.read(fd, max(remaining, 65536))
+            if not chunk:
+                break
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return b"".join(chunks), st.st_mtime
+    finally:
+        os.close(fd)
+
+
 def _read_agent_status(agent: str, path: Path) -> HealthReport:
     """Read a single agent's status file and return a HealthReport."""
-    if not path.exists():
+    try:
+        raw, mtime = _read_file(path)
+    except FileNotFoundError:
         return HealthReport(
             agent=agent, status="offline", uptime_s=0,
             last_activity="", error_count=0, metrics={},
         )
+    except OSError:
+        raw, mtime = None, None
 
     try:
-        data = json.loads(path.read_text())
+        data = _loads(raw)
     except Exception:
         return HealthReport(
             agent=agent, status="unknown", uptime_s=0,
@@ -64,17 +101,12 @@ def _read_agent_status(agent: str, path: Path) -> HealthReport:
         )
 
     # Determine uptime from file mtime
-    try:
-        mtime = path.stat().st_mtime
-        uptime_s = time.time() - mtime
-        # If file hasn't been updated in > 30 min, agent may be offline
-        if uptime_s > 1800:
-            status = "degraded"
-        else:
-            status = "online"
-    except Exception:
-        uptime_s = 0
-        status = "unknown"
+    uptime_s = time.time() - mtime
+    # If file hasn't been updated in > 30 min, agent may be offline
+    if uptime_s > 1800:
+        status = "degraded"
+    else:
+        status = "online"
 
     # Override with explicit state if present
     state = data.get("state", data.get("status", ""))
@@ -122,11 +154,32 @@ def _extract_metrics(agent: str, data: dict) -> dict:
 
 
 def collect_all_health() -> dict:
-    """Collect health from all agents and return unified report."""
-    reports = {}
-    for agent, path in _AGENT_STATUS_FILES.items():
-        report = _read_agent_status(agent, path)
-        reports[agent] = asdict(report)
+    """Collect health from all agents and return unified report.
+
+    Results are memoized for HEALTH_TTL_S; concurrent callers on a stale
+    cache wait for a single collection instead of each re-reading every file.
+    Each caller gets its own copy, so mutating it cannot leak into the cache.
+    """
+    cached = _health_cache["v"]
+    if cached is not None and time.monotonic() - _health_cache["t"] < HEALTH_TTL_S:
+        return copy.deepcopy(cached)
+    with _health_lock:
+        # Another caller may have refreshed the cache while we waited
+        cached = _health_cache["v"]
+        if cached is not None and time.monotonic() - _health_cache["t"] < HEALTH_TTL_S:
+            return copy.deepcopy(cached)
+        health = _collect_all_health()
+        _health_cache["v"] = health
+        _health_cache["t"] = time.monotonic()
+        return copy.deepcopy(health)
+
+
+def _collect_all_health() -> dict:
+    """Read every agent status file and build the unified report (uncached)."""
+    reports = {
+        agent: asdict(_read_agent_status(agent, path))
+        for agent, path in _AGENT_STATUS_FILES.items()
+    }
 
     online = sum(1 for r in reports.values() if r["status"] == "online")
     degraded = sum(1 for r in reports.values() if r["status"] == "degraded")
@@ -148,16 +201,18 @@ def write_health_file() -> dict:
     """Collect health and write to system_health.json."""
     health = collect_all_health()
     HEALTH_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with open(HEALTH_FILE, "w") as f:
-        json.dump(health, f, indent=2)
+    if orjson is not None:
+        HEALTH_FILE.write_bytes(orjson.dumps(health, option=orjson.OPT_INDENT_2))
+    else:
+        with open(HEALTH_FILE, "w") as f:
+            json.dump(health, f, indent=2)
     return health
 
 
 def get_system_health() -> dict:
     """Read the latest system health from file."""
-    if HEALTH_FILE.exists():
-        try:
-            return json.loads(HEALTH_FILE.read_text())
-        except Exception:
-            pass
+    try:
+        return _loads(HEALTH_FILE.read_bytes())
+    except Exception:
+        pass
     return collect_all_health()
@@ -10,10 +10,20 @@ from __future__ import annotations
 
 import json
 import logging
+import os
+from collections import Counter, deque
 from datetime import datetime
 from zoneinfo import ZoneInfo
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is the fallback
+    orjson = None
+
+# orjson parses bytes directly; stdlib json accepts bytes too
+_loads = orjson.loads if orjson is not None else json.loads
+
 log = logging.getLogger("shared.intelligence_feed")
 
 ET = ZoneInfo("America/New_York")
@@ -33,6 +43,16 @@ CATEGORIES = {
 }
 
 
+def _dumps_line(entry: dict) -> bytes:
+    """Serialize one feed item as a JSONL line (bytes, trailing newline included)."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(entry, option=orjson.OPT_APPEND_NEWLINE)
+        except TypeError:
+            pass  # e.g. ints beyond 64 bits — stdlib json handles them
+    return (json.dumps(entry) + "\n").encode()
+
+
 def publish_intel(
     source: str,
     category: str,
@@ -70,76 +90,161 @@ def publish_intel(
 
     try:
         FEED_FILE.parent.mkdir(parents=True, exist_ok=True)
-        with open(FEED_FILE, "a") as f:
-            f.write(json.dumps(entry) + "\n")
+        with open(FEED_FILE, "ab") as f:
+            f.write(_dumps_line(entry))
         log.info("Intel published: [%s] %s — %s", category, agent, title)
     except Exception as e:
         log.warning("Failed to publish intel: %s", e)
 
 
+def _load_cursors() -> dict:
+    try:
+        return _loads(CURSOR_FILE.read_bytes())
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cursors(cursors: dict) -> None:
+    if orjson is not None:
+        CURSOR_FILE.write_bytes(orjson.dumps(cursors, option=orjson.OPT_INDENT_2))
+    else:
+        CURSOR_FILE.write_text(json.dumps(cursors, indent=2))
+
+
+def _line_offset(n_lines: int) -> int:
+    """Byte offset just past the first n_lines complete lines of the feed."""
+    offset = 0
+    with open(FEED_FILE, "rb") as f:
+        for i, line in enumerate(f):
+            if i >= n_lines or not line.endswith(b"\n"):
+                break
+            offset += len(line)
+    return offset
+
+
+def _cursor_offset(reader: str) -> int:
+    """Return the reader's cursor as a byte offset into FEED_FILE.
+
+    Cursors are stored as {"offset": n}. A bare int is a legacy line-number
+    cursor; it is converted once and written back in the new form.
+    """
+    cursors = _load_cursors()
+    cursor = cursors.get(reader, 0)
+    if isinstance(cursor, dict):
+        return int(cursor.get("offset", 0))
+    if not cursor:
+        return 0
+    offset = _line_offset(int(cursor))
+    cursors[reader] = {"offset": offset}
+    try:
+        _save_cursors(cursors)
+    except OSError as e:
+        log.warning("Failed to migrate intel cursor: %s", e)
+    return offset
+
+
 def get_unread(reader: str, limit: int = 20) -> list[dict]:
     """Get unread intelligence items for a reader (e.g., 'thor').
 
-    Uses cursor-based reading so each reader tracks their own position.
+    Uses cursor-based reading so each reader tracks their own position:
+    the cursor is a byte offset, so only lines appended since the last
+    mark_read are read. Each item's "_line" is an opaque position to pass
+    back to mark_read.
     """
     if not FEED_FILE.exists():
         return []
 
-    # Load cursor
-    cursor = 0
     try:
-        if CURSOR_FILE.exists():
-            cursors = json.loads(CURSOR_FILE.read_text())
-            cursor = cursors.get(reader, 0)
+        offset = _cursor_offset(reader)
     except Exception:
-        pass
+        offset = 0
 
-    # Read from cursor position
-    items = []
+    # Read forward from the cursor, keeping only the newest `limit` items
+    items: deque[dict] = deque(maxlen=limit if limit > 0 else None)
     try:
-        lines = FEED_FILE.read_text().splitlines()
-        for i, line in enumerate(lines):
-            if i < cursor or not line.strip():
-                continue
-            try:
-                entry = json.loads(line)
-                entry["_line"] = i
+        with open(FEED_FILE, "rb") as f:
+            f.seek(offset)
+            pos = offset
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # partial line from an in-progress append
+                pos += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    entry = _loads(line)
+                except ValueError:  # torn or corrupt line
+                    continue
+                entry["_line"] = pos - 1  # offset of this line's newline
                 items.append(entry)
-            except Exception:
-                continue
     except Exception:
         return []
 
-    return items[-limit:]
+    return list(items)
 
 
 def mark_read(reader: str, up_to_line: int) -> None:
-    """Mark all items up to a line number as read for this reader."""
+    """Mark all items up to and including the one at `up_to_line` as read.
+
+    `up_to_line` is the "_line" value of an item returned by get_unread.
+    """
     try:
-        cursors = {}
-        if CURSOR_FILE.exists():
-            cursors = json.loads(CURSOR_FILE.read_text())
-        cursors[reader] = up_to_line + 1
-        CURSOR_FILE.write_text(json.dumps(cursors, indent=2))
+        cursors = _load_cursors()
+        cursors[reader] = {"offset": up_to_line + 1}
+        _save_cursors(cursors)
     except Exception as e:
         log.warning("Failed to update intel cursor: %s", e)
 
 
-def get_all(limit: int = 50) -> list[dict]:
-    """Get all recent intelligence items (for dashboard)."""
-    if not FEED_FILE.exists():
-        return []
+def _tail_lines(path: Path, block: int = 1 << 15):
+    """Yield complete lines of `path` newest -> oldest, reading backward in blocks.
+
+    Text after the last newline (an in-progress append) is skipped.
+    """
     try:
-        items = []
-        for line in FEED_FILE.read_text().splitlines():
-            if line.strip():
-                try:
-                    items.append(json.loads(line))
-                except Exception:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return
+    with f:
+        pos = os.fstat(f.fileno()).st_size
+        carry = b""
+        first = True
+        while pos > 0:
+            n = min(block, pos)
+            pos -= n
+            f.seek(pos)
+            parts = (f.read(n) + carry).split(b"\n")
+            carry = parts[0]
+            for line in reversed(parts[1:]):
+                if first:
+                    first = False  # empty (file ends with newline) or partial
                     continue
-        return items[-limit:]
+                yield line
+        if carry and not first:
+            yield carry
+
+
+def get_all(limit: int = 50) -> list[dict]:
+    """Get all recent intelligence items (for dashboard).
+
+    Reads backward from the end of the feed, so the cost is bounded by
+    `limit` rather than the feed size. limit <= 0 returns every item.
+    """
+    items = []
+    try:
+        for line in _tail_lines(FEED_FILE):
+            if not line.strip():
+                continue
+            try:
+                items.append(_loads(line))
+            except ValueError:  # torn or corrupt line
+                continue
+            if 0 < limit <= len(items):
+                break
     except Exception:
         return []
+    items.reverse()
+    return items
 
 
 def get_stats() -> dict:
@@ -148,22 +253,11 @@ def get_stats() -> dict:
     if not items:
         return {"total": 0, "by_category": {}, "by_agent": {}, "by_priority": {}}
 
-    by_cat = {}
-    by_agent = {}
-    by_priority = {}
-    for item in items:
-        cat = item.get("category", "unknown")
-        by_cat[cat] = by_cat.get(cat, 0) + 1
-        agent = item.get("agent", "unknown")
-        by_agent[agent] = by_agent.get(agent, 0) + 1
-        pri = item.get("priority", "normal")
-        by_priority[pri] = by_priority.get(pri, 0) + 1
-
     return {
         "total": len(items),
-        "by_category": by_cat,
-        "by_agent": by_agent,
-        "by_priority": by_priority,
+        "by_category": dict(Counter(item.get("category", "unknown") for item in items)),
+        "by_agent": dict(Counter(item.get("agent", "unknown") for item in items)),
+        "by_priority": dict(Counter(item.get("priority", "normal") for item in items)),
     }
 
 
@@ -172,11 +266,15 @@ def prune(keep: int = 500) -> int:
     if not FEED_FILE.exists():
         return 0
     try:
-        lines = FEED_FILE.read_text().splitlines()
+        # Split on b"\n" only: orjson writes U+2028/U+0085 unescaped, and
+        # str.splitlines() would break entries apart on them
+        lines = FEED_FILE.read_bytes().split(b"\n")
+        if lines and not lines[-1]:
+            lines.pop()
         if len(lines) <= keep:
             return 0
         removed = len(lines) - keep
-        FEED_FILE.write_text("\n".join(lines[-keep:]) + "\n")
+        FEED_FILE.write_bytes(b"\n".join(lines[-keep:]) + b"\n")
         # Reset cursors since line numbers changed
         if CURSOR_FILE.exists():
             CURSOR_FILE.write_text("{}")
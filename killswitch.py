@@ -13,16 +13,51 @@ from __future__ import annotations
 
 import json
 import logging
+import os
 import time
 from datetime import datetime
 from pathlib import Path
 from zoneinfo import ZoneInfo
 
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is the fallback
+    orjson = None
+
+# orjson parses bytes directly; stdlib json accepts bytes too
+_loads = orjson.loads if orjson is not None else json.loads
+
 log = logging.getLogger(__name__)
 
 ET = ZoneInfo("America/New_York")
 KILLSWITCH_FILE = Path("/tmp/brotherhood_killswitch")
 DEFAULT_EXPIRY_HOURS = 24
+CACHE_TTL_S = 1.0  # max age of a parsed payload even if the file looks unchanged
+
+# Last parsed payload, keyed on the file's (inode, mtime_ns, size)
+_ks_cache: dict = {"key": None, "val": None, "ts": 0.0}
+
+_publish = None  # shared.events.publish once resolved; False if unavailable
+
+
+def _event_publisher():
+    """Return shared.events.publish (or None), importing it only once.
+
+    Resolved on first use rather than at module load: importing shared.events
+    installs SIGTERM/SIGINT handlers, which every agent that merely polls
+    is_killed() would otherwise inherit.
+    """
+    global _publish
+    if _publish is None:
+        try:
+            from shared.events import publish
+        except ImportError:
+            try:
+                from events import publish  # running from inside ~/shared
+            except ImportError:
+                publish = False
+        _publish = publish
+    return _publish or None
 
 
 def activate_killswitch(
@@ -41,22 +76,24 @@ def activate_killswitch(
         "expires_at": expires_at,
         "expiry_hours": expiry_hours,
     }
-    KILLSWITCH_FILE.write_text(json.dumps(payload, indent=2))
+    if orjson is not None:
+        KILLSWITCH_FILE.write_bytes(orjson.dumps(payload, option=orjson.OPT_INDENT_2))
+    else:
+        KILLSWITCH_FILE.write_text(json.dumps(payload, indent=2))
     log.critical("[KILLSWITCH] ACTIVATED by %s: %s (expires in %.0fh)",
                  activated_by, reason, expiry_hours)
 
-    try:
-        import sys
-        sys.path.insert(0, str(Path.home() / "shared"))
-        from events import publish
-        publish(
-            agent="killswitch",
-            event_type="killswitch_activated",
-            data=payload,
-            summary=f"KILL SWITCH by {activated_by}: {reason}",
-        )
-    except Exception:
-        pass
+    publish = _event_publisher()
+    if publish is not None:
+        try:
+            publish(
+                agent="killswitch",
+                event_type="killswitch_activated",
+                data=payload,
+                summary=f"KILL SWITCH by {activated_by}: {reason}",
+            )
+        except Exception:
+            pass
 
     return payload
 
@@ -65,24 +102,23 @@ def clear_killswitch(cleared_by: str = "unknown") -> dict:
     """Clear the kill switch — resume all trading."""
     if KILLSWITCH_FILE.exists():
         try:
-            old = json.loads(KILLSWITCH_FILE.read_text())
+            old = _loads(KILLSWITCH_FILE.read_bytes())
         except Exception:
             old = {}
         KILLSWITCH_FILE.unlink()
         log.info("[KILLSWITCH] CLEARED by %s (was: %s)", cleared_by, old.get("reason", "?"))
 
-        try:
-            import sys
-            sys.path.insert(0, str(Path.home() / "shared"))
-            from events import publish
-            publish(
-                agent="killswitch",
-                event_type="killswitch_cleared",
-                data={"cleared_by": cleared_by, "was_reason": old.get("reason", "?")},
-                summary=f"Kill switch cleared by {cleared_by}",
-            )
-        except Exception:
-            pass
+        publish = _event_publisher()
+        if publish is not None:
+            try:
+                publish(
+                    agent="killswitch",
+                    event_type="killswitch_cleared",
+                    data={"cleared_by": cleared_by, "was_reason": old.get("reason", "?")},
+                    summary=f"Kill switch cleared by {cleared_by}",
+                )
+            except Exception:
+                pass
 
         return {"cleared": True, "was_reason": old.get("reason", "?")}
     return {"cleared": False, "message": "Kill switch was not active"}
@@ -93,18 +129,34 @@ def is_killed() -> dict | None:
 
     Auto-clears expired kill switches (default 24h).
     """
-    if not KILLSWITCH_FILE.exists():
+    try:
+        st = os.stat(KILLSWITCH_FILE)
+    except OSError:
+        _ks_cache["key"] = None
         return None
 
-    try:
-        data = json.loads(KILLSWITCH_FILE.read_text())
-    except Exception:
-        return {"reason": "corrupted killswitch file", "activated_by": "unknown"}
+    # Steady state is one stat(): only re-read when the file changed or the
+    # cached payload is older than CACHE_TTL_S
+    key = (st.st_ino, st.st_mtime_ns, st.st_size)
+    now = time.monotonic()
+    if key == _ks_cache["key"] and now - _ks_cache["ts"] < CACHE_TTL_S:
+        data = dict(_ks_cache["val"])
+    else:
+        try:
+            data = _loads(KILLSWITCH_FILE.read_bytes())
+        except FileNotFoundError:
+            _ks_cache["key"] = None
+            return None
+        except Exception:
+            data = {"reason": "corrupted killswitch file", "activated_by": "unknown"}
+        _ks_cache.update(key=key, val=dict(data), ts=now)
 
+    # Expiry is time-based, so it is checked even on a cache hit
     expires_at = data.get("expires_at", 0)
     if expires_at > 0 and time.time() > expires_at:
         log.info("[KILLSWITCH] Auto-expired after %.0fh", data.get("expiry_hours", 24))
         KILLSWITCH_FILE.unlink(missing_ok=True)
+        _ks_cache["key"] = None
         return None
 
     return data
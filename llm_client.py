@@ -17,17 +17,33 @@ Cost tracking: Every call logged to ~/shared/llm_costs.jsonl.
 """
 from __future__ import annotations
 
+import atexit
 import json
 import logging
 import os
+import threading
 import time
 from datetime import datetime
 from pathlib import Path
+from typing import Any
 from zoneinfo import ZoneInfo
 
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is the fallback
+    orjson = None
+
+try:
+    from ciso8601 import parse_datetime as _parse_ts
+except ImportError:  # optional C parser; stdlib fromisoformat is the fallback
+    _parse_ts = datetime.fromisoformat
+
 ET = ZoneInfo("America/New_York")
 log = logging.getLogger(__name__)
 
+# orjson parses bytes directly; stdlib json accepts bytes too
+_loads = orjson.loads if orjson is not None else json.loads
+
 
 class LLMError(Exception):
     """Raised when all LLM fallback routes are exhausted."""
@@ -36,25 +52,56 @@ SHARED_DIR = Path(__file__).resolve().parent
 CONFIG_FILE = SHARED_DIR / "llm_config.json"
 COSTS_FILE = SHARED_DIR / "llm_costs.jsonl"
 
-# In-memory config cache
+# In-memory config cache: the file is stat'ed at most once per
+# CONFIG_CHECK_INTERVAL_S and re-parsed only when its (mtime_ns, size, inode)
+# signature changes (a new inode catches atomic replaces on coarse-mtime FSes)
+CONFIG_CHECK_INTERVAL_S = 1.0
 _config: dict | None = None
-_config_mtime: float = 0
+_config_sig: tuple[int, int, int] | None = None
+_config_checked_at: float = 0.0
+
+# Cloud SDK clients, one per (provider, api_key): reusing a client keeps its
+# connection pool (and the TLS session to the API host) alive across calls
+_clients: dict[tuple[str, str], Any] = {}
+_clients_lock = threading.Lock()
+XAI_BASE_URL = "https://api.x.ai/v1"
+
+# Keep-alive session for the local server (health probe + chat completions)
+_local_session = None
+_local_session_lock = threading.Lock()
+
+# Last local health probe: (monotonic time, base_url, up). Reused for
+# _LOCAL_HEALTH_TTL seconds; a failed local call clears it.
+_LOCAL_HEALTH_TTL = 3.0
+_local_health: tuple[float, str, bool] | None = None
+
+# Routes and fallback chains memoized per loaded config object; _load_config
+# only hands out a new object after a re-parse, which resets both tables
+_route_cfg: dict | None = None
+_route_table: dict[tuple[str, str], str] = {}
+_chain_table: dict[tuple[str, bool], tuple[str, ...]] = {}
 
 
 def _load_config() -> dict:
     """Load routing config with file-change caching."""
-    global _config, _config_mtime
-    if not CONFIG_FILE.exists():
-        return _default_config()
+    global _config, _config_sig, _config_checked_at
+    now = time.monotonic()
+    if _config is not None and now - _config_checked_at < CONFIG_CHECK_INTERVAL_S:
+        return _config
+    _config_checked_at = now
     try:
-        mtime = CONFIG_FILE.stat().st_mtime
-        if _config is not None and mtime == _config_mtime:
-            return _config
-        _config = json.loads(CONFIG_FILE.read_text())
-        _config_mtime = mtime
+        st = os.stat(CONFIG_FILE)
+    except OSError:
+        _config, _config_sig = _default_config(), None
         return _config
-    except Exception:
-        return _default_config()
+    sig = (st.st_mtime_ns, st.st_size, st.st_ino)
+    if _config is not None and sig == _config_sig:
+        return _config
+    try:
+        _config, _config_sig = _loads(CONFIG_FILE.read_bytes()), sig
+    except (OSError, ValueError):
+        _config, _config_sig = _default_config(), None  # unreadable: retry on next check
+    return _config
 
 
 def _default_config() -> dict:
@@ -95,6 +142,74 @@ def _default_config() -> dict:
     }
 
 
+# Cost entries are buffered and appended in batches: flushed once
+# COST_FLUSH_EVERY lines are pending or COST_FLUSH_INTERVAL_S has passed since
+# the last flush (checked on each new entry, with a timer as backstop so a lone
+# entry is not held until exit), before get_cost_summary reads the log, and at exit.
+COST_FLUSH_EVERY = 32
+COST_FLUSH_INTERVAL_S = 2.0
+_cost_buf: list[bytes] = []
+_cost_buf_lock = threading.Lock()
+_cost_last_flush = time.monotonic()
+_cost_fh = None  # persistent append handle; reopened if the log is rotated or removed
+_cost_flush_timer: threading.Timer | None = None
+
+
+def _cost_file():
+    """Return the append handle for COSTS_FILE (caller holds _cost_buf_lock)."""
+    global _cost_fh
+    fh = _cost_fh
+    if fh is not None:
+        try:
+            if fh.name == str(COSTS_FILE) and os.stat(COSTS_FILE).st_ino == os.fstat(fh.fileno()).st_ino:
+                return fh
+        except OSError:
+            pass
+        fh.close()
+        _cost_fh = None
+    _cost_fh = open(COSTS_FILE, "ab")
+    return _cost_fh
+
+
+def _flush_costs() -> None:
+    """Append all buffered cost lines with a single write."""
+    global _cost_last_flush, _cost_flush_timer
+    with _cost_buf_lock:
+        _cost_last_flush = time.monotonic()
+        if _cost_flush_timer is not None:
+            _cost_flush_timer.cancel()
+            _cost_flush_timer = None
+        if not _cost_buf:
+            return
+        data = b"".join(_cost_buf)
+        _cost_buf.clear()
+        try:
+            f = _cost_file()
+            f.write(data)
+            f.flush()
+        except OSError as e:
+            log.warning("[LLM_COST] Failed to log cost entries: %s", str(e)[:100])
+
+
+def _close_costs() -> None:
+    global _cost_fh
+    _flush_costs()
+    with _cost_buf_lock:
+        if _cost_fh is not None:
+            _cost_fh.close()
+            _cost_fh = None
+
+
+atexit.register(_close_costs)
+
+
+def _dumps_line(entry: dict) -> bytes:
+    """Serialize one cost entry as a JSONL line (bytes, trailing newline included)."""
+    if orjson is not None:
+        return orjson.dumps(entry, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(entry) + "\n").encode()
+
+
 def _log_cost(
     agent: str,
     provider: str,
@@ -106,9 +221,9 @@ def _log_cost(
     cost_usd: float,
     fallback: bool = False,
 ) -> None:
-    """Append cost entry to JSONL log."""
+    """Queue a cost entry for the JSONL log (see _flush_costs)."""
     entry = {
-        "ts": datetime.now(ET).isoformat(),
+        "ts_ns": time.time_ns(),
         "agent": agent,
         "provider": provider,
         "model": model,
@@ -119,11 +234,18 @@ def _log_cost(
         "cost_usd": round(cost_usd, 6),
         "fallback": fallback,
     }
-    try:
-        with open(COSTS_FILE, "a") as f:
-            f.write(json.dumps(entry) + "\n")
-    except Exception as e:
-        log.warning("[LLM_COST] Failed to log cost entry: %s", str(e)[:100])
+    global _cost_flush_timer
+    line = _dumps_line(entry)
+    with _cost_buf_lock:
+        _cost_buf.append(line)
+        due = (len(_cost_buf) >= COST_FLUSH_EVERY
+               or time.monotonic() - _cost_last_flush > COST_FLUSH_INTERVAL_S)
+        if not due and _cost_flush_timer is None:
+            _cost_flush_timer = threading.Timer(COST_FLUSH_INTERVAL_S, _flush_costs)
+            _cost_flush_timer.daemon = True
+            _cost_flush_timer.start()
+    if due:
+        _flush_costs()
 
 
 def _estimate_cost(provider: str, model: str, input_tokens: int, output_tokens: int) -> float:
@@ -142,17 +264,78 @@ def _estimate_cost(provider: str, model: str, input_tokens: int, output_tokens:
     return (input_tokens * in_rate + output_tokens * out_rate) / 1_000_000
 
 
+def _get_client(provider: str) -> Any:
+    """Return the cached SDK client for provider ("openai", "xai" or "anthropic")."""
+    env_var = {"openai": "OPENAI_API_KEY", "xai": "XAI_API_KEY", "anthropic": "ANTHROPIC_API_KEY"}[provider]
+    api_key = os.environ.get(env_var, "")
+    key = (provider, api_key)
+    client = _clients.get(key)
+    if client is not None:
+        return client
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            if provider == "anthropic":
+                import anthropic
+                client = anthropic.Anthropic(api_key=api_key)
+            else:
+                from openai import OpenAI
+                client = OpenAI(api_key=api_key, base_url=XAI_BASE_URL if provider == "xai" else None)
+            _clients[key] = client
+    return client
+
+
+def _get_local_session():
+    global _local_session
+    if _local_session is None:
+        with _local_session_lock:
+            if _local_session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                session.mount("http://", HTTPAdapter(pool_connections=2, pool_maxsize=8))
+                _local_session = session
+    return _local_session
+
+
+def _local_post(base_url: str, payload: dict, timeout: float) -> dict:
+    """POST a chat completion to the local server and return the decoded JSON.
+
+    The body is encoded with orjson when installed: tool loops resend the same
+    multi-KB system prompt and tool schemas on every iteration.
+    """
+    url = f"{base_url}/chat/completions"
+    if orjson is not None:
+        resp = _get_local_session().post(
+            url, data=orjson.dumps(payload), timeout=timeout,
+            headers={"Content-Type": "application/json"},
+        )
+    else:
+        resp = _get_local_session().post(url, json=payload, timeout=timeout)
+    resp.raise_for_status()
+    return _loads(resp.content)
+
+
 def _is_local_server_up(cfg: dict) -> bool:
-    """Quick health check on local LLM server."""
-    import urllib.request
-    import urllib.error
+    """Quick health check on local LLM server (cached for _LOCAL_HEALTH_TTL)."""
+    global _local_health
     base_url = cfg.get("local_server", {}).get("base_url", "http://localhost:11434/v1")
+    now = time.monotonic()
+    cached = _local_health
+    if cached is not None and cached[1] == base_url and now - cached[0] < _LOCAL_HEALTH_TTL:
+        return cached[2]
     try:
-        req = urllib.request.Request(f"{base_url}/models", method="GET")
-        with urllib.request.urlopen(req, timeout=3):
-            return True
+        up = _get_local_session().get(f"{base_url}/models", timeout=3).ok
     except Exception:
-        return False
+        up = False
+    _local_health = (now, base_url, up)
+    return up
+
+
+def _invalidate_local_health() -> None:
+    """Forget the cached probe so the next local call re-checks the server."""
+    global _local_health
+    _local_health = None
 
 
 def _call_local(
@@ -160,14 +343,11 @@ def _call_local(
     max_tokens: int, temperature: float,
 ) -> tuple[str, int, int]:
     """Call local llama.cpp server (OpenAI-compatible). Returns (text, in_tokens, out_tokens)."""
-    import urllib.request
-    import urllib.error
-
     base_url = cfg.get("local_server", {}).get("base_url", "http://localhost:11434/v1")
     timeout = cfg.get("local_server", {}).get("timeout", 30)
     model_name = cfg.get("models", {}).get(model_key, model_key)
 
-    payload = json.dumps({
+    data = _local_post(base_url, {
         "model": model_name,
         "messages": [
             {"role": "system", "content": system},
@@ -175,16 +355,7 @@ def _call_local(
         ],
         "max_tokens": max_tokens,
         "temperature": temperature,
-    }).encode()
-
-    req = urllib.request.Request(
-        f"{base_url}/chat/completions",
-        data=payload,
-        headers={"Content-Type": "application/json"},
-        method="POST",
-    )
-    with urllib.request.urlopen(req, timeout=timeout) as resp:
-        data = json.loads(resp.read().decode())
+    }, timeout)
 
     text = data["choices"][0]["message"]["content"].strip()
     usage = data.get("usage", {})
@@ -196,8 +367,7 @@ def _call_openai(
     max_tokens: int, temperature: float,
 ) -> tuple[str, int, int]:
     """Call OpenAI API. Returns (text, in_tokens, out_tokens)."""
-    from openai import OpenAI
-    client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY", ""))
+    client = _get_client("openai")
     # GPT-5+ uses max_completion_tokens and restricts temperature
     is_gpt5 = model.startswith("gpt-5") or model.startswith("o")
     params = dict(
@@ -225,12 +395,13 @@ def _call_claude(
     max_tokens: int, temperature: float,
 ) -> tuple[str, int, int]:
     """Call Anthropic Claude API. Returns (text, in_tokens, out_tokens)."""
-    import anthropic
-    client = anthropic.Anthropic(api_key=os.environ.get("ANTHROPIC_API_KEY", ""))
+    client = _get_client("anthropic")
+    # Mark the system prompt as a cache breakpoint; callers keep it static per agent
+    system_blocks = [{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}] if system else ""
     resp = client.messages.create(
         model=model,
         max_tokens=max_tokens,
-        system=system,
+        system=system_blocks,
         messages=[{"role": "user", "content": user}],
         temperature=temperature if not (model.startswith("gpt-5") and temperature < 1) else max(temperature, 1.0),
     )
@@ -245,11 +416,7 @@ def _call_grok(
     max_tokens: int, temperature: float,
 ) -> tuple[str, int, int]:
     """Call xAI Grok API (OpenAI-compatible). Returns (text, in_tokens, out_tokens)."""
-    from openai import OpenAI
-    client = OpenAI(
-        api_key=os.environ.get("XAI_API_KEY", ""),
-        base_url="https://api.x.ai/v1",
-    )
+    client = _get_client("xai")
     resp = client.chat.completions.create(
         model=model,
         messages=[
@@ -264,8 +431,24 @@ def _call_grok(
     usage = resp.usage
     return text, usage.prompt_tokens if usage else 0, usage.completion_tokens if usage else 0
 
+def _route_tables(cfg: dict) -> tuple[dict, dict]:
+    """Return the (route, chain) memo tables for cfg, resetting them on a new config."""
+    global _route_cfg, _route_table, _chain_table
+    if _route_cfg is not cfg:
+        _route_table, _chain_table, _route_cfg = {}, {}, cfg
+    return _route_table, _chain_table
+
+
 def _resolve_route(cfg: dict, agent: str, task_type: str) -> str:
-    """Resolve which model route to use based on config."""
+    """Resolve which model route to use based on config (memoized per config)."""
+    table = _route_tables(cfg)[0]
+    route = table.get((agent, task_type))
+    if route is None:
+        route = table[(agent, task_type)] = _compute_route(cfg, agent, task_type)
+    return route
+
+
+def _compute_route(cfg: dict, agent: str, task_type: str) -> str:
     # Check agent-level overrides first
     overrides = cfg.get("agent_overrides", {}).get(agent, {})
     if task_type in overrides:
@@ -277,6 +460,28 @@ def _resolve_route(cfg: dict, agent: str, task_type: str) -> str:
     return cfg.get("routing", {}).get(task_type, "local_large")
 
 
+def _route_chain(cfg: dict, route: str, force_cloud: bool = False) -> tuple[str, ...]:
+    """Execution chain for route: primary → fallback → last resort (memoized per config).
+
+    With force_cloud, local routes are stripped (cloud_openai if none remain).
+    """
+    table = _route_tables(cfg)[1]
+    chain = table.get((route, force_cloud))
+    if chain is None:
+        fallback_map = cfg.get("fallback", {})
+        chain = [route]
+        fb = fallback_map.get(route)
+        if fb:
+            chain.append(fb)
+            fb2 = fallback_map.get(fb)
+            if fb2:
+                chain.append(fb2)
+        if force_cloud:
+            chain = [r for r in chain if not r.startswith("local_")] or ["cloud_openai"]
+        chain = table[(route, force_cloud)] = tuple(chain)
+    return chain
+
+
 def llm_call(
     system: str,
     user: str,
@@ -303,22 +508,7 @@ def llm_call(
     cfg = _load_config()
     route = _resolve_route(cfg, agent, task_type)
     cloud_cfg = cfg.get("cloud", {})
-    fallback_map = cfg.get("fallback", {})
-
-    # Build execution chain: primary → fallback → last resort
-    chain = [route]
-    fb = fallback_map.get(route)
-    if fb:
-        chain.append(fb)
-        fb2 = fallback_map.get(fb)
-        if fb2:
-            chain.append(fb2)
-
-    if force_cloud:
-        # Strip local routes from chain
-        chain = [r for r in chain if not r.startswith("local_")]
-        if not chain:
-            chain = ["cloud_openai"]
+    chain = _route_chain(cfg, route, force_cloud)
 
     for i, target in enumerate(chain):
         is_fallback = i > 0
@@ -388,6 +578,8 @@ def llm_call(
             return text
 
         except Exception as e:
+            if target.startswith("local_"):
+                _invalidate_local_health()
             latency = int((time.time() - t0) * 1000)
             log.warning("LLM call failed [%s] for %s/%s (%dms): %s",
                         target, agent, task_type, latency, str(e)[:100])
@@ -422,14 +614,13 @@ def llm_call_with_tools(
     # For tool calling, use agent's configured route (Grok, OpenAI, etc.)
     if force_cloud or not route.startswith("local_") or not _is_local_server_up(cfg):
         # Resolve cloud provider based on agent route
-        from openai import OpenAI
         if route.startswith("cloud_grok"):
             model = cloud_cfg.get("grok_fast_model", "grok-4-1-fast-non-reasoning") if "fast" in route else cloud_cfg.get("grok_reasoning_model", "grok-3")
-            client = OpenAI(api_key=os.environ.get("XAI_API_KEY", ""), base_url="https://api.x.ai/v1")
+            client = _get_client("xai")
             _provider = "xai"
         else:
             model = cloud_cfg.get("openai_model", "gpt-4o-mini")
-            client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY", ""))
+            client = _get_client("openai")
             _provider = "openai"
         t0 = time.time()
         resp = client.chat.completions.create(
@@ -458,30 +649,22 @@ def llm_call_with_tools(
         return resp.choices[0].message
 
     # Try local server with tool calling
-    import urllib.request
     base_url = cfg["local_server"]["base_url"]
     model_name = cfg["models"].get(route, route)
     timeout = cfg["local_server"].get("timeout", 30)
 
-    payload = json.dumps({
+    payload = {
         "model": model_name,
         "messages": [{"role": "system", "content": system}] + messages,
         "tools": tools,
         "tool_choice": "auto",
         "max_tokens": max_tokens,
         "temperature": temperature,
-    }).encode()
+    }
 
     t0 = time.time()
     try:
-        req = urllib.request.Request(
-            f"{base_url}/chat/completions",
-            data=payload,
-            headers={"Content-Type": "application/json"},
-            method="POST",
-        )
-        with urllib.request.urlopen(req, timeout=timeout) as resp_raw:
-            data = json.loads(resp_raw.read().decode())
+        data = _local_post(base_url, payload, timeout)
         latency = int((time.time() - t0) * 1000)
         usage = data.get("usage", {})
         _log_cost(
@@ -495,6 +678,7 @@ def llm_call_with_tools(
         msg = data["choices"][0]["message"]
         return _dict_to_message(msg)
     except Exception as e:
+        _invalidate_local_health()
         log.warning("Local tool-call failed, falling back to cloud: %s", str(e)[:100])
         return llm_call_with_tools(
             system, messages, tools, agent, task_type,
@@ -525,33 +709,76 @@ def _dict_to_message(msg_dict: dict):
 
 # ── Cost Analytics ──
 
+COST_TAIL_SLACK_S = 300  # entries from concurrent writers can land slightly out of order
+
+
+def _cost_scan_start(f, size: int, cutoff: float) -> int:
+    """Offset of a line boundary before every cost entry at or after cutoff.
+
+    Steps back from EOF in doubling chunks until the first whole line after
+    the seek point is older than cutoff (minus COST_TAIL_SLACK_S), so only
+    the recent tail of the log has to be parsed.
+    """
+    step = 1 << 16
+    while size > step:
+        f.seek(size - step)
+        f.readline()  # discard the partial line
+        start = f.tell()
+        try:
+            entry = _loads(f.readline())
+            ts_ns = entry.get("ts_ns")
+            t = ts_ns / 1e9 if isinstance(ts_ns, int) else _parse_ts(entry["ts"]).timestamp()
+            if t < cutoff - COST_TAIL_SLACK_S:
+                return start
+        except (ValueError, TypeError, KeyError, AttributeError):
+            pass  # unparseable line or entry without a timestamp: keep stepping back
+        step *= 2
+    return 0
+
+
 def get_cost_summary(hours: int = 24) -> dict:
     """Aggregate cost data from the last N hours."""
+    _flush_costs()
     if not COSTS_FILE.exists():
         return {"total_calls": 0, "total_cost": 0, "by_provider": {}, "by_agent": {}}
 
-    cutoff = datetime.now(ET).timestamp() - hours * 3600
+    cutoff = time.time() - hours * 3600
+    cutoff_ns = int(cutoff * 1_000_000_000)
+    # Entries carry epoch ns in "ts_ns"; older ones have an ISO "ts" string.
+    # Those share the old ET offset, so their ISO strings order like the
+    # instants they name; only other offsets (DST switch) get parsed
+    cutoff_iso = datetime.fromtimestamp(cutoff, ET).isoformat()
+    cutoff_off, cutoff_local = cutoff_iso[-6:], cutoff_iso[:-6]
     totals = {"calls": 0, "cost": 0.0, "input_tokens": 0, "output_tokens": 0}
     by_provider: dict[str, dict] = {}
     by_agent: dict[str, dict] = {}
 
-    with open(COSTS_FILE) as f:
+    with open(COSTS_FILE, "rb") as f:
+        f.seek(_cost_scan_start(f, os.fstat(f.fileno()).st_size, cutoff))
         for line in f:
             line = line.strip()
             if not line:
                 continue
             try:
-                entry = json.loads(line)
-            except json.JSONDecodeError:
+                entry = _loads(line)
+            except ValueError:
                 continue
 
-            ts = entry.get("ts", "")
-            try:
-                entry_time = datetime.fromisoformat(ts).timestamp()
-                if entry_time < cutoff:
+            ts_ns = entry.get("ts_ns")
+            if isinstance(ts_ns, int):
+                if ts_ns < cutoff_ns:
                     continue
-            except Exception:
-                continue
+            else:
+                ts = entry.get("ts", "")
+                if isinstance(ts, str) and len(ts) > 19 and ts.endswith(cutoff_off):
+                    if ts[:-6] < cutoff_local:
+                        continue
+                else:
+                    try:
+                        if _parse_ts(ts).timestamp() < cutoff:
+                            continue
+                    except (ValueError, TypeError):
+                        continue
 
             totals["calls"] += 1
             totals["cost"] += entry.get("cost_usd", 0)
@@ -560,10 +787,10 @@ def get_cost_summary(hours: int = 24) -> dict:
 
             prov = entry.get("provider", "unknown")
             if prov not in by_provider:
-                by_provider[prov] = {"calls": 0, "cost": 0.0, "avg_latency": 0, "latencies": []}
+                by_provider[prov] = {"calls": 0, "cost": 0.0, "avg_latency": 0, "latency_sum": 0}
             by_provider[prov]["calls"] += 1
             by_provider[prov]["cost"] += entry.get("cost_usd", 0)
-            by_provider[prov]["latencies"].append(entry.get("latency_ms", 0))
+            by_provider[prov]["latency_sum"] += entry.get("latency_ms", 0)
 
             ag = entry.get("agent", "unknown")
             if ag not in by_agent:
@@ -573,8 +800,8 @@ def get_cost_summary(hours: int = 24) -> dict:
 
     # Compute avg latencies
     for prov_data in by_provider.values():
-        lats = prov_data.pop("latencies")
-        prov_data["avg_latency_ms"] = int(sum(lats) / len(lats)) if lats else 0
+        lat_sum = prov_data.pop("latency_sum")
+        prov_data["avg_latency_ms"] = int(lat_sum / prov_data["calls"]) if prov_data["calls"] else 0
 
     return {
         "hours": hours,
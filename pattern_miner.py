@@ -14,9 +14,11 @@ from __future__ import annotations
 
 import json
 import logging
+import os
 import re
 import sys
-from collections import Counter, defaultdict
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 # Wire up shared
@@ -28,6 +30,16 @@ log = logging.getLogger(__name__)
 
 MIN_EVIDENCE = 3       # Minimum resolved decisions to extract a pattern
 MIN_CONFIDENCE = 0.55  # Only extract patterns with >55% confidence
+MIN_CONTEXT_LEN = 20   # Shorter contexts are skipped by the keyword strategy
+
+# Keyword extraction: common noise words are dropped
+_WORD_RE = re.compile(r'[a-z][a-z0-9_]+')
+_NOISE = frozenset({
+    "the", "and", "for", "with", "from", "this", "that", "was", "are",
+    "has", "had", "but", "not", "you", "all", "can", "her", "his",
+    "one", "our", "out", "day", "get", "got", "let", "may", "say",
+    "she", "too", "use", "way", "who", "how", "its", "did", "now",
+})
 
 
 def get_all_agents() -> list[str]:
@@ -51,49 +63,47 @@ def mine_agent(agent: str) -> dict:
         return {"agent": agent, "skipped": True, "reason": "insufficient_data",
                 "resolved": stats["resolved_decisions"]}
 
-    resolved = mem.get_recent_decisions(limit=500, resolved_only=True)
+    # Only the tag/keyword strategies need rows in Python; confidence and hour
+    # buckets are aggregated by SQLite over the same 500-decision window.
     new_patterns = []
+    # (pattern_type, description, evidence_count, confidence), written in one transaction
+    pending: list[tuple[str, str, int, float]] = []
+
+    # Single pass over the resolved decisions feeds the tag and keyword buckets
+    tag_total, tag_wins, tag_losses = Counter(), Counter(), Counter()
+    win_words = Counter()
+    loss_words = Counter()
+    for tags_json, context, score in mem.iter_resolved_decisions(
+        500, ("tags", "context", "outcome_score"),
+    ):
+        won = score > 0
+        lost = score < 0
+
+        tags = json.loads(tags_json or "[]")
+        tag_total.update(tags)
+        if won:
+            tag_wins.update(tags)
+        elif lost:
+            tag_losses.update(tags)
+
+        if (won or lost) and context and len(context) >= MIN_CONTEXT_LEN:
+            (win_words if won else loss_words).update(_extract_keywords(context))
 
     # ── Strategy 1: Tag-based patterns ──
     # Group by tags and compute win rates
-    tag_outcomes = defaultdict(lambda: {"wins": 0, "losses": 0, "total": 0})
-    for dec in resolved:
-        tags = json.loads(dec.get("tags", "[]"))
-        score = dec.get("outcome_score", 0)
-        for tag in tags:
-            tag_outcomes[tag]["total"] += 1
-            if score > 0:
-                tag_outcomes[tag]["wins"] += 1
-            elif score < 0:
-                tag_outcomes[tag]["losses"] += 1
-
-    for tag, counts in tag_outcomes.items():
-        if counts["total"] < MIN_EVIDENCE:
+    for tag, total in tag_total.items():
+        if total < MIN_EVIDENCE:
             continue
-        wr = counts["wins"] / max(1, counts["wins"] + counts["losses"])
+        w, l = tag_wins[tag], tag_losses[tag]
+        wr = w / max(1, w + l)
         if wr >= MIN_CONFIDENCE or wr <= (1 - MIN_CONFIDENCE):
             result = "wins" if wr >= 0.5 else "loses"
-            desc = f"Tag '{tag}': {result} {wr:.0%} of the time ({counts['wins']}W/{counts['losses']}L over {counts['total']} decisions)"
-            mem.add_pattern(
-                pattern_type="tag_performance",
-                description=desc,
-                evidence_count=counts["total"],
-                confidence=wr if wr >= 0.5 else (1 - wr),
-            )
+            desc = f"Tag '{tag}': {result} {wr:.0%} of the time ({w}W/{l}L over {total} decisions)"
+            pending.append(("tag_performance", desc, total, wr if wr >= 0.5 else (1 - wr)))
             new_patterns.append(desc)
             log.info("%s: %s", agent, desc)
 
     # ── Strategy 2: Keyword extraction from winning/losing decisions ──
-    win_words = Counter()
-    loss_words = Counter()
-    for dec in resolved:
-        words = _extract_keywords(dec.get("context", ""))
-        score = dec.get("outcome_score", 0)
-        if score > 0:
-            win_words.update(words)
-        elif score < 0:
-            loss_words.update(words)
-
     # Find words strongly associated with wins or losses
     all_words = set(win_words.keys()) | set(loss_words.keys())
     for word in all_words:
@@ -105,66 +115,50 @@ def mine_agent(agent: str) -> dict:
         wr = w / total
         if wr >= 0.65:  # Strong win signal
             desc = f"Keyword '{word}' in context: {wr:.0%} win rate ({w}W/{l}L)"
-            mem.add_pattern("keyword_signal", desc, evidence_count=total, confidence=wr)
+            pending.append(("keyword_signal", desc, total, wr))
             new_patterns.append(desc)
             log.info("%s: %s", agent, desc)
         elif wr <= 0.35:  # Strong loss signal
             desc = f"Keyword '{word}' in context: {1-wr:.0%} loss rate ({l}L/{w}W)"
-            mem.add_pattern("keyword_signal", desc, evidence_count=total, confidence=1 - wr)
+            pending.append(("keyword_signal", desc, total, 1 - wr))
             new_patterns.append(desc)
             log.info("%s: %s", agent, desc)
 
     # ── Strategy 3: Confidence calibration ──
     # Check if the agent's confidence predictions are well-calibrated
-    high_conf = [d for d in resolved if d.get("confidence", 0) >= 0.7]
-    low_conf = [d for d in resolved if d.get("confidence", 0) < 0.4]
-
-    if len(high_conf) >= MIN_EVIDENCE:
-        high_wr = sum(1 for d in high_conf if d.get("outcome_score", 0) > 0) / len(high_conf)
-        desc = f"High-confidence decisions (>=0.7): actual win rate {high_wr:.0%} over {len(high_conf)} decisions"
-        mem.add_pattern("calibration", desc, evidence_count=len(high_conf), confidence=high_wr)
+    buckets = {bucket: (wins, n) for bucket, wins, n in mem.get_confidence_outcomes(limit=500)}
+    high_wins, high_n = buckets.get("high", (0, 0))
+    low_wins, low_n = buckets.get("low", (0, 0))
+    if high_n >= MIN_EVIDENCE:
+        high_wr = high_wins / high_n
+        desc = f"High-confidence decisions (>=0.7): actual win rate {high_wr:.0%} over {high_n} decisions"
+        pending.append(("calibration", desc, high_n, high_wr))
         new_patterns.append(desc)
 
-    if len(low_conf) >= MIN_EVIDENCE:
-        low_wr = sum(1 for d in low_conf if d.get("outcome_score", 0) > 0) / len(low_conf)
-        desc = f"Low-confidence decisions (<0.4): actual win rate {low_wr:.0%} over {len(low_conf)} decisions"
-        mem.add_pattern("calibration", desc, evidence_count=len(low_conf), confidence=max(low_wr, 1 - low_wr))
+    if low_n >= MIN_EVIDENCE:
+        low_wr = low_wins / low_n
+        desc = f"Low-confidence decisions (<0.4): actual win rate {low_wr:.0%} over {low_n} decisions"
+        pending.append(("calibration", desc, low_n, max(low_wr, 1 - low_wr)))
         new_patterns.append(desc)
 
     # ── Strategy 4: Temporal patterns (time-of-day) ──
-    hour_outcomes = defaultdict(lambda: {"wins": 0, "losses": 0})
-    for dec in resolved:
-        try:
-            ts = dec.get("timestamp", "")
-            hour = int(ts.split("T")[1].split(":")[0])
-            score = dec.get("outcome_score", 0)
-            if score > 0:
-                hour_outcomes[hour]["wins"] += 1
-            elif score < 0:
-                hour_outcomes[hour]["losses"] += 1
-        except (IndexError, ValueError):
-            continue
-
-    for hour, counts in hour_outcomes.items():
-        total = counts["wins"] + counts["losses"]
+    for hour, w, l in mem.get_hourly_outcomes(limit=500):
+        total = w + l
         if total < MIN_EVIDENCE:
             continue
-        wr = counts["wins"] / total
+        wr = w / total
         if wr >= 0.7 or wr <= 0.3:
             period = "morning" if 6 <= hour < 12 else "afternoon" if 12 <= hour < 18 else "evening" if 18 <= hour < 22 else "night"
             result = "favorable" if wr >= 0.5 else "unfavorable"
-            desc = f"Hour {hour}:00 ({period}): {result} — {wr:.0%} WR ({counts['wins']}W/{counts['losses']}L)"
-            mem.add_pattern("temporal", desc, evidence_count=total, confidence=wr if wr >= 0.5 else (1 - wr))
+            desc = f"Hour {hour}:00 ({period}): {result} — {wr:.0%} WR ({w}W/{l}L)"
+            pending.append(("temporal", desc, total, wr if wr >= 0.5 else (1 - wr)))
             new_patterns.append(desc)
             log.info("%s: %s", agent, desc)
 
+    mem.add_patterns_bulk(pending)
+
     # ── Prune weak patterns ──
-    all_patterns = mem.get_active_patterns()
-    pruned = 0
-    for p in all_patterns:
-        if p["evidence_count"] <= 1 and p["confidence"] < 0.5:
-            mem.deactivate_pattern(p["id"])
-            pruned += 1
+    pruned = mem.prune_weak_patterns()
 
     mem.close()
     return {
@@ -180,14 +174,7 @@ def mine_agent(agent: str) -> dict:
 
 def _extract_keywords(text: str) -> list[str]:
     """Extract meaningful keywords from context text."""
-    text = text.lower()
-    # Remove common noise words
-    noise = {"the", "and", "for", "with", "from", "this", "that", "was", "are",
-             "has", "had", "but", "not", "you", "all", "can", "her", "his",
-             "one", "our", "out", "day", "get", "got", "let", "may", "say",
-             "she", "too", "use", "way", "who", "how", "its", "did", "now"}
-    words = re.findall(r'[a-z][a-z0-9_]+', text)
-    return [w for w in words if w not in noise and len(w) >= 3]
+    return [w for w in _WORD_RE.findall(text.lower()) if len(w) >= 3 and w not in _NOISE]
 
 
 def print_stats() -> None:
@@ -209,6 +196,15 @@ def print_stats() -> None:
     print()
 
 
+def _mine_agent_safe(agent: str) -> dict:
+    """mine_agent() for a pool worker: failures come back as a skipped result."""
+    try:
+        return mine_agent(agent)
+    except Exception as e:
+        log.error("Failed to mine %s: %s", agent, e)
+        return {"agent": agent, "skipped": True, "reason": str(e)}
+
+
 def mine_all() -> list[dict]:
     """Mine patterns for all agents."""
     agents = get_all_agents()
@@ -217,14 +213,14 @@ def mine_all() -> list[dict]:
         return []
 
     log.info("Mining patterns for %d agents: %s", len(agents), ", ".join(agents))
-    results = []
-    for agent in agents:
-        try:
-            result = mine_agent(agent)
-            results.append(result)
-        except Exception as e:
-            log.error("Failed to mine %s: %s", agent, e)
-            results.append({"agent": agent, "skipped": True, "reason": str(e)})
+    # Each agent has its own DB and the mining loops are pure-Python CPU work,
+    # so agents are mined in separate processes
+    workers = min(len(agents), os.cpu_count() or 1)
+    if workers <= 1:
+        results = [_mine_agent_safe(agent) for agent in agents]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_mine_agent_safe, agents))
 
     # Summary
     total_patterns = sum(r.get("patterns_extracted", 0) for r in results)
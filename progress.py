@@ -5,13 +5,54 @@ All writers (Claude, Thor, git hook) should use this to avoid format drift.
 Columns (9): # | Date | Time | Agent | Type | Change | Description | Duration | Status
 
 Dark theme with color-coded types and agent brand colors.
+
+Workbooks stay open between appends and are saved FLUSH_DELAY_S after the
+first pending row (and at exit); call flush_progress() to save immediately.
 """
 from __future__ import annotations
 
+import atexit
+import hashlib
+import io
+import os
 import re
+import tempfile
+import threading
+import weakref
+import zipfile
 from datetime import datetime
 from pathlib import Path
 
+try:
+    from openpyxl import load_workbook
+    from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+    from openpyxl.utils.exceptions import InvalidFileException
+    from openpyxl.writer.excel import ExcelWriter
+    _HAS_OPENPYXL = True
+    # Unreadable/corrupt sheet on load, or a value openpyxl cannot write
+    _BOOK_ERRORS: tuple[type[Exception], ...] = (
+        OSError, ValueError, KeyError, TypeError, zipfile.BadZipFile, InvalidFileException,
+    )
+except ImportError:  # optional; appends become no-ops without it
+    _HAS_OPENPYXL = False
+    _BOOK_ERRORS = (OSError,)
+
+# Sheet colors live in sheet_theme.py (shared with the xlsxwriter rewrite scripts)
+try:
+    from shared.sheet_theme import (
+        AGENT_BRAND_COLORS,
+        BORDER_COLOR,
+        DEFAULT_TYPE_COLOR,
+        TYPE_COLORS,
+    )
+except ImportError:
+    from sheet_theme import (  # running from inside ~/shared
+        AGENT_BRAND_COLORS,
+        BORDER_COLOR,
+        DEFAULT_TYPE_COLOR,
+        TYPE_COLORS,
+    )
+
 EXCEL_PATHS = [
     Path.home() / "thor" / "data" / "brotherhood_progress.xlsx",
     Path.home() / "Desktop" / "brotherhood_progress.xlsx",
@@ -26,82 +67,120 @@ TYPE_MAP = {
     "Dashboard": "Upgrade",
 }
 
-# Type → badge background, badge text color, row tint
-TYPE_COLORS = {
-    "Feature":     {"badge_bg": "1E3A5F", "badge_fg": "5DADE2", "row_bg": "0D1B2A"},
-    "Fix":         {"badge_bg": "5C2D00", "badge_fg": "FF9F43", "row_bg": "1A1200"},
-    "Upgrade":     {"badge_bg": "0D3B1E", "badge_fg": "2ECC71", "row_bg": "0A1A0D"},
-    "Integration": {"badge_bg": "2D1B4E", "badge_fg": "A569BD", "row_bg": "150D22"},
-}
-DEFAULT_TYPE_COLOR = {"badge_bg": "2A2A2A", "badge_fg": "AAAAAA", "row_bg": "111111"}
-
-# Agent brand colors (hex without #)
-AGENT_BRAND_COLORS = {
-    "Garves": "00D4FF", "Soren": "CC66FF", "Shelby": "FFAA00",
-    "Atlas": "22AA44", "Lisa": "FF8800", "Robotox": "00FF44",
-    "Thor": "FF6600", "Hawk": "FFD700", "Viper": "00FF88",
-    "System": "888888", "Dashboard": "888888",
-}
+# Markdown stripped from descriptions before they land in the sheet
+_HEADER_RE = re.compile(r'#+\s+')
+_BOLD_RE = re.compile(r'\*{1,2}([^*]+)\*{1,2}')
+_FENCE_RE = re.compile(r'```[\s\S]*?```')
 
-BORDER_COLOR = "2A2A3E"
+# Last (minute key, date text, time text): rows in the same minute reuse the strings
+_stamp_cache: tuple[tuple[int, ...], str, str] = ((), "", "")
 
+# Open workbooks by path: {"wb", "sig", "digest", "pending", "draft"}. sig is the (mtime_ns,
+# size, inode) seen at the last load/save; a different one means another writer
+# touched the file, so it is reloaded and the rows still pending here are appended
+# again. digest hashes those on-disk bytes: books with the same digest and the same
+# pending rows hold identical sheets, so they are serialized once and share the bytes.
+# draft marks a file whose last save was a fast draft save.
+FLUSH_DELAY_S = 0.5
+# Debounced (draft) saves deflate at this fast level; an explicit flush or the one
+# at exit uses zlib's default and repacks files whose last save was a draft
+DRAFT_COMPRESSLEVEL = 1
+_books: dict[Path, dict] = {}
+_books_lock = threading.Lock()
+_flush_timer: threading.Timer | None = None
+
+
+# Column alignment: center for #, date, time, agent, type, duration, status; left for change, desc
+COL_ALIGN = ["center", "center", "center", "center", "center", "left", "left", "center", "center"]
+
+# (agent, type, status) -> 9 (name, font, fill, alignment, border) tuples, one per
+# column. Each is registered once per workbook as a NamedStyle, so a cell takes its
+# whole look in a single `cell.style = name` instead of four style-table lookups.
+_STYLE_CACHE: dict[tuple[str, str, str], tuple[tuple, ...]] = {}
+_wb_style_names: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+_FILL_CACHE: dict[str, PatternFill] = {}  # hex color -> shared solid fill
 
-def _apply_row_style(ws, row_num: int, agent: str, change_type: str) -> None:
-    """Apply dark-theme styling to a data row (9 columns)."""
-    try:
-        from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-    except ImportError:
-        return
+
+def _solid_fill(color: str) -> PatternFill:
+    fill = _FILL_CACHE.get(color)
+    if fill is None:
+        fill = _FILL_CACHE[color] = PatternFill(start_color=color, end_color=color, fill_type="solid")
+    return fill
+
+
+def _row_styles(agent: str, change_type: str, status: str) -> tuple[tuple, ...]:
+    """Cached per-column styles for a data row (requires openpyxl)."""
+    if status not in ("Done", "In Progress"):
+        status = ""
+    key = (agent, change_type, status)
+    styles = _STYLE_CACHE.get(key)
+    if styles is not None:
+        return styles
 
     thin_side = Side(style="thin", color=BORDER_COLOR)
     border = Border(left=thin_side, right=thin_side, top=thin_side, bottom=thin_side)
 
     tc = TYPE_COLORS.get(change_type, DEFAULT_TYPE_COLOR)
-    row_fill = PatternFill(start_color=tc["row_bg"], end_color=tc["row_bg"], fill_type="solid")
-    badge_fill = PatternFill(start_color=tc["badge_bg"], end_color=tc["badge_bg"], fill_type="solid")
+    type_key = change_type if change_type in TYPE_COLORS else "Other"
+    row_fill = _solid_fill(tc["row_bg"])
+    badge_fill = _solid_fill(tc["badge_bg"])
     agent_color = AGENT_BRAND_COLORS.get(agent, "AAAAAA")
 
-    # Column alignment: center for #, date, time, agent, type, duration, status; left for change, desc
-    col_align = ["center", "center", "center", "center", "center", "left", "left", "center", "center"]
+    if status == "Done":
+        status_font = Font(name="Calibri", size=12, bold=True, color="2ECC71")
+    elif status == "In Progress":
+        status_font = Font(name="Calibri", size=12, bold=True, color="F39C12")
+    else:
+        status_font = Font(name="Calibri", size=12, color="AAAAAA")
+    muted_font = Font(name="Calibri", size=12, color="9999AA")  # Date, Time, Duration
+
+    fonts_fills = [
+        (Font(name="Calibri", size=12, color="666688"), row_fill),                     # #
+        (muted_font, row_fill),                                                        # Date
+        (muted_font, row_fill),                                                        # Time
+        (Font(name="Calibri", size=13, bold=True, color=agent_color), row_fill),       # Agent — brand color
+        (Font(name="Calibri", size=12, bold=True, color=tc["badge_fg"]), badge_fill),  # Type — badge style
+        (Font(name="Calibri", size=13, bold=True, color="E0E0E0"), row_fill),          # Change title
+        (Font(name="Calibri", size=12, color="B0B0C0"), row_fill),                     # Description
+        (muted_font, row_fill),                                                        # Duration
+        (status_font, row_fill),                                                       # Status
+    ]
+    # Names encode everything the style depends on: type colors, plus agent color / status
+    names = [f"progress {type_key} c{col}" for col in range(1, 10)]
+    names[3] += f" {agent_color}"
+    names[8] += f" {status or 'Other'}"
+    styles = _STYLE_CACHE[key] = tuple(
+        (name, font, fill,
+         Alignment(vertical="center", wrap_text=(col in (6, 7)), horizontal=COL_ALIGN[col - 1]), border)
+        for col, (name, (font, fill)) in enumerate(zip(names, fonts_fills), 1)
+    )
+    return styles
+
+
+def _register_styles(wb, styles: tuple[tuple, ...]) -> None:
+    """Add any of the row's named styles the workbook does not have yet."""
+    known = _wb_style_names.get(wb)
+    if known is None:
+        known = _wb_style_names[wb] = set(wb.named_styles)  # includes ones saved earlier
+    for name, font, fill, alignment, border in styles:
+        if name not in known:
+            # A fresh NamedStyle per workbook: add_named_style binds it to that workbook
+            wb.add_named_style(NamedStyle(name=name, font=font, fill=fill, alignment=alignment, border=border))
+            known.add(name)
+
+
+def _apply_row_style(ws, row_num: int, agent: str, change_type: str) -> None:
+    """Apply dark-theme styling to a data row (9 columns)."""
+    if not _HAS_OPENPYXL:
+        return
 
     ws.row_dimensions[row_num].height = 28
 
-    for col in range(1, 10):
-        cell = ws.cell(row=row_num, column=col)
-        cell.border = border
-        cell.alignment = Alignment(
-            vertical="center",
-            wrap_text=(col in (6, 7)),
-            horizontal=col_align[col - 1],
-        )
-
-        if col == 1:  # #
-            cell.font = Font(name="Calibri", size=12, color="666688")
-            cell.fill = row_fill
-        elif col == 4:  # Agent — brand color
-            cell.font = Font(name="Calibri", size=13, bold=True, color=agent_color)
-            cell.fill = row_fill
-        elif col == 5:  # Type — badge style
-            cell.font = Font(name="Calibri", size=12, bold=True, color=tc["badge_fg"])
-            cell.fill = badge_fill
-        elif col == 6:  # Change title
-            cell.font = Font(name="Calibri", size=13, bold=True, color="E0E0E0")
-            cell.fill = row_fill
-        elif col == 7:  # Description
-            cell.font = Font(name="Calibri", size=12, color="B0B0C0")
-            cell.fill = row_fill
-        elif col == 9:  # Status
-            status_val = str(cell.value or "")
-            if status_val == "Done":
-                cell.font = Font(name="Calibri", size=12, bold=True, color="2ECC71")
-            elif status_val == "In Progress":
-                cell.font = Font(name="Calibri", size=12, bold=True, color="F39C12")
-            else:
-                cell.font = Font(name="Calibri", size=12, color="AAAAAA")
-            cell.fill = row_fill
-        else:  # Date, Time, Duration
-            cell.font = Font(name="Calibri", size=12, color="9999AA")
-            cell.fill = row_fill
+    cells = next(ws.iter_rows(min_row=row_num, max_row=row_num, min_col=1, max_col=9))
+    styles = _row_styles(agent, change_type, str(cells[8].value or ""))
+    _register_styles(ws.parent, styles)
+    for cell, style in zip(cells, styles):
+        cell.style = style[0]
 
 
 def append_progress(
@@ -114,6 +193,11 @@ def append_progress(
 ) -> int:
     """Append a row to the Brotherhood Progress Excel sheet.
 
+    The row is added to each open workbook in memory and saved to disk within
+    FLUSH_DELAY_S (appends in that window share one save) and again at exit.
+    Callers that need the row on disk before they return, such as the git hook
+    or a short-lived script, should call flush_progress() afterwards.
+
     Args:
         agent: Agent name (Atlas, Thor, Garves, Hawk, etc.)
         change_type: One of Feature, Fix, Upgrade, Integration
@@ -123,51 +207,190 @@ def append_progress(
         duration: How long the task took (e.g. "15 min", "2 hrs")
 
     Returns:
-        Number of files successfully written to.
+        Number of files the row was queued for (not yet saved).
     """
-    try:
-        from openpyxl import load_workbook
-    except ImportError:
+    if not _HAS_OPENPYXL:
         return 0
 
     resolved_type = TYPE_MAP.get(change_type, "Upgrade")
 
-    # Clean description
-    desc = re.sub(r'#+\s+', '', description)
-    desc = re.sub(r'\*{1,2}([^*]+)\*{1,2}', r'\1', desc)
-    desc = re.sub(r'```[\s\S]*?```', '', desc)
-    desc = desc.replace('`', '')
-    desc = re.sub(r'\s+', ' ', desc).strip()[:200]
+    # Clean description (plain text, the common case, only needs whitespace collapsed)
+    desc = description
+    if '#' in desc or '*' in desc or '`' in desc:
+        desc = _HEADER_RE.sub('', desc)
+        desc = _BOLD_RE.sub(r'\1', desc)
+        desc = _FENCE_RE.sub('', desc)
+        desc = desc.replace('`', '')
+    desc = ' '.join(desc.split())[:200]
 
-    now = datetime.now()
+    date_str, time_str = _now_stamp()
+    # Every column except # (the sequence number depends on the sheet)
+    values = [date_str, time_str, agent, resolved_type, feature[:50], desc, duration, status]
     written = 0
 
-    for excel_path in EXCEL_PATHS:
-        try:
-            if not excel_path.exists():
+    with _books_lock:
+        for excel_path in EXCEL_PATHS:
+            try:
+                book = _open_book(excel_path)
+                if book is None:
+                    continue
+                _write_row(book["wb"].active, values)
+                book["pending"].append(values)
+                written += 1
+            except _BOOK_ERRORS:
+                _books.pop(excel_path, None)
                 continue
-            wb = load_workbook(str(excel_path))
-            ws = wb.active
-
-            row_num = ws.max_row + 1
-            seq = row_num - 1
-
-            ws.cell(row=row_num, column=1, value=seq)
-            ws.cell(row=row_num, column=2, value=now.strftime("%b %d, %Y"))
-            ws.cell(row=row_num, column=3, value=now.strftime("%-I:%M %p"))
-            ws.cell(row=row_num, column=4, value=agent)
-            ws.cell(row=row_num, column=5, value=resolved_type)
-            ws.cell(row=row_num, column=6, value=feature[:50])
-            ws.cell(row=row_num, column=7, value=desc)
-            ws.cell(row=row_num, column=8, value=duration)
-            ws.cell(row=row_num, column=9, value=status)
-
-            _apply_row_style(ws, row_num, agent, resolved_type)
-            ws.auto_filter.ref = f"A1:I{row_num}"
-
-            wb.save(str(excel_path))
-            written += 1
-        except Exception:
-            continue
+        if written:
+            _schedule_flush()
 
     return written
+
+
+def _now_stamp() -> tuple[str, str]:
+    """Local ("Feb 01, 2026", "1:05 PM") for now, formatted once per minute.
+
+    The hour is built by hand: "%-I" is glibc-only and fails on Windows.
+    """
+    global _stamp_cache
+    now = datetime.now()
+    key = (now.year, now.month, now.day, now.hour, now.minute)
+    cached = _stamp_cache
+    if cached[0] != key:
+        time_str = f"{now.hour % 12 or 12}:{now.minute:02d} {now.strftime('%p')}"
+        cached = _stamp_cache = (key, now.strftime("%b %d, %Y"), time_str)
+    return cached[1], cached[2]
+
+
+def _file_sig(path: Path) -> tuple[int, int, int] | None:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def _open_book(path: Path) -> dict | None:
+    """Cached workbook for path, reloaded if the file changed on disk (caller holds _books_lock)."""
+    sig = _file_sig(path)
+    book = _books.get(path)
+    if sig is None:
+        _books.pop(path, None)
+        return None
+    if book is not None and book["sig"] == sig:
+        return book
+
+    data = path.read_bytes()
+    wb = load_workbook(io.BytesIO(data))
+    pending = book["pending"] if book is not None else []
+    for values in pending:
+        _write_row(wb.active, values)
+    book = _books[path] = {"wb": wb, "sig": sig, "digest": _digest(data), "pending": pending, "draft": False}
+    return book
+
+
+def _replace_file(path: Path, data: bytes) -> None:
+    """Write data to path atomically: other writers never load a half-written workbook."""
+    try:
+        mode = os.stat(path).st_mode & 0o777
+    except FileNotFoundError:
+        mode = 0o644
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _digest(data: bytes) -> bytes:
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _write_row(ws, values: list) -> None:
+    """Append one styled data row; values are every column after #."""
+    row_num = ws.max_row + 1
+    seq = row_num - 1
+
+    ws.append([seq, *values])
+    _apply_row_style(ws, row_num, values[2], values[3])
+
+
+def _schedule_flush() -> None:
+    """Save pending rows FLUSH_DELAY_S from now, coalescing appends (caller holds _books_lock)."""
+    global _flush_timer
+    if _flush_timer is None:
+        _flush_timer = threading.Timer(FLUSH_DELAY_S, flush_progress, kwargs={"draft": True})
+        _flush_timer.daemon = True
+        _flush_timer.start()
+
+
+def _workbook_bytes(wb, compresslevel: int | None) -> bytes:
+    """Serialize wb to .xlsx bytes (what wb.save does, with a chosen deflate level)."""
+    buf = io.BytesIO()
+    archive = zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED, allowZip64=True,
+                              compresslevel=compresslevel)
+    ExcelWriter(wb, archive).save()  # closes the archive
+    return buf.getvalue()
+
+
+def flush_progress(draft: bool = False) -> int:
+    """Save every workbook with pending rows. Returns number of files saved.
+
+    draft (used by the debounce timer) trades file size for a faster save.
+    """
+    global _flush_timer
+    saved = 0
+    with _books_lock:
+        if _flush_timer is not None:
+            _flush_timer.cancel()
+            _flush_timer = None
+        # Group identical sheets: (disk digest, pending rows) -> [(path, book)]
+        groups: dict[tuple, list[tuple[Path, dict]]] = {}
+        for path, book in list(_books.items()):
+            if not book["pending"]:
+                if draft or not book["draft"]:
+                    continue
+                if _file_sig(path) != book["sig"]:
+                    book["draft"] = False  # since rewritten by another writer
+                    continue
+            try:
+                # Changed on disk since we loaded it: reload and re-append our rows
+                book = _open_book(path)
+            except _BOOK_ERRORS:
+                _books.pop(path, None)
+                continue
+            if book is not None:
+                key = (book["digest"], tuple(map(tuple, book["pending"])))
+                groups.setdefault(key, []).append((path, book))
+
+        for group in groups.values():
+            try:
+                wb = group[0][1]["wb"]
+                ws = wb.active
+                ws.auto_filter.ref = f"A1:I{ws.max_row}"  # once per save, not per row
+                payload = _workbook_bytes(wb, DRAFT_COMPRESSLEVEL if draft else None)
+            except _BOOK_ERRORS:
+                for path, _ in group:
+                    _books.pop(path, None)
+                continue
+            digest = _digest(payload)
+            for path, book in group:
+                try:
+                    _replace_file(path, payload)
+                    book["sig"] = _file_sig(path)
+                    book["digest"] = digest
+                    book["draft"] = draft
+                    book["pending"].clear()
+                    saved += 1
+                except OSError:
+                    _books.pop(path, None)
+    return saved
+
+
+atexit.register(flush_progress)
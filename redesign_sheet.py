@@ -9,11 +9,26 @@ New format:
 - Frozen header row
 - Auto-filter
 """
-import openpyxl
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils import get_column_letter
+import tempfile
 from pathlib import Path
 
+import openpyxl
+
+# Type badge/row tints, agent brand colors, the border color and the xlsxwriter
+# helpers live in sheet_theme.py (shared with progress.py and cleanup_sheet.py)
+try:
+    from shared.sheet_theme import AGENT_BRAND_COLORS as AGENT_COLORS
+    from shared.sheet_theme import BORDER_COLOR as THIN_BORDER_COLOR
+    from shared.sheet_theme import DEFAULT_TYPE_COLOR, TYPE_COLORS
+    from shared.sheet_theme import xlsx_format_cache as _format_cache
+    from shared.sheet_theme import xlsx_num_format as _num_format
+except ImportError:  # running from inside ~/shared
+    from sheet_theme import AGENT_BRAND_COLORS as AGENT_COLORS
+    from sheet_theme import BORDER_COLOR as THIN_BORDER_COLOR
+    from sheet_theme import DEFAULT_TYPE_COLOR, TYPE_COLORS
+    from sheet_theme import xlsx_format_cache as _format_cache
+    from sheet_theme import xlsx_num_format as _num_format
+
 SRC = Path.home() / "Desktop" / "brotherhood_progress.xlsx"
 DEST_PATHS = [
     Path.home() / "Desktop" / "brotherhood_progress.xlsx",
@@ -25,30 +40,6 @@ HEADER_BG = "1A1A2E"       # Deep navy
 HEADER_FG = "FFFFFF"        # White text
 HEADER_ACCENT = "FFD700"    # Gold underline
 
-# Type colors (background tint for the Type cell + subtle row tint)
-TYPE_COLORS = {
-    "Feature":     {"badge_bg": "1E3A5F", "badge_fg": "5DADE2", "row_bg": "0D1B2A"},  # Blue
-    "Fix":         {"badge_bg": "5C2D00", "badge_fg": "FF9F43", "row_bg": "1A1200"},  # Orange
-    "Upgrade":     {"badge_bg": "0D3B1E", "badge_fg": "2ECC71", "row_bg": "0A1A0D"},  # Green
-    "Integration": {"badge_bg": "2D1B4E", "badge_fg": "A569BD", "row_bg": "150D22"},  # Purple
-}
-DEFAULT_TYPE_COLOR = {"badge_bg": "2A2A2A", "badge_fg": "AAAAAA", "row_bg": "111111"}
-
-# Agent brand colors
-AGENT_COLORS = {
-    "Garves":  "00D4FF",
-    "Soren":   "CC66FF",
-    "Shelby":  "FFAA00",
-    "Atlas":   "22AA44",
-    "Lisa":    "FF8800",
-    "Robotox": "00FF44",
-    "Thor":    "FF6600",
-    "Hawk":    "FFD700",
-    "Viper":   "00FF88",
-    "System":  "888888",
-    "Dashboard": "888888",
-}
-
 # Clean up messy agent names from old data
 AGENT_CLEANUP = {}
 
@@ -65,62 +56,77 @@ COLUMNS = [
     ("Status",      12,  "center"),
 ]
 
-THIN_BORDER_COLOR = "2A2A3E"
-thin_side = Side(style="thin", color=THIN_BORDER_COLOR)
-THIN_BORDER = Border(left=thin_side, right=thin_side, top=thin_side, bottom=thin_side)
-
-# Dark background for the whole sheet
-DARK_BG = PatternFill(start_color="0F0F1A", end_color="0F0F1A", fill_type="solid")
+# Dark background for the whole sheet (also tints the empty rows below the data)
+DARK_BG = "0F0F1A"
+DARK_TAIL_ROWS = 98
 
+STATUS_FONT = {
+    "Done":        {"bold": True, "font_color": "#2ECC71"},
+    "In Progress": {"bold": True, "font_color": "#F39C12"},
+}
 
-def build_sheet():
-    # 1. Read existing data
-    wb_old = openpyxl.load_workbook(str(SRC))
-    ws_old = wb_old.active
-    old_rows = []
-    for row in ws_old.iter_rows(min_row=2, values_only=True):
-        if row[0] is None:
-            continue
-        old_rows.append(list(row))
-    print(f"Read {len(old_rows)} existing rows")
-
-    # 2. Create new workbook
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "Brotherhood Progress"
-    ws.sheet_properties.tabColor = "FFD700"
 
-    # Dark background fill for a huge range
-    for r in range(1, len(old_rows) + 100):
-        for c in range(1, len(COLUMNS) + 1):
-            ws.cell(row=r, column=c).fill = DARK_BG
+def _row_props(agent, type_val, status):
+    """Per-column xlsxwriter format properties for one data row.
+
+    Type colors, agent color and status font are looked up once per row,
+    not once per cell.
+    """
+    tc = TYPE_COLORS.get(type_val, DEFAULT_TYPE_COLOR)
+    row_bg = f"#{tc['row_bg']}"
+    border_color = f"#{THIN_BORDER_COLOR}"
+    props = [
+        {
+            "font_name": "Calibri", "font_size": 12, "font_color": "#9999AA",
+            "bg_color": row_bg, "pattern": 1,
+            "border": 1, "border_color": border_color,
+            "align": align, "valign": "vcenter", "text_wrap": col in (5, 6),
+        }
+        for col, (_, _, align) in enumerate(COLUMNS)
+    ]
+    props[0]["font_color"] = "#666688"  # Row number
+    props[3].update(font_size=13, bold=True,  # Agent — brand color, bold
+                    font_color=f"#{AGENT_COLORS.get(agent, 'AAAAAA')}")
+    props[4].update(bold=True, font_color=f"#{tc['badge_fg']}",  # Type — badge style
+                    bg_color=f"#{tc['badge_bg']}")
+    props[5].update(font_size=13, bold=True, font_color="#E0E0E0")  # Change title — slightly brighter
+    props[6]["font_color"] = "#B0B0C0"  # Description
+    props[8].update(STATUS_FONT.get(status, {"font_color": "#AAAAAA"}))  # Status
+    return props
+
+
+def _build_workbook(old_rows, out: Path) -> None:
+    """Write the redesigned sheet for old_rows to the .xlsx file at out."""
+    import xlsxwriter
+
+    # 2. Create new workbook (xlsxwriter: one shared Format per unique style).
+    # constant_memory streams each row to disk once the next one starts, so
+    # memory stays flat in the row count; rows must be written top to bottom.
+    wb = xlsxwriter.Workbook(str(out), {"constant_memory": True, "strings_to_urls": False})
+    ws = wb.add_worksheet("Brotherhood Progress")
+    ws.set_tab_color("#FFD700")
+    fmt = _format_cache(wb)
 
     # 3. Set column widths
-    for i, (header, width, _) in enumerate(COLUMNS, 1):
-        ws.column_dimensions[get_column_letter(i)].width = width
+    for i, (header, width, _) in enumerate(COLUMNS):
+        ws.set_column(i, i, width)
 
     # 4. Header row
-    header_fill = PatternFill(start_color=HEADER_BG, end_color=HEADER_BG, fill_type="solid")
-    header_font = Font(name="Calibri", size=16, bold=True, color=HEADER_FG)
-    header_border = Border(
-        left=thin_side, right=thin_side,
-        top=Side(style="thin", color=THIN_BORDER_COLOR),
-        bottom=Side(style="medium", color=HEADER_ACCENT),
+    header_fmt = fmt(
+        font_name="Calibri", font_size=16, bold=True, font_color=f"#{HEADER_FG}",
+        bg_color=f"#{HEADER_BG}", pattern=1, align="center", valign="vcenter",
+        border=1, border_color=f"#{THIN_BORDER_COLOR}", bottom=2, bottom_color=f"#{HEADER_ACCENT}",
     )
-
-    for i, (header, _, align) in enumerate(COLUMNS, 1):
-        cell = ws.cell(row=1, column=i, value=header)
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = Alignment(horizontal="center", vertical="center")
-        cell.border = header_border
-
-    ws.row_dimensions[1].height = 36
-    ws.freeze_panes = "A2"
-
-    # 5. Data rows
+    ws.set_row(0, 36)
+    for i, (header, _, _) in enumerate(COLUMNS):
+        ws.write_string(0, i, header, header_fmt)
+    ws.freeze_panes(1, 0)
+
+    # 5. Data rows (in their original order; most share a few (agent, type, status)
+    # combinations, so each combination's props and Formats are built once)
+    row_styles = {}
     for idx, old_row in enumerate(old_rows):
-        row_num = idx + 2
+        row_num = idx + 1
 
         # Extract old values (8 columns → 9 columns now)
         seq = old_row[0] if len(old_row) > 0 else idx + 1
@@ -144,65 +150,62 @@ def build_sheet():
         # Duration = "--" for old entries
         duration = "--"
 
-        # Get type colors
-        tc = TYPE_COLORS.get(type_val, DEFAULT_TYPE_COLOR)
-        row_fill = PatternFill(start_color=tc["row_bg"], end_color=tc["row_bg"], fill_type="solid")
-        badge_fill = PatternFill(start_color=tc["badge_bg"], end_color=tc["badge_bg"], fill_type="solid")
-        badge_font_color = tc["badge_fg"]
-
-        # Agent color
-        agent_color = AGENT_COLORS.get(agent, "AAAAAA")
-
-        ws.row_dimensions[row_num].height = 28
+        ws.set_row(row_num, 28)
 
         # Write cells
         values = [seq, date_val, time_val, agent, type_val, change, desc, duration, status]
+        style_key = (agent, type_val, status)
+        row_style = row_styles.get(style_key)
+        if row_style is None:
+            props = _row_props(agent, type_val, status)
+            row_style = row_styles[style_key] = (props, [fmt(**p) for p in props])
+        props, formats = row_style
         for col_idx, val in enumerate(values):
-            c = col_idx + 1
-            cell = ws.cell(row=row_num, column=c, value=val)
-            cell.border = THIN_BORDER
-            cell.alignment = Alignment(
-                horizontal=COLUMNS[col_idx][2],
-                vertical="center",
-                wrap_text=(c in (6, 7)),
-            )
-
-            if c == 4:  # Agent — brand color, bold
-                cell.font = Font(name="Calibri", size=13, bold=True, color=agent_color)
-                cell.fill = row_fill
-            elif c == 5:  # Type — badge style
-                cell.font = Font(name="Calibri", size=12, bold=True, color=badge_font_color)
-                cell.fill = badge_fill
-            elif c == 9:  # Status
-                if status == "Done":
-                    cell.font = Font(name="Calibri", size=12, bold=True, color="2ECC71")
-                elif status == "In Progress":
-                    cell.font = Font(name="Calibri", size=12, bold=True, color="F39C12")
-                else:
-                    cell.font = Font(name="Calibri", size=12, color="AAAAAA")
-                cell.fill = row_fill
-            elif c == 1:  # Row number
-                cell.font = Font(name="Calibri", size=12, color="666688")
-                cell.fill = row_fill
-            elif c == 6:  # Change title — slightly brighter
-                cell.font = Font(name="Calibri", size=13, bold=True, color="E0E0E0")
-                cell.fill = row_fill
-            elif c == 7:  # Description
-                cell.font = Font(name="Calibri", size=12, color="B0B0C0")
-                cell.fill = row_fill
+            num_format = _num_format(val)
+            if num_format:
+                ws.write(row_num, col_idx, val, fmt(**props[col_idx], num_format=num_format))
             else:
-                cell.font = Font(name="Calibri", size=12, color="9999AA")
-                cell.fill = row_fill
+                ws.write(row_num, col_idx, val, formats[col_idx])
+
+    # Dark background for the empty rows below the data: one conditional format
+    # over the block instead of a styled blank per cell. It only matches rows whose
+    # first column is blank, so rows appended later keep their own fills.
+    first = len(old_rows) + 1
+    ws.conditional_format(first, 0, first + DARK_TAIL_ROWS - 1, len(COLUMNS) - 1, {
+        "type": "formula", "criteria": f'=$A{first + 1}=""',
+        "format": fmt(bg_color=f"#{DARK_BG}"),
+    })
 
     # 6. Auto-filter
-    last_row = len(old_rows) + 1
-    ws.auto_filter.ref = f"A1:{get_column_letter(len(COLUMNS))}{last_row}"
+    ws.autofilter(0, 0, len(old_rows), len(COLUMNS) - 1)
+
+    wb.close()
+
+
+def build_sheet():
+    # 1. Read existing data
+    # Streaming read; formatting and formulas from the old sheet are not needed
+    wb_old = openpyxl.load_workbook(str(SRC), read_only=True, data_only=True)
+    ws_old = wb_old.active
+    old_rows = []
+    for row in ws_old.iter_rows(min_row=2, values_only=True):
+        if row[0] is None:
+            continue
+        old_rows.append(list(row))
+    wb_old.close()  # release the file handle before SRC is overwritten
+    print(f"Read {len(old_rows)} existing rows")
+
+    # 2-6. Build the new sheet in a scratch directory (removed even if building fails)
+    with tempfile.TemporaryDirectory() as tmp:
+        out = Path(tmp) / "brotherhood_progress.xlsx"
+        _build_workbook(old_rows, out)
+        data = out.read_bytes()
 
-    # 7. Save
+    # 7. Save: serialize once, copy the same bytes to every destination
     for dest in DEST_PATHS:
         try:
             dest.parent.mkdir(parents=True, exist_ok=True)
-            wb.save(str(dest))
+            dest.write_bytes(data)
             print(f"Saved: {dest}")
         except Exception as e:
             print(f"Failed to save {dest}: {e}")
@@ -0,0 +1,54 @@
+"""Brotherhood Progress sheet theme shared by every writer.
+
+Colors used by progress.py (openpyxl appends) and the full-sheet rewrites in
+redesign_sheet.py / cleanup_sheet.py (xlsxwriter), plus the xlsxwriter format
+helpers. Deliberately free of openpyxl/xlsxwriter imports so the scripts only
+load the library they actually write with.
+"""
+from __future__ import annotations
+
+from datetime import date, datetime, time
+
+# Type → badge background, badge text color, row tint
+TYPE_COLORS = {
+    "Feature":     {"badge_bg": "1E3A5F", "badge_fg": "5DADE2", "row_bg": "0D1B2A"},
+    "Fix":         {"badge_bg": "5C2D00", "badge_fg": "FF9F43", "row_bg": "1A1200"},
+    "Upgrade":     {"badge_bg": "0D3B1E", "badge_fg": "2ECC71", "row_bg": "0A1A0D"},
+    "Integration": {"badge_bg": "2D1B4E", "badge_fg": "A569BD", "row_bg": "150D22"},
+}
+DEFAULT_TYPE_COLOR = {"badge_bg": "2A2A2A", "badge_fg": "AAAAAA", "row_bg": "111111"}
+
+# Agent brand colors (hex without #)
+AGENT_BRAND_COLORS = {
+    "Garves": "00D4FF", "Soren": "CC66FF", "Shelby": "FFAA00",
+    "Atlas": "22AA44", "Lisa": "FF8800", "Robotox": "00FF44",
+    "Thor": "FF6600", "Hawk": "FFD700", "Viper": "00FF88",
+    "System": "888888", "Dashboard": "888888",
+}
+
+BORDER_COLOR = "2A2A3E"
+
+
+def xlsx_num_format(val) -> str | None:
+    """openpyxl's default number format for date/time values (None for everything else)."""
+    if isinstance(val, datetime):
+        return "yyyy-mm-dd h:mm:ss"
+    if isinstance(val, date):
+        return "yyyy-mm-dd"
+    if isinstance(val, time):
+        return "h:mm:ss"
+    return None
+
+
+def xlsx_format_cache(wb):
+    """Return fmt(**props) -> one shared xlsxwriter Format per unique style."""
+    cache = {}
+
+    def fmt(**props):
+        key = tuple(sorted(props.items()))
+        f = cache.get(key)
+        if f is None:
+            f = cache[key] = wb.add_format(props)
+        return f
+
+    return fmt